@@ -28,13 +28,13 @@ def update_analysis_view(active_layers, start_date, end_date, time_agg, animatio
         
         if active_layers:
             # Filter data by time range
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings, 
+            static_data = data_processor.get_readings(
+                'static_readings', 
                 start_date, 
                 end_date
             )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings, 
+            mobile_data = data_processor.get_readings(
+                'mobile_readings', 
                 start_date, 
                 end_date
             )
@@ -106,13 +106,13 @@ def create_stats_display(stats):
 def update_affected_areas_analysis(threshold_range, start_date, end_date):
     """Update the affected areas map and statistics based on the threshold range"""
     # Filter data for the selected time period
-    filtered_static = data_processor.filter_time_range(
-        data_processor.static_readings,
+    filtered_static = data_processor.get_readings(
+        'static_readings',
         start_date,
         end_date
     )
-    filtered_mobile = data_processor.filter_time_range(
-        data_processor.mobile_readings,
+    filtered_mobile = data_processor.get_readings(
+        'mobile_readings',
         start_date,
         end_date
     )
@@ -176,13 +176,13 @@ def update_coverage_analysis(start_date, end_date):
     
     try:
         # Filter data for time period
-        filtered_static = data_processor.filter_time_range(
-            data_processor.static_readings,
+        filtered_static = data_processor.get_readings(
+            'static_readings',
             start_date,
             end_date
         )
-        filtered_mobile = data_processor.filter_time_range(
-            data_processor.mobile_readings,
+        filtered_mobile = data_processor.get_readings(
+            'mobile_readings',
             start_date,
             end_date
         )
@@ -6,8 +6,11 @@ import pandas as pd
 import numpy as np
 from dash import html, dcc
 from utils.mapping import MapVisualizer
+from utils.audit import get_logger
 from dash.exceptions import PreventUpdate
 
+logger = get_logger('comparison_callbacks')
+
 
 
 
@@ -23,21 +26,23 @@ def register_comparison_callbacks(app, data_processor):
         """Update detailed coverage statistics"""
         try:
             # Filter data by date range
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings,
+            static_data = data_processor.get_window(
+                'static_readings',
                 start_date,
                 end_date
             )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings,
+            mobile_data = data_processor.get_window(
+                'mobile_readings',
                 start_date,
                 end_date
             )
+            static_summary = data_processor.get_window_stats('static_readings', start_date, end_date)
+            mobile_summary = data_processor.get_window_stats('mobile_readings', start_date, end_date)
             
             # Static sensor statistics
             static_sensors = len(data_processor.static_sensors)
             static_readings = len(static_data)
-            static_avg = static_data['value'].mean()
+            static_avg = static_summary['mean']
             
             static_stats = html.Div([
                 html.P(f"Number of Sensors: {static_sensors}"),
@@ -46,9 +51,9 @@ def register_comparison_callbacks(app, data_processor):
             ])
             
             # Mobile sensor statistics
-            mobile_sensors = len(mobile_data['sensor_id'].unique())
+            mobile_sensors = mobile_summary['sensors']
             mobile_readings = len(mobile_data)
-            mobile_avg = mobile_data['value'].mean()
+            mobile_avg = mobile_summary['mean']
             
             mobile_stats = html.Div([
                 html.P(f"Active Vehicles: {mobile_sensors}"),
@@ -59,7 +64,7 @@ def register_comparison_callbacks(app, data_processor):
             # Overall coverage calculation
             total_area = 100  # Approximate city area in km²
             static_coverage = static_sensors * 0.5  # Assuming 0.5 km² coverage per static sensor
-            mobile_unique_locs = len(mobile_data[['latitude', 'longitude']].drop_duplicates())
+            mobile_unique_locs = data_processor.get_distinct_counts('mobile_readings', start_date, end_date)['locations']
             mobile_coverage = mobile_unique_locs * 0.01  # Assuming 0.01 km² per unique mobile reading
             
             total_coverage = min(100, ((static_coverage + mobile_coverage) / total_area) * 100)
@@ -77,7 +82,7 @@ def register_comparison_callbacks(app, data_processor):
             return static_stats, mobile_stats, overall_stats
             
         except Exception as e:
-            print(f"Error updating coverage stats: {str(e)}")
+            logger.error("Error updating coverage stats: %s", e)
             error_div = html.Div("Error calculating statistics")
             return error_div, error_div, error_div
         
@@ -93,27 +98,16 @@ def register_comparison_callbacks(app, data_processor):
             raise PreventUpdate
             
         try:
-            # Filter data
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings,
-                start_date,
-                end_date
-            )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings,
-                start_date,
-                end_date
-            )
-            
             # Create base map
             map_viz = MapVisualizer()
             fig = map_viz.create_base_map(['boundaries'])
             
             # Process static sensors
-            static_stats = static_data.groupby('sensor_id').agg({
-                'value': ['mean', 'max', 'count']
-            }).reset_index()
-            static_stats.columns = ['sensor_id', 'mean', 'max', 'count']
+            static_stats = data_processor.get_sensor_aggregates(
+                'static_readings',
+                start_date,
+                end_date
+            )[['sensor_id', 'mean', 'max', 'count']]
             
             static_locs = pd.merge(
                 data_processor.static_sensors,
@@ -160,12 +154,11 @@ def register_comparison_callbacks(app, data_processor):
             
             # Process mobile sensors
             if metric in ['avg', 'max']:
-                mobile_stats = mobile_data.groupby('sensor_id').agg({
-                    'value': ['mean', 'max'],
-                    'latitude': 'last',
-                    'longitude': 'last'
-                }).reset_index()
-                mobile_stats.columns = ['sensor_id', 'mean', 'max', 'latitude', 'longitude']
+                mobile_stats = data_processor.get_sensor_aggregates(
+                    'mobile_readings',
+                    start_date,
+                    end_date
+                )[['sensor_id', 'mean', 'max', 'latitude', 'longitude']]
                 
                 # Add mobile sensors with left-side colorbar
                 fig.add_trace(go.Scattermapbox(
@@ -198,6 +191,11 @@ def register_comparison_callbacks(app, data_processor):
                 ))
             else:
                 # Coverage view with heatmap
+                mobile_data = data_processor.get_window(
+                    'mobile_readings',
+                    start_date,
+                    end_date
+                )
                 fig.add_trace(go.Densitymapbox(
                     lat=mobile_data['latitude'],
                     lon=mobile_data['longitude'],
@@ -242,7 +240,7 @@ def register_comparison_callbacks(app, data_processor):
             return fig
             
         except Exception as e:
-            print(f"Error updating comparison map: {str(e)}")
+            logger.error("Error updating comparison map: %s", e)
             return go.Figure()
         
     
@@ -254,27 +252,21 @@ def register_comparison_callbacks(app, data_processor):
     def update_comparison_timeseries(start_date, end_date):
         """Update time series comparison"""
         try:
-            # Filter data
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings,
+            # Hourly averages, coarsened when the range holds more hours than the chart can show
+            static_hourly, plan = data_processor.get_planned_buckets(
+                'static_readings',
+                '1h',
                 start_date,
-                end_date
+                end_date,
+                max_points=data_processor.CHART_POINT_BUDGET
             )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings,
+            mobile_hourly = data_processor.get_bucketed_averages(
+                'mobile_readings',
+                plan['freq'],
                 start_date,
                 end_date
             )
             
-            # Calculate hourly averages
-            static_hourly = static_data.groupby(
-                pd.Grouper(key='timestamp', freq='1H')
-            )['value'].agg(['mean', 'std']).reset_index()
-            
-            mobile_hourly = mobile_data.groupby(
-                pd.Grouper(key='timestamp', freq='1H')
-            )['value'].agg(['mean', 'std']).reset_index()
-            
             # Create figure
             fig = go.Figure()
             
@@ -339,7 +331,7 @@ def register_comparison_callbacks(app, data_processor):
             ))
             
             fig.update_layout(
-                title="Radiation Readings Over Time",
+                title=f"Radiation Readings Over Time ({plan['label']})",
                 xaxis_title="Time",
                 yaxis_title="Radiation Level (cpm)",
                 hovermode='x unified',
@@ -349,7 +341,7 @@ def register_comparison_callbacks(app, data_processor):
             return fig
             
         except Exception as e:
-            print(f"Error updating time series: {str(e)}")
+            logger.error("Error updating time series: %s", e)
             return go.Figure()
 
     @app.callback(
@@ -360,35 +352,16 @@ def register_comparison_callbacks(app, data_processor):
     def update_comparison_stats(start_date, end_date):
         """Update statistical comparison"""
         try:
-            # Filter data
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings,
-                start_date,
-                end_date
-            )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings,
-                start_date,
-                end_date
-            )
+            # Aggregates of the filtered data, shared with the other comparison callbacks
+            static_summary = data_processor.get_window_stats('static_readings', start_date, end_date)
+            mobile_summary = data_processor.get_window_stats('mobile_readings', start_date, end_date)
             
             # Calculate statistics
+            metrics = ['mean', 'median', 'std', 'max', 'min']
             stats = pd.DataFrame({
                 'Metric': ['Mean', 'Median', 'Std Dev', 'Max', 'Min'],
-                'Static': [
-                    static_data['value'].mean(),
-                    static_data['value'].median(),
-                    static_data['value'].std(),
-                    static_data['value'].max(),
-                    static_data['value'].min()
-                ],
-                'Mobile': [
-                    mobile_data['value'].mean(),
-                    mobile_data['value'].median(),
-                    mobile_data['value'].std(),
-                    mobile_data['value'].max(),
-                    mobile_data['value'].min()
-                ]
+                'Static': [static_summary[metric] for metric in metrics],
+                'Mobile': [mobile_summary[metric] for metric in metrics]
             })
             
             # Create comparison bar chart
@@ -408,8 +381,14 @@ def register_comparison_callbacks(app, data_processor):
                 marker_color='red'
             ))
             
+            # Medians from the quantile sketches are approximate; state their (probabilistic) rank error
+            rank_error = max(static_summary['median_rank_error'], mobile_summary['median_rank_error'])
+            title = "Statistical Comparison"
+            if rank_error > 0:
+                title += f" (median within ±{rank_error:.1%} in rank with high probability)"
+            
             fig.update_layout(
-                title="Statistical Comparison",
+                title=title,
                 yaxis_title="Value (cpm)",
                 barmode='group',
                 height=400
@@ -418,7 +397,7 @@ def register_comparison_callbacks(app, data_processor):
             return fig
             
         except Exception as e:
-            print(f"Error updating statistics: {str(e)}")
+            logger.error("Error updating statistics: %s", e)
             return go.Figure()
 
     return app
\ No newline at end of file
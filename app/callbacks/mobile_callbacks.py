@@ -8,6 +8,17 @@ import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 from utils.mapping import MapVisualizer
+from utils.audit import get_logger
+
+logger = get_logger('mobile_callbacks')
+
+
+def _time_bounds(time_range):
+    """Time slider value (epoch seconds) as timestamps, or (None, None) for all readings"""
+    if not time_range:
+        return None, None
+    return pd.to_datetime(time_range[0], unit='s'), pd.to_datetime(time_range[1], unit='s')
+
 
 def register_callbacks(app, data_processor):
     """Register all mobile sensor related callbacks"""
@@ -25,9 +36,10 @@ def register_callbacks(app, data_processor):
             raise PreventUpdate
         
         try:
-            # Get time range from data
-            min_time = data_processor.mobile_readings['timestamp'].min().timestamp()
-            max_time = data_processor.mobile_readings['timestamp'].max().timestamp()
+            # Get time range from the dataset summary
+            summary = data_processor.get_summary('mobile_readings')
+            min_time = summary['start'].timestamp()
+            max_time = summary['end'].timestamp()
             
             # Create marks every 6 hours
             time_points = pd.date_range(
@@ -42,7 +54,7 @@ def register_callbacks(app, data_processor):
             
             return min_time, max_time, marks, [min_time, max_time]
         except Exception as e:
-            print(f"Error initializing mobile controls: {str(e)}")
+            logger.error("Error initializing mobile controls: %s", e)
             return 0, 1, {}, [0, 1]
 
     @app.callback(
@@ -55,8 +67,8 @@ def register_callbacks(app, data_processor):
             raise PreventUpdate
             
         try:
-            # Get unique sensor IDs with reading counts
-            sensor_counts = data_processor.mobile_readings['sensor_id'].value_counts()
+            # Reading counts per sensor, kept by the sensor index
+            sensor_counts = data_processor.get_sensor_counts('mobile_readings')
             
             options = [
                 {'label': f'Vehicle {sid} ({count} readings)', 'value': sid}
@@ -72,7 +84,7 @@ def register_callbacks(app, data_processor):
             return sorted_options, default_value
             
         except Exception as e:
-            print(f"Error initializing sensor dropdown: {str(e)}")
+            logger.error("Error initializing sensor dropdown: %s", e)
             return [], None
 
     # Overview metrics
@@ -90,22 +102,16 @@ def register_callbacks(app, data_processor):
             
         try:
             # Filter by time range
-            filtered_data = data_processor.mobile_readings
-            if time_range:
-                start_time = pd.to_datetime(time_range[0], unit='s')
-                end_time = pd.to_datetime(time_range[1], unit='s')
-                filtered_data = filtered_data[
-                    (filtered_data['timestamp'] >= start_time) &
-                    (filtered_data['timestamp'] <= end_time)
-                ]
-            
-            # Calculate metrics
-            sensor_count = len(filtered_data['sensor_id'].unique())
-            user_count = len(filtered_data['user_id'].unique())
+            start, end = _time_bounds(time_range)
+            filtered_data = data_processor.get_readings('mobile_readings', start, end)
+            
+            # Distinct sensors, users and locations from the per-bucket sketches
+            distinct = data_processor.get_distinct_counts('mobile_readings', start, end)
+            sensor_count = distinct['sensors']
+            user_count = distinct['users']
             
             # Calculate coverage (unique locations * approx area per point)
-            unique_locs = filtered_data[['latitude', 'longitude']].drop_duplicates()
-            coverage = len(unique_locs) * 0.01  # km² (approximate)
+            coverage = distinct['locations'] * 0.01  # km² (approximate)
             
             # Count potentially contaminated vehicles (above threshold)
             threshold = 35  # cpm
@@ -120,7 +126,7 @@ def register_callbacks(app, data_processor):
                 str(contaminated)
             )
         except Exception as e:
-            print(f"Error updating metrics: {str(e)}")
+            logger.error("Error updating metrics: %s", e)
             return "N/A", "N/A users", "0.0", "N/A"
 
     # Vehicle movement tracking
@@ -139,17 +145,9 @@ def register_callbacks(app, data_processor):
             if not isinstance(selected_sensors, list):
                 selected_sensors = [selected_sensors]
                 
-            filtered_data = data_processor.mobile_readings[
-                data_processor.mobile_readings['sensor_id'].isin(selected_sensors)
-            ]
-            
-            if time_range:
-                start_time = pd.to_datetime(time_range[0], unit='s')
-                end_time = pd.to_datetime(time_range[1], unit='s')
-                filtered_data = filtered_data[
-                    (filtered_data['timestamp'] >= start_time) &
-                    (filtered_data['timestamp'] <= end_time)
-                ]
+            filtered_data = data_processor.get_sensor_readings(
+                'mobile_readings', selected_sensors, *_time_bounds(time_range)
+            )
             
             # Create base map
             map_viz = MapVisualizer()
@@ -159,9 +157,9 @@ def register_callbacks(app, data_processor):
             
             # Add vehicle paths
             for sensor_id in selected_sensors:
-                sensor_data = filtered_data[
-                    filtered_data['sensor_id'] == sensor_id
-                ].sort_values('timestamp')
+                sensor_data = data_processor.get_sensor_readings(
+                    'mobile_readings', [sensor_id], *_time_bounds(time_range)
+                )
                 
                 if len(sensor_data) > 0:
                     # Add path line with radiation color scale
@@ -206,7 +204,7 @@ def register_callbacks(app, data_processor):
             return fig
             
         except Exception as e:
-            print(f"Error updating vehicle tracking: {str(e)}")
+            logger.error("Error updating vehicle tracking: %s", e)
             return create_empty_map()
 
     # Vehicle statistics
@@ -226,17 +224,9 @@ def register_callbacks(app, data_processor):
             if not isinstance(selected_sensors, list):
                 selected_sensors = [selected_sensors]
                 
-            filtered_data = data_processor.mobile_readings[
-                data_processor.mobile_readings['sensor_id'].isin(selected_sensors)
-            ]
-            
-            if time_range:
-                start_time = pd.to_datetime(time_range[0], unit='s')
-                end_time = pd.to_datetime(time_range[1], unit='s')
-                filtered_data = filtered_data[
-                    (filtered_data['timestamp'] >= start_time) &
-                    (filtered_data['timestamp'] <= end_time)
-                ]
+            filtered_data = data_processor.get_sensor_readings(
+                'mobile_readings', selected_sensors, *_time_bounds(time_range)
+            )
             
             # Create time series
             fig = px.line(
@@ -258,7 +248,9 @@ def register_callbacks(app, data_processor):
             # Calculate statistics
             stats = []
             for sensor_id in selected_sensors:
-                sensor_data = filtered_data[filtered_data['sensor_id'] == sensor_id]
+                sensor_data = data_processor.get_sensor_readings(
+                    'mobile_readings', [sensor_id], *_time_bounds(time_range)
+                )
                 if len(sensor_data) > 0:
                     stats.append(dbc.Card([
                         dbc.CardBody([
@@ -275,7 +267,7 @@ def register_callbacks(app, data_processor):
             return fig, stats_div
             
         except Exception as e:
-            print(f"Error updating vehicle stats: {str(e)}")
+            logger.error("Error updating vehicle stats: %s", e)
             return px.line(), "Error calculating statistics"
 
     # Coverage Analysis
@@ -286,23 +278,14 @@ def register_callbacks(app, data_processor):
          Input('tabs', 'active_tab')]
     )
     def update_coverage_display(metric, time_range, active_tab):
-        print("update_coverage_display called")
-        print("metric:", metric)
-        print("time_range:", time_range)
-        print("active_tab:", active_tab)
+        logger.debug("update_coverage_display called")
+        logger.debug("Coverage display: metric=%s time_range=%s active_tab=%s", metric, time_range, active_tab)
         if not metric or active_tab != "tab-mobile":
             raise PreventUpdate
             
         try:
             # Filter data
-            filtered_data = data_processor.mobile_readings
-            if time_range:
-                start_time = pd.to_datetime(time_range[0], unit='s')
-                end_time = pd.to_datetime(time_range[1], unit='s')
-                filtered_data = filtered_data[
-                    (filtered_data['timestamp'] >= start_time) &
-                    (filtered_data['timestamp'] <= end_time)
-                ]
+            filtered_data = data_processor.get_readings('mobile_readings', *_time_bounds(time_range))
                 
             # Create visualizations based on metric
             if metric == 'spatial':
@@ -355,7 +338,7 @@ def register_callbacks(app, data_processor):
             return fig
             
         except Exception as e:
-            print("Error in update_coverage_display:", e)
+            logger.error("Error in update_coverage_display: %s", e)
             return create_empty_map()
     return app
 
@@ -9,16 +9,20 @@ from utils.data_processing import DataProcessor
 def create_overview_layout(data_processor):
     stats = data_processor.get_sensor_stats()
     
-    # Create time series plot with standardized column names
-    hourly_data = data_processor.static_readings.copy()
-    hourly_data['hour'] = hourly_data[DataProcessor.TIMESTAMP].dt.floor('H')
-    hourly_avg = hourly_data.groupby('hour')[DataProcessor.VALUE].mean().reset_index()
+    # Create time series plot with standardized column names (hours with readings only)
+    hourly, plan = data_processor.get_planned_buckets(
+        'static_readings', '1h', max_points=data_processor.CHART_POINT_BUDGET
+    )
+    hourly_avg = pd.DataFrame({
+        'hour': hourly[DataProcessor.TIMESTAMP],
+        DataProcessor.VALUE: hourly['mean']
+    })[hourly['count'] > 0]
     
     time_series_fig = px.line(
         hourly_avg, 
         x='hour', 
         y=DataProcessor.VALUE,
-        title='Average Radiation Levels Over Time'
+        title=f"Average Radiation Levels Over Time ({plan['label']})"
     )
     
     return dbc.Container([
@@ -113,5 +117,37 @@ def create_overview_layout(data_processor):
                     ])
                 ])
             ], width=12)
+        ]),
+
+        # Data Quality Row
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Data Quality"),
+                    dbc.CardBody(create_data_quality_panel(data_processor.audit))
+                ], className="mt-4")
+            ], width=12)
         ])
-    ], fluid=True)
\ No newline at end of file
+    ], fluid=True)
+
+
+def create_data_quality_panel(audit, recent=5):
+    """Rows kept and removed per cleaning reason for each dataset, and the latest ingest events"""
+    counts = audit.counts()
+    if counts.empty:
+        return [html.P("No readings have been cleaned yet")]
+
+    counts.columns = [label.replace('_', ' ').capitalize().replace('Iqr', 'IQR') for label in counts.columns]
+    table = counts.reset_index().rename(columns={'dataset': 'Dataset'})
+    children = [dbc.Table.from_dataframe(table, striped=True, bordered=False, hover=True, size='sm')]
+
+    events = audit.events(limit=recent)
+    if events:
+        children.append(html.H6("Recent events", className="mt-3"))
+        children.append(html.Ul([
+            html.Li(f"{entry['time']:%Y-%m-%d %H:%M:%S} {entry['event']}: " + ", ".join(
+                f"{key}={value}" for key, value in entry.items() if key not in ('time', 'event')
+            ))
+            for entry in reversed(events)
+        ], className="small"))
+    return children
\ No newline at end of file
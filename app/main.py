@@ -9,7 +9,9 @@ from layouts.analysis import create_analysis_layout  # Add this import
 from layouts.static_sensors import create_static_sensors_layout
 from layouts.mobile_sensor import create_mobile_sensors_layout
 from utils.mapping import MapVisualizer
+from utils.audit import DEFAULT_LOG_LEVEL, configure_logging, get_logger
 import os
+import argparse
 import plotly.graph_objects as go
 import plotly.express as px
 from dash.exceptions import PreventUpdate
@@ -31,9 +33,55 @@ app = dash.Dash(__name__,
 
 
 
+# Command line options (parse_known_args so WSGI servers importing this module still work)
+parser = argparse.ArgumentParser(description="RadWatch - St. Himark Radiation Monitoring")
+parser.add_argument('--rebuild-cache', action='store_true',
+                    help="Ignore the snapshot cache and re-clean the raw CSV files")
+parser.add_argument('--no-cache', action='store_true',
+                    help="Neither read nor write the snapshot cache")
+parser.add_argument('--chunk-size', type=int, default=None,
+                    help="Stream readings in chunks of this many rows to bound memory during ingest")
+parser.add_argument('--tail-interval', type=float, default=None,
+                    help="Poll the readings files for appended rows every N seconds")
+parser.add_argument('--lazy', action='store_true',
+                    help="Load each dataset on first use and warm the rest up in the background")
+parser.add_argument('--port', type=int, default=8050,
+                    help="Port the dashboard listens on")
+parser.add_argument('--partitioned', action='store_true',
+                    help="Keep cleaned readings on disk partitioned by day and read only the days a "
+                         "date range selects")
+parser.add_argument('--sql', action='store_true',
+                    help="Run range filters and aggregates in an embedded SQL database "
+                         "(DuckDB if installed, otherwise SQLite)")
+parser.add_argument('--column-store', default=None, metavar='DIR',
+                    help="Share cleaned readings between workers as memory-mapped columns in DIR "
+                         "(also read from the RADWATCH_COLUMN_STORE environment variable)")
+parser.add_argument('--exact-quantiles', action='store_true',
+                    help="Compute medians of date-range windows from the readings instead of the "
+                         "per-sensor, per-hour quantile sketches")
+parser.add_argument('--log-level', default=DEFAULT_LOG_LEVEL,
+                    choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper,
+                    help="Lowest level of log messages written to stderr (repeated messages are "
+                         "rate-limited)")
+args, _ = parser.parse_known_args()
+
+configure_logging(args.log_level)
+logger = get_logger('main')
+
 # Initialize data processor
 data_processor = DataProcessor()
-loading_success = data_processor.load_data()
+loading_success = data_processor.load_data(
+    use_cache=not args.no_cache,
+    rebuild_cache=args.rebuild_cache,
+    chunk_size=args.chunk_size,
+    lazy=args.lazy,
+    column_store_dir=args.column_store,
+    partitioned=args.partitioned,
+    sql_backend=args.sql,
+    exact_quantiles=args.exact_quantiles or None
+)
+if loading_success and args.tail_interval:
+    data_processor.start_tail_ingest(args.tail_interval)
 
 # Create the app layout
 app.layout = dbc.Container([
@@ -98,7 +146,7 @@ def render_tab_content(active_tab):
             return create_analysis_layout(data_processor), ""
         return "No content", ""
     except Exception as e:
-        print(f"Error rendering tab content: {str(e)}")
+        logger.error("Error rendering tab content: %s", e)
         return html.Div([
             html.H4("Error Loading Content"),
             html.P(f"An error occurred: {str(e)}")
@@ -109,8 +157,8 @@ def render_tab_content(active_tab):
     Input('map-layers', 'value')
 )
 def update_map_layers(active_layers):
-    print("\n=== Map Callback Triggered ===")
-    print(f"Active layers selected: {active_layers}")
+    logger.debug("Map Callback Triggered")
+    logger.debug("Active layers selected: %s", active_layers)
     
     try:
         # Create new map with selected layers
@@ -118,19 +166,23 @@ def update_map_layers(active_layers):
         map_fig = map_viz.create_base_map(active_layers=active_layers)
         
         if active_layers:
-            # Add sensors
+            # Add sensors, mobile ones at their latest positions from the per-sensor
+            # aggregates, so the readings themselves are not loaded for the map
+            mobile_positions = None
+            if 'mobile' in active_layers:
+                mobile_positions = data_processor.get_sensor_aggregates('mobile_readings')
             map_fig = map_viz.add_sensors(
                 map_fig,
                 data_processor.static_sensors,
-                data_processor.mobile_readings,
+                mobile_positions,
                 active_layers=active_layers
             )
             
-            # Add heatmap with both static sensors and readings
+            # Add heatmap with both static sensors and their average readings
             if 'heatmap' in active_layers:
                 map_fig = map_viz.add_radiation_heatmap(
                     map_fig,
-                    data_processor.static_readings,
+                    data_processor.get_sensor_aggregates('static_readings'),
                     data_processor.static_sensors,
                     active_layers=active_layers
                 )
@@ -138,9 +190,7 @@ def update_map_layers(active_layers):
         return map_fig
         
     except Exception as e:
-        print(f"ERROR in map callback: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error in map callback: %s", e)
         raise
 
 # Static sensors callbacks
@@ -164,7 +214,7 @@ def init_static_sensor_selector(active_tab):
         initial_value = [sensor_ids[0]] if sensor_ids else None
         return options, initial_value
     except Exception as e:
-        print(f"Error initializing sensor selector: {str(e)}")
+        logger.error("Error initializing sensor selector: %s", e)
         return [], None
     
 @app.callback(
@@ -177,17 +227,18 @@ def initialize_static_data(active_tab):
         
     try:
         # Prepare basic sensor data for storage
+        summary = data_processor.get_summary('static_readings')
         sensor_data = {
             'sensor_ids': data_processor.static_sensors[DataProcessor.SENSOR_ID].unique().tolist(),
-            'total_readings': len(data_processor.static_readings),
+            'total_readings': summary['rows'],
             'time_range': [
-                data_processor.static_readings[DataProcessor.TIMESTAMP].min().strftime('%Y-%m-%d %H:%M:%S'),
-                data_processor.static_readings[DataProcessor.TIMESTAMP].max().strftime('%Y-%m-%d %H:%M:%S')
+                summary['start'].strftime('%Y-%m-%d %H:%M:%S'),
+                summary['end'].strftime('%Y-%m-%d %H:%M:%S')
             ]
         }
         return [sensor_data]
     except Exception as e:
-        print(f"Error initializing static data: {str(e)}")
+        logger.error("Error initializing static data: %s", e)
         return [{}]
 
 
@@ -205,9 +256,9 @@ def init_time_range(active_tab):
         
     try:
         # Convert timestamps to unix timestamps for the slider
-        timestamps = data_processor.static_readings[DataProcessor.TIMESTAMP]
-        min_time = timestamps.min().timestamp()
-        max_time = timestamps.max().timestamp()
+        summary = data_processor.get_summary('static_readings')
+        min_time = summary['start'].timestamp()
+        max_time = summary['end'].timestamp()
         
         # Create marks for the slider (show 5 marks)
         time_range = np.linspace(min_time, max_time, 5)
@@ -219,7 +270,7 @@ def init_time_range(active_tab):
         # Initialize with full range selected
         return min_time, max_time, marks, [min_time, max_time]
     except Exception as e:
-        print(f"Error initializing time range: {str(e)}")
+        logger.error("Error initializing time range: %s", e)
         return 0, 1, {}, [0, 1]
 
 # Time Series and Statistics Update
@@ -239,10 +290,8 @@ def update_static_sensor_analysis(selected_sensors, time_range):
         if not isinstance(selected_sensors, list):
             selected_sensors = [selected_sensors]
             
-        # Filter data
-        filtered_data = data_processor.static_readings[
-            data_processor.static_readings[DataProcessor.SENSOR_ID].isin(selected_sensors)
-        ]
+        # Look up the selected sensors' rows (grouped by sensor, time-ordered within each)
+        filtered_data = data_processor.get_sensor_readings('static_readings', selected_sensors)
         
         if len(filtered_data) == 0:
             raise ValueError("No data found for selected sensors")
@@ -278,7 +327,7 @@ def update_static_sensor_analysis(selected_sensors, time_range):
         # Calculate statistics
         stats = []
         for sensor_id in selected_sensors:
-            sensor_data = filtered_data[filtered_data[DataProcessor.SENSOR_ID] == sensor_id]
+            sensor_data = data_processor.get_sensor_readings('static_readings', [sensor_id])
             if len(sensor_data) > 0:
                 stats.append(html.Div([
                     html.H6(f"Sensor {sensor_id}", className="mt-3"),
@@ -313,7 +362,7 @@ def update_static_sensor_analysis(selected_sensors, time_range):
         return time_series, stats_div, boxplot
         
     except Exception as e:
-        print(f"Error updating static sensor analysis: {str(e)}")
+        logger.error("Error updating static sensor analysis: %s", e)
         empty_fig = go.Figure()
         empty_fig.update_layout(
             title="No data available",
@@ -340,16 +389,17 @@ import pandas as pd
 )
 def update_static_heatmap(metric):
     try:
-        print("\n=== Updating Static Heatmap ===")
-        print(f"Selected metric: {metric}")
+        logger.debug("Updating Static Heatmap")
+        logger.debug("Selected metric: %s", metric)
         
         # Verify data availability
-        if data_processor.static_sensors is None or data_processor.static_readings is None:
+        summary = data_processor.get_summary('static_readings')
+        if data_processor.static_sensors is None or summary is None:
             raise ValueError("Static sensor data not properly loaded")
             
         # Print data shapes for debugging
-        print(f"Static sensors shape: {data_processor.static_sensors.shape}")
-        print(f"Static readings shape: {data_processor.static_readings.shape}")
+        logger.debug("Static sensors shape: %s", data_processor.static_sensors.shape)
+        logger.debug("Static readings: %s rows", summary['rows'])
         
         # Create base map
         map_viz = MapVisualizer()
@@ -359,25 +409,22 @@ def update_static_heatmap(metric):
         sensor_lats = data_processor.static_sensors[DataProcessor.LATITUDE]
         sensor_lons = data_processor.static_sensors[DataProcessor.LONGITUDE]
         
-        print(f"Number of sensors: {len(sensor_lats)}")
-        print(f"Lat range: [{sensor_lats.min():.4f}, {sensor_lats.max():.4f}]")
-        print(f"Lon range: [{sensor_lons.min():.4f}, {sensor_lons.max():.4f}]")
+        logger.debug("Number of sensors: %s", len(sensor_lats))
+        logger.debug("Lat range: [%.4f, %.4f]", sensor_lats.min(), sensor_lats.max())
+        logger.debug("Lon range: [%.4f, %.4f]", sensor_lons.min(), sensor_lons.max())
         
         # Calculate metrics
+        aggregates = data_processor.get_sensor_aggregates('static_readings').set_index(DataProcessor.SENSOR_ID)
         sensor_metrics = {}
         for sensor_id in data_processor.static_sensors[DataProcessor.SENSOR_ID].unique():
-            sensor_readings = data_processor.static_readings[
-                data_processor.static_readings[DataProcessor.SENSOR_ID] == sensor_id
-            ][DataProcessor.VALUE]
-            
-            if len(sensor_readings) > 0:
+            if sensor_id in aggregates.index and aggregates.at[sensor_id, 'count'] > 0:
                 sensor_metrics[sensor_id] = {
-                    'avg': sensor_readings.mean(),
-                    'max': sensor_readings.max(),
-                    'std': sensor_readings.std()
+                    'avg': aggregates.at[sensor_id, 'mean'],
+                    'max': aggregates.at[sensor_id, 'max'],
+                    'std': aggregates.at[sensor_id, 'std']
                 }
                 
-        print(f"Calculated metrics for {len(sensor_metrics)} sensors")
+        logger.debug("Calculated metrics for %s sensors", len(sensor_metrics))
         
         # Set visualization parameters
         if metric == 'avg':
@@ -424,7 +471,7 @@ def update_static_heatmap(metric):
         lon_range = sensor_lons.max() - sensor_lons.min()
         zoom = min(10, max(8, -np.log2(max(lat_range, lon_range))))
         
-        print(f"Map center: ({center_lat:.4f}, {center_lon:.4f}), zoom: {zoom}")
+        logger.debug("Map center: (%.4f, %.4f), zoom: %s", center_lat, center_lon, zoom)
         
         # Update layout
         fig.update_layout(
@@ -442,14 +489,11 @@ def update_static_heatmap(metric):
             )
         )
         
-        print("Map update completed successfully")
+        logger.debug("Map update completed successfully")
         return fig
         
     except Exception as e:
-        print(f"\nERROR creating spatial distribution map: {str(e)}")
-        print("Full traceback:")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error creating spatial distribution map: %s", e)
         
         # Return a more informative error figure
         fig = go.Figure()
@@ -485,27 +529,29 @@ def update_static_overview_stats(active_tab, selected_sensors=None):
         raise PreventUpdate
         
     try:
-        if data_processor.static_readings is None or data_processor.static_sensors is None:
+        summary = data_processor.get_summary('static_readings')
+        if summary is None or data_processor.static_sensors is None:
             raise ValueError("Data not properly loaded")
             
-        # Filter data if specific sensors are selected
-        readings_df = data_processor.static_readings
+        # Per-sensor counts and moments; readings are only read for a sensor selection
+        aggregates = data_processor.get_sensor_aggregates('static_readings').set_index(DataProcessor.SENSOR_ID)
         if selected_sensors:
             if not isinstance(selected_sensors, list):
                 selected_sensors = [selected_sensors]
-            readings_df = readings_df[readings_df[DataProcessor.SENSOR_ID].isin(selected_sensors)]
+            readings_df = data_processor.get_sensor_readings('static_readings', selected_sensors)
+            n_readings = len(readings_df)
+            avg_radiation = readings_df[DataProcessor.VALUE].mean()
+            first, last = readings_df[DataProcessor.TIMESTAMP].min(), readings_df[DataProcessor.TIMESTAMP].max()
+        else:
+            n_readings = summary['rows']
+            avg_radiation = (aggregates['count'] * aggregates['mean']).sum() / aggregates['count'].sum()
+            first, last = summary['start'], summary['end']
         
         # Calculate basic stats
         n_sensors = len(selected_sensors) if selected_sensors else len(data_processor.static_sensors[DataProcessor.SENSOR_ID].unique())
-        n_readings = len(readings_df)
-        avg_radiation = readings_df[DataProcessor.VALUE].mean()
         
         # Time range calculation
-        time_range = pd.date_range(
-            readings_df[DataProcessor.TIMESTAMP].min(),
-            readings_df[DataProcessor.TIMESTAMP].max(),
-            freq='1H'
-        )
+        time_range = pd.date_range(first, last, freq='1H')
         
         # Quality score calculation
         sensor_scores = {}
@@ -514,16 +560,19 @@ def update_static_overview_stats(active_tab, selected_sensors=None):
         
         # Calculate per-sensor metrics
         for sensor_id in (selected_sensors or data_processor.static_sensors[DataProcessor.SENSOR_ID].unique()):
-            sensor_readings = readings_df[readings_df[DataProcessor.SENSOR_ID] == sensor_id]
+            if sensor_id in aggregates.index:
+                sensor_stats = aggregates.loc[sensor_id]
+            else:
+                sensor_stats = {'count': 0, 'mean': np.nan, 'std': np.nan}
             
             # Completeness (percentage of expected readings present)
             expected_readings = len(time_range)  # One reading per hour
-            actual_readings = len(sensor_readings)
+            actual_readings = sensor_stats['count']
             completeness = min(100, (actual_readings / expected_readings) * 100)
             
             # Consistency (based on variation from mean)
-            std_dev = sensor_readings[DataProcessor.VALUE].std()
-            mean_val = sensor_readings[DataProcessor.VALUE].mean()
+            std_dev = sensor_stats['std']
+            mean_val = sensor_stats['mean']
             if mean_val > 0:
                 cv = (std_dev / mean_val) * 100  # Coefficient of variation
                 consistency = 100 - min(100, cv)
@@ -566,7 +615,7 @@ def update_static_overview_stats(active_tab, selected_sensors=None):
         )
         
     except Exception as e:
-        print(f"Error updating static overview: {str(e)}")
+        logger.error("Error updating static overview: %s", e)
         return "N/A", "No readings available", "N/A", "N/A", "Data quality unavailable"
 
 
@@ -577,39 +626,35 @@ def update_static_overview_stats(active_tab, selected_sensors=None):
 )
 def update_temporal_patterns(pattern_type):
     try:
-        df = data_processor.static_readings.copy()
-        
         if pattern_type == 'daily':
-            df['period'] = df[DataProcessor.TIMESTAMP].dt.hour
+            period = 'hour'
             title = "Daily Radiation Patterns"
             xlabel = "Hour of Day"
             period_format = lambda x: f"{x:02d}:00"
             tick_angle = 45
         elif pattern_type == 'weekly':
-            df['period'] = df[DataProcessor.TIMESTAMP].dt.dayofweek
+            period = 'dayofweek'
             title = "Weekly Radiation Patterns"
             xlabel = "Day of Week"
             period_format = lambda x: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][x]
             tick_angle = 0
         else:  # monthly
-            df['period'] = df[DataProcessor.TIMESTAMP].dt.month
+            period = 'month'
             title = "Monthly Radiation Patterns"
             xlabel = "Month"
             period_format = lambda x: ['January', 'February', 'March', 'April', 'May', 'June', 
                                      'July', 'August', 'September', 'October', 'November', 'December'][x-1]
             tick_angle = 45
             
-        # Calculate statistics
-        stats = df.groupby('period').agg({
-            DataProcessor.VALUE: ['mean', 'std', 'min', 'max']
-        }).reset_index()
+        # Calculate statistics (merged from the hourly or daily rollups)
+        stats = data_processor.get_periodic_profile('static_readings', period)
         
         fig = go.Figure()
         
         # Add min/max range band
         fig.add_trace(go.Scatter(
             x=list(stats['period']) + list(stats['period'])[::-1],
-            y=list(stats[DataProcessor.VALUE]['max']) + list(stats[DataProcessor.VALUE]['min'])[::-1],
+            y=list(stats['max']) + list(stats['min'])[::-1],
             fill='toself',
             fillcolor='rgba(100,150,255,0.2)',
             line=dict(color='rgba(255,255,255,0)'),
@@ -620,8 +665,8 @@ def update_temporal_patterns(pattern_type):
         # Add standard deviation band
         fig.add_trace(go.Scatter(
             x=list(stats['period']) + list(stats['period'])[::-1],
-            y=list(stats[DataProcessor.VALUE]['mean'] + stats[DataProcessor.VALUE]['std']) + 
-              list(stats[DataProcessor.VALUE]['mean'] - stats[DataProcessor.VALUE]['std'])[::-1],
+            y=list(stats['mean'] + stats['std']) + 
+              list(stats['mean'] - stats['std'])[::-1],
             fill='toself',
             fillcolor='rgba(100,150,255,0.4)',
             line=dict(color='rgba(255,255,255,0)'),
@@ -632,7 +677,7 @@ def update_temporal_patterns(pattern_type):
         # Add mean line
         fig.add_trace(go.Scatter(
             x=stats['period'],
-            y=stats[DataProcessor.VALUE]['mean'],
+            y=stats['mean'],
             line=dict(color='rgb(0,100,255)', width=2),
             name='Average Radiation',
             showlegend=True
@@ -654,8 +699,8 @@ def update_temporal_patterns(pattern_type):
             yaxis=dict(
                 title="Radiation Level (cpm)",
                 range=[
-                    min(stats[DataProcessor.VALUE]['min']) * 0.95,
-                    max(stats[DataProcessor.VALUE]['max']) * 1.05
+                    min(stats['min']) * 0.95,
+                    max(stats['max']) * 1.05
                 ]
             ),
             hovermode='x unified',
@@ -667,7 +712,7 @@ def update_temporal_patterns(pattern_type):
         return fig
         
     except Exception as e:
-        print(f"Error creating temporal patterns: {str(e)}")
+        logger.error("Error creating temporal patterns: %s", e)
         return go.Figure()
     
     
@@ -688,21 +733,28 @@ def update_temporal_patterns(pattern_type):
      Input('animation-speed', 'value')]
 )
 def update_analysis_view(active_layers, start_date, end_date, time_agg, animation_speed):
-    print("\n=== Analysis View Update ===")
+    logger.debug("Analysis View Update")
     try:
         # Initialize map
         map_viz = MapVisualizer()
         fig = map_viz.create_base_map(active_layers=active_layers)
         
         if active_layers:
+            # One animation frame per bucket: coarsen the aggregation when the range holds too many
+            plan = data_processor.plan_buckets(
+                'static_readings', time_agg, start_date, end_date,
+                max_points=data_processor.ANIMATION_FRAME_BUDGET
+            )
+            time_agg = plan['freq']
+            
             # Filter data by time range
-            static_data = data_processor.filter_time_range(
-                data_processor.static_readings, 
+            static_data = data_processor.get_window(
+                'static_readings', 
                 start_date, 
                 end_date
             )
-            mobile_data = data_processor.filter_time_range(
-                data_processor.mobile_readings, 
+            mobile_data = data_processor.get_window(
+                'mobile_readings', 
                 start_date, 
                 end_date
             )
@@ -716,7 +768,10 @@ def update_analysis_view(active_layers, start_date, end_date, time_agg, animatio
                     'static',
                     time_agg,
                     animation_speed,
-                    active_layers
+                    active_layers,
+                    buckets=data_processor.get_bucketed_averages(
+                        'static_readings', time_agg, start_date, end_date, by_sensor=True
+                    )
                 )
                 
             if 'mobile' in active_layers or 'mobile_heatmap' in active_layers:
@@ -731,22 +786,20 @@ def update_analysis_view(active_layers, start_date, end_date, time_agg, animatio
                 )
             
             # Calculate statistics
-            stats = data_processor.calculate_period_statistics(static_data, mobile_data)
-            stats_display = create_stats_display(stats)
+            stats = data_processor.calculate_period_statistics(start_date, end_date)
+            stats_display = create_stats_display(stats, plan['label'])
         else:
             stats_display = "No layers selected"
         
         return fig, stats_display
         
     except Exception as e:
-        print(f"ERROR in analysis view: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error in analysis view: %s", e)
         raise
 
-def create_stats_display(stats):
+def create_stats_display(stats, frames_label=None):
     """Create HTML elements for statistics display"""
-    return html.Div([
+    children = [
         dbc.Row([
             dbc.Col([
                 html.H5("Static Sensors"),
@@ -762,7 +815,10 @@ def create_stats_display(stats):
                 html.P(f"Active Sensors: {stats['unique_mobile_sensors']}")
             ], width=6)
         ])
-    ])
+    ]
+    if frames_label:
+        children.append(html.Small(f"Map frames: {frames_label}", className="text-muted"))
+    return html.Div(children)
 
 @app.callback(
     [Output('affected-areas-map', 'figure'),
@@ -774,13 +830,13 @@ def create_stats_display(stats):
 def update_affected_areas_analysis(threshold_range, start_date, end_date):
     """Update the affected areas map and statistics based on the threshold range"""
     # Filter data for the selected time period
-    filtered_static = data_processor.filter_time_range(
-        data_processor.static_readings,
+    filtered_static = data_processor.get_window(
+        'static_readings',
         start_date,
         end_date
     )
-    filtered_mobile = data_processor.filter_time_range(
-        data_processor.mobile_readings,
+    filtered_mobile = data_processor.get_window(
+        'mobile_readings',
         start_date,
         end_date
     )
@@ -843,25 +899,24 @@ def update_affected_areas_analysis(threshold_range, start_date, end_date):
 )
 def update_coverage_analysis(start_date, end_date):
     """Update the coverage analysis map"""
-    print("\n=== Coverage Analysis Callback Triggered ===")
-    print(f"Date range: {start_date} to {end_date}")
+    logger.debug("Coverage Analysis Callback Triggered")
+    logger.debug("Date range: %s to %s", start_date, end_date)
     
     try:
         # Filter data for time period
-        filtered_static = data_processor.filter_time_range(
-            data_processor.static_readings,
+        filtered_static = data_processor.get_window(
+            'static_readings',
             start_date,
             end_date
         )
-        filtered_mobile = data_processor.filter_time_range(
-            data_processor.mobile_readings,
+        filtered_mobile = data_processor.get_window(
+            'mobile_readings',
             start_date,
             end_date
         )
         
-        print(f"\nFiltered data stats:")
-        print(f"Static readings: {len(filtered_static)} records")
-        print(f"Mobile readings: {len(filtered_mobile)} records")
+        logger.debug("Filtered data: %s static readings, %s mobile readings",
+                     len(filtered_static), len(filtered_mobile))
         
         # Create map
         map_viz = MapVisualizer()
@@ -872,9 +927,7 @@ def update_coverage_analysis(start_date, end_date):
         )
         
     except Exception as e:
-        print(f"ERROR in coverage analysis callback: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error in coverage analysis callback: %s", e)
         map_viz = MapVisualizer()
         return map_viz.create_base_map(['boundaries'])
 
@@ -897,4 +950,7 @@ def create_error_message_map(message):
     return fig
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves requests
+    if loading_success and args.lazy and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        data_processor.start_background_warmup(wait_for=('127.0.0.1', args.port))
+    app.run_server(debug=True, port=args.port)
\ No newline at end of file
@@ -0,0 +1,149 @@
+# app/utils/audit.py
+import logging
+import threading
+import time
+from collections import deque
+import pandas as pd
+from .provenance import REMOVAL_REASONS
+
+LOGGER_NAME = 'radwatch'
+DEFAULT_LOG_LEVEL = 'WARNING'
+
+# Reason labels in code order, 'kept' first
+REASON_LABELS = [REMOVAL_REASONS[code] for code in sorted(REMOVAL_REASONS)]
+
+
+def get_logger(name):
+    """Logger for one module, under the application's 'radwatch' logger"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Passes at most ``burst`` records per message template and ``interval`` seconds.
+
+    Records are grouped by logger and unformatted message, so callers should
+    pass values as logging arguments rather than pre-formatting them. The
+    number of records suppressed is appended to the next one let through.
+    """
+
+    def __init__(self, interval=10.0, burst=5):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows = {}  # (logger, template) -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+def configure_logging(level=DEFAULT_LOG_LEVEL, interval=10.0, burst=5):
+    """
+    Send the application's log records to stderr with a level and a rate limit
+
+    Args:
+        level (str or int): Lowest level emitted, e.g. 'DEBUG', 'INFO' or 'WARNING'
+        interval (float): Seconds per rate-limit window
+        burst (int): Records passed per message template and window
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handler.addFilter(RateLimitFilter(interval, burst))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return logger
+
+
+class CleaningAudit:
+    """
+    Queryable record of what ingest and cleaning did in this process.
+
+    Holds, per dataset, the number of rows of every sensor per removal reason
+    ('kept' included), refreshed from the dataset's CleaningProvenance whenever
+    it is loaded or extended, plus a bounded log of structured events (dataset
+    loads, appended batches and their per-reason row counts).
+    """
+    logger = get_logger('audit')
+
+    def __init__(self, max_events=500):
+        self._counts = {}  # dataset -> DataFrame, sensor x reason label
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def update(self, dataset, provenance):
+        """
+        Refresh a dataset's counters from its provenance
+
+        Returns:
+            dict: Reason label -> rows added since the previous update
+        """
+        counts = provenance.reason_counts()
+        with self._lock:
+            previous = self._counts.get(dataset)
+            self._counts[dataset] = counts
+        before = previous.sum() if previous is not None else pd.Series(0, index=REASON_LABELS)
+        return {label: int(counts[label].sum() - before[label]) for label in REASON_LABELS}
+
+    def record_event(self, event, **fields):
+        """Append a structured event (a dict with 'time' and 'event' plus ``fields``)"""
+        entry = {'time': pd.Timestamp.now(), 'event': event, **fields}
+        with self._lock:
+            self._events.append(entry)
+        self.logger.debug("%s %s", event, fields)
+        return entry
+
+    def counts(self, dataset=None, sensor_id=None):
+        """
+        Row counters per removal reason
+
+        Args:
+            dataset (str): Dataset to report per sensor (all datasets, totalled, when None)
+            sensor_id: Sensor to report (requires ``dataset``)
+
+        Returns:
+            pd.DataFrame or dict: Datasets x reasons when ``dataset`` is None, sensors x
+                reasons for one dataset, or reason -> rows for one sensor
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        if dataset is None:
+            return pd.DataFrame(
+                {name: frame.sum() for name, frame in counts.items()}, index=REASON_LABELS
+            ).T.rename_axis('dataset')
+        frame = counts.get(dataset, pd.DataFrame(columns=REASON_LABELS, dtype='int64'))
+        if sensor_id is None:
+            return frame
+        if sensor_id not in frame.index:
+            return {label: 0 for label in REASON_LABELS}
+        return {label: int(value) for label, value in frame.loc[sensor_id].items()}
+
+    def events(self, event=None, limit=None):
+        """
+        Recorded events, oldest first
+
+        Args:
+            event (str): Only events of this kind
+            limit (int): Only the most recent ``limit`` events
+        """
+        with self._lock:
+            events = [entry for entry in self._events if event is None or entry['event'] == event]
+        return events[-limit:] if limit else events
+
@@ -0,0 +1,318 @@
+# app/utils/cleaning.py
+import numpy as np
+import pandas as pd
+from .provenance import OUT_OF_RANGE, NO_PREVIOUS_READING, RATE_OF_CHANGE, IQR_OUTLIER
+from .quantiles import KLLSketch
+from .audit import get_logger
+
+logger = get_logger('cleaning')
+
+
+def clean_readings(sensors, timestamps, values, min_value, max_value, max_rate_of_change, iqr_multiplier,
+                   sketch_size=None):
+    """
+    Flag every reading with the reason the cleaning pass removes it, in one pass over arrays
+
+    Applies the range check, the per-sensor rate-of-change check over readings
+    ordered by sensor and time, and the IQR outlier check on what survives,
+    computing each test as a NumPy operation on the sorted columns instead of
+    filtering intermediate frames.
+
+    With ``sketch_size`` the IQR bounds come from a KLLSketch of that size
+    instead of exact quantiles: the summary kept for incremental cleaning then
+    stays a few thousand values however many
+    distinct readings there are, at a quantile rank error within
+    2.5 / ``sketch_size`` with high probability.
+
+    Args:
+        sensors, timestamps, values (pd.Series): Columns of the raw readings
+        min_value, max_value (float): Valid value range
+        max_rate_of_change (float): Largest allowed change from a sensor's previous in-range reading
+        iqr_multiplier (float): Readings beyond Q1/Q3 -/+ this many IQRs are outliers
+        sketch_size (int): KLL sketch parameter k for approximate IQR bounds (None for exact)
+
+    Returns:
+        dict: 'reasons' (uint8 removal-reason code per row, KEPT for survivors),
+            'kept' (positions of the surviving rows in sensor/time order),
+            'last' (positions of each sensor's last in-range reading, in sensor order),
+            'spike_free' (values that passed the rate check, before the IQR check) and
+            'summary' (KLLSketch of 'spike_free' with ``sketch_size``, else None)
+    """
+    values = values.to_numpy()
+    sensor_keys, missing_sensor = _sort_key(sensors)
+    time_keys, _ = _sort_key(timestamps)
+    limits = (min_value, max_value, max_rate_of_change)
+
+    checked = _check_rows(sensor_keys, time_keys, values, missing_sensor, *limits)
+    del sensor_keys, time_keys
+    summary = None
+    if sketch_size is not None:
+        summary = KLLSketch(sketch_size, seed=0).update(checked['spike_free'])
+
+    reasons = np.zeros(len(values), dtype=np.uint8)
+    reasons[checked['out_of_range']] = OUT_OF_RANGE
+    reasons[checked['no_previous']] = NO_PREVIOUS_READING
+    reasons[checked['rate_of_change']] = RATE_OF_CHANGE
+    survivors, spike_free, last = checked['survivors'], checked['spike_free'], checked['last']
+    del checked
+
+    if summary is not None:
+        q1, q3 = summary.quantile(0.25), summary.quantile(0.75)
+    else:
+        # pd.Series.quantile, so the bounds are bit-for-bit those of the frame-based pipeline
+        spike_free_series = pd.Series(spike_free, copy=False)
+        q1, q3 = spike_free_series.quantile(0.25), spike_free_series.quantile(0.75)
+    iqr = q3 - q1
+    inside = (spike_free >= q1 - iqr_multiplier * iqr) & (spike_free <= q3 + iqr_multiplier * iqr)
+    reasons[survivors[~inside]] = IQR_OUTLIER
+
+    return {
+        'reasons': reasons,
+        'kept': survivors[inside],
+        'last': last,
+        'spike_free': spike_free,
+        'summary': summary
+    }
+
+
+def _check_rows(sensor_keys, time_keys, values, missing_sensor, min_value, max_value, max_rate_of_change):
+    """
+    Range and rate-of-change checks over every row
+
+    Returns:
+        dict: Positions removed per reason ('out_of_range', 'no_previous',
+            'rate_of_change'), surviving positions in sensor/time order with their
+            values ('survivors', 'spike_free') and each sensor's last in-range
+            position ('last')
+    """
+    in_range = (values >= min_value) & (values <= max_value)
+    out_of_range = np.flatnonzero(~in_range)
+    candidates = np.flatnonzero(in_range)
+    del in_range
+    order = candidates[_lexsort(sensor_keys, time_keys, candidates)]
+    del candidates
+    ordered_sensors = sensor_keys[order]
+
+    # A reading has a previous one when the row before it in sorted order is the same sensor
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ordered_sensors[1:] != ordered_sensors[:-1]
+    if missing_sensor is not None:
+        first |= missing_sensor[order]  # No group, as with groupby's dropna
+
+    ordered_values = values[order]
+    change = np.empty(len(order), dtype=ordered_values.dtype)
+    change[0:1] = 0
+    np.subtract(ordered_values[1:], ordered_values[:-1], out=change[1:])
+    passed = ~first & (np.abs(change) <= max_rate_of_change)
+    del change
+
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = ordered_sensors[:-1] != ordered_sensors[1:]
+    if missing_sensor is not None:
+        last &= ~missing_sensor[order]
+    del ordered_sensors
+
+    return {
+        'out_of_range': out_of_range,
+        'no_previous': order[~passed & first],
+        'rate_of_change': order[~passed & ~first],
+        'survivors': order[passed],
+        'spike_free': ordered_values[passed],
+        'last': order[last]
+    }
+
+
+class StreamingCleaner:
+    """
+    Cleans readings arriving in micro-batches with the same tests as clean_readings.
+
+    Keeps the last in-range value and timestamp of every sensor seen, so the
+    first reading of a sensor in a batch is checked against the sensor's
+    previous one, and a KLLSketch of the values that passed the rate check for
+    the IQR bounds. Each batch costs time proportional to its own size, and
+    memory is bounded by the number of sensors plus the sketch.
+
+    Fed the rows of a batch-cleaned file in one micro-batch, the result is
+    identical to clean_readings as long as the sketch is still exact (at most
+    ``sketch_size`` values passed the rate check); past that the IQR bounds are
+    quantiles within the sketch's rank error. Over several batches the bounds
+    are those of the values seen so far rather than of the whole file. A late
+    reading, older than the sensor's last one, is checked against that last
+    reading and does not replace it.
+    """
+
+    def __init__(self, min_value, max_value, max_rate_of_change, iqr_multiplier, sketch_size=1000,
+                 sensor_column='sensor_id', timestamp_column='timestamp', value_column='value'):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.max_rate_of_change = max_rate_of_change
+        self.iqr_multiplier = iqr_multiplier
+        self.sensor_column = sensor_column
+        self.timestamp_column = timestamp_column
+        self.value_column = value_column
+        self.sketch = KLLSketch(sketch_size, seed=0)  # Seeded so reruns clean identically
+        self.rows_seen = 0
+        self._slots = {}  # sensor id -> position in the per-sensor arrays
+        self._last_values = np.zeros(0, dtype=np.float64)
+        self._last_times = np.zeros(0, dtype=np.int64)
+
+    def clean(self, batch):
+        """
+        Clean the next micro-batch
+
+        Args:
+            batch (pd.DataFrame): New raw readings
+
+        Returns:
+            tuple: (kept rows ordered by sensor and time, uint8 removal-reason code per batch row)
+        """
+        reasons = np.zeros(len(batch), dtype=np.uint8)
+        self.rows_seen += len(batch)
+        if len(batch) == 0:
+            return batch, reasons
+
+        values = batch[self.value_column].to_numpy()
+        in_range = (values >= self.min_value) & (values <= self.max_value)
+        reasons[~in_range] = OUT_OF_RANGE
+        candidates = np.flatnonzero(in_range)
+
+        sensor_keys, missing_sensor = _sort_key(batch[self.sensor_column])
+        time_keys, _ = _sort_key(batch[self.timestamp_column])
+        order = candidates[_lexsort(sensor_keys, time_keys, candidates)]
+        ordered_sensors = sensor_keys[order]
+        ordered_values = values[order]
+
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ordered_sensors[1:] != ordered_sensors[:-1]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = ordered_sensors[:-1] != ordered_sensors[1:]
+        if missing_sensor is not None:
+            first |= missing_sensor[order]
+            last &= ~missing_sensor[order]
+
+        # Within the batch a reading follows the previous row of its sensor; a sensor's
+        # first reading in the batch follows the last one from earlier batches
+        previous = np.empty(len(order), dtype=values.dtype)
+        previous[1:] = ordered_values[:-1]
+        ids = batch[self.sensor_column].to_numpy()
+        starts = np.flatnonzero(first)
+        slots = np.array([self._slots.get(sensor, -1) for sensor in ids[order[starts]]], dtype=np.int64)
+        if missing_sensor is not None:
+            slots[missing_sensor[order[starts]]] = -1
+        carried = np.full(len(starts), np.nan)
+        known = slots >= 0
+        carried[known] = self._last_values[slots[known]]
+        previous[starts] = carried.astype(values.dtype)
+
+        passed = np.abs(ordered_values - previous) <= self.max_rate_of_change
+        no_previous = np.isnan(previous)
+        reasons[order[~passed & no_previous]] = NO_PREVIOUS_READING
+        reasons[order[~passed & ~no_previous]] = RATE_OF_CHANGE
+        # NaT becomes the smallest int64, so it never displaces a timestamped reading
+        times = batch[self.timestamp_column].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        self._remember(ids[order[last]], ordered_values[last], times[order[last]])
+
+        spike_free = ordered_values[passed]
+        survivors = order[passed]
+        self.sketch.update(spike_free)
+        lower, upper = self.bounds()
+        inside = (spike_free >= lower) & (spike_free <= upper)
+        reasons[survivors[~inside]] = IQR_OUTLIER
+        return batch.take(survivors[inside]), reasons
+
+    def bounds(self):
+        """Current (lower, upper) IQR bounds"""
+        q1, q3 = self.sketch.quantile(0.25), self.sketch.quantile(0.75)
+        iqr = q3 - q1
+        return q1 - self.iqr_multiplier * iqr, q3 + self.iqr_multiplier * iqr
+
+    @property
+    def last_values(self):
+        """Sensor -> last in-range value"""
+        return pd.Series(self._last_values[list(self._slots.values())], index=list(self._slots),
+                         name=self.value_column)
+
+    def _remember(self, sensors, values, times):
+        """Record each sensor's latest in-range reading unless an earlier batch had a later one"""
+        for sensor, value, time in zip(sensors, values, times):
+            slot = self._slots.get(sensor)
+            if slot is None:
+                slot = self._slots[sensor] = len(self._slots)
+                if slot == len(self._last_values):
+                    size = max(16, 2 * slot)
+                    self._last_values = np.resize(self._last_values, size)
+                    self._last_times = np.resize(self._last_times, size)
+            elif time < self._last_times[slot]:
+                continue
+            self._last_values[slot] = value
+            self._last_times[slot] = time
+
+
+def removal_counts(reasons):
+    """Number of rows per removal-reason code"""
+    return np.bincount(reasons, minlength=IQR_OUTLIER + 1)
+
+
+def _lexsort(primary, secondary, positions):
+    """
+    np.lexsort((secondary[positions], primary[positions])), faster and with fewer temporaries
+
+    Both int64 keys are packed into one when their ranges allow it. The packed
+    key is sorted with NumPy's default (unstable, vectorized) sort, and only runs
+    of equal keys are then put back into input order.
+    """
+    if len(positions) == 0:
+        return np.zeros(0, dtype=np.intp)
+    primary_min, secondary_min = int(primary.min()), int(secondary.min())
+    secondary_span = int(secondary.max()) - secondary_min + 1
+    if (int(primary.max()) - primary_min + 1) * secondary_span >= 2 ** 63:
+        return np.lexsort((secondary[positions], primary[positions]))
+
+    keys = primary[positions]
+    keys -= primary_min
+    keys *= secondary_span
+    keys += secondary[positions]
+    keys -= secondary_min
+    order = np.argsort(keys)
+    keys = keys[order]
+    tied = keys[1:] == keys[:-1]
+    del keys
+    if tied.any():
+        in_run = np.zeros(len(order), dtype=bool)
+        in_run[1:] = tied
+        in_run[:-1] |= tied
+        starts = in_run.copy()
+        starts[1:] &= ~tied
+        members = np.flatnonzero(in_run)
+        # Rows are unique by (run, position), so the unstable sort is exact here
+        run = np.cumsum(starts[members]) - 1
+        ranks = order[members]
+        order[members] = ranks[np.argsort(run * len(order) + ranks)]
+    return order
+
+
+def _sort_key(column):
+    """
+    Integer key ordering a column like sort_values does, and its missing-value mask
+
+    Returns:
+        tuple: (int64 keys with missing values last, bool mask of missing values or None)
+    """
+    if pd.api.types.is_integer_dtype(column.dtype) and not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.to_numpy(dtype=np.int64, copy=False), None
+    if pd.api.types.is_datetime64_dtype(column.dtype):
+        keys = column.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        missing = np.isnat(keys.view('datetime64[ns]'))
+        if not missing.any():
+            return keys, None
+        keys = keys.copy()
+        keys[missing] = keys[~missing].max() + 1 if not missing.all() else 0
+        return keys, missing
+
+    codes, _ = pd.factorize(column, sort=True)
+    codes = codes.astype(np.int64, copy=False)
+    missing = codes < 0
+    if not missing.any():
+        return codes, None
+    codes[missing] = codes.max() + 1
+    return codes, missing
@@ -0,0 +1,201 @@
+# app/utils/column_store.py
+import json
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from .snapshot_cache import _jsonable
+from .audit import get_logger
+
+logger = get_logger('column_store')
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+
+class ColumnStore:
+    """
+    Cleaned datasets stored as one ``.npy`` file per column, shared between processes.
+
+    Every server worker attaches to the same files with ``np.load(mmap_mode='r')``,
+    so the pages holding the columns come from the OS page cache and are shared
+    instead of each worker holding a private copy. Attached frames are read-only:
+    any attempt to modify their values in place raises.
+
+    The interface mirrors SnapshotCache: an entry holds one or more frames plus
+    a manifest recording the size and mtime of the source files (taken before
+    they were read) and the build parameters, and is only served while those
+    still match. Each store writes a
+    new generation directory and switches the manifest to it last, so workers
+    attached to an older generation keep working.
+    """
+    MANIFEST = 'manifest.json'
+    INDEX_FILE = '__index__'
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+    def load(self, name, source_paths, params=None, sizes=None):
+        """
+        Attach to a stored entry if it is still valid for its sources
+
+        Args:
+            name (str): Entry name, e.g. 'static_readings'
+            source_paths (list): Files the entry was built from
+            params (dict): Build parameters that must match the stored ones
+            sizes (dict): Path -> number of leading bytes the caller reads
+                (defaults to the current sizes)
+
+        Returns:
+            dict: Frame name -> read-only DataFrame backed by memory maps, or None
+        """
+        manifest = self._read_manifest(name)
+        if manifest is None or manifest.get('params') != _jsonable(params):
+            return None
+        if manifest.get('sources') != self.fingerprint(source_paths, sizes):
+            return None
+
+        generation_dir = os.path.join(self._entry_dir(name), manifest['generation'])
+        try:
+            return {
+                frame: self._attach_frame(os.path.join(generation_dir, frame), layout)
+                for frame, layout in manifest['frames'].items()
+            }
+        except Exception as e:
+            logger.warning("Could not attach column store entry %s: %s", name, e)
+            return None
+
+    def store(self, name, sources, frames, params=None):
+        """
+        Write frames as column files, replacing any previous generation of the entry
+
+        Args:
+            name (str): Entry name
+            sources (dict): fingerprint() of the files the frames were built from,
+                taken before they were read
+            frames (dict): Frame name -> DataFrame
+            params (dict): Build parameters to record with the entry
+        """
+        entry_dir = self._entry_dir(name)
+        generation = uuid.uuid4().hex
+        generation_dir = os.path.join(entry_dir, generation)
+
+        try:
+            layouts = {
+                frame: self._write_frame(os.path.join(generation_dir, frame), df)
+                for frame, df in frames.items()
+            }
+            previous = self._read_manifest(name)
+
+            # Manifest goes last so a partially written generation is never attached
+            self._write_manifest(name, {
+                'sources': sources,
+                'params': _jsonable(params),
+                'generation': generation,
+                'frames': layouts
+            })
+        except Exception as e:
+            logger.warning("Could not write %s to column store: %s", name, e)
+            shutil.rmtree(generation_dir, ignore_errors=True)
+            return
+
+        # Removing the files does not disturb workers that still have them mapped
+        if previous is not None and previous.get('generation') != generation:
+            shutil.rmtree(os.path.join(entry_dir, previous['generation']), ignore_errors=True)
+
+    @contextmanager
+    def lock(self, name):
+        """
+        Hold an exclusive inter-process lock on an entry
+
+        Lets one worker build an entry while the others wait and then attach to it.
+        """
+        entry_dir = self._entry_dir(name)
+        os.makedirs(entry_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(entry_dir, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_frame(self, frame_dir, df):
+        """Save each column (and the index) of a frame; return its layout for the manifest"""
+        os.makedirs(frame_dir, exist_ok=True)
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            entry = {'name': col, 'file': f"{i}.npy"}
+            if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+                # Strings are stored as integer codes plus the category labels
+                categorical = pd.Categorical(series)
+                entry['categories'] = categorical.categories.tolist()
+                values = categorical.codes
+            else:
+                values = series.to_numpy()
+            np.save(os.path.join(frame_dir, entry['file']), values)
+            columns.append(entry)
+
+        np.save(os.path.join(frame_dir, f"{self.INDEX_FILE}.npy"), df.index.to_numpy())
+        return {'columns': columns, 'index_name': df.index.name}
+
+    def _attach_frame(self, frame_dir, layout):
+        """Rebuild a frame from memory-mapped column files without copying them"""
+        data = {}
+        for entry in layout['columns']:
+            values = self._map(os.path.join(frame_dir, entry['file']))
+            if 'categories' in entry:
+                values = pd.Categorical.from_codes(values, entry['categories'], validate=False)
+            data[entry['name']] = values
+
+        index = pd.Index(
+            self._map(os.path.join(frame_dir, f"{self.INDEX_FILE}.npy")),
+            name=layout['index_name'],
+            copy=False
+        )
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def _map(self, path):
+        """Memory-map a column file read-only, as a plain ndarray view of the mapping"""
+        return np.load(path, mmap_mode='r').view(np.ndarray)
+
+    def fingerprint(self, source_paths, sizes=None):
+        """
+        Size and mtime of source files, to pass to store()
+
+        Args:
+            source_paths (list): Files the entry is built from
+            sizes (dict): Path -> number of leading bytes the entry is built from
+                (defaults to the current sizes)
+        """
+        sources = {}
+        for path in source_paths:
+            stat = os.stat(path)
+            sources[path] = {'size': (sizes or {}).get(path, stat.st_size), 'mtime_ns': stat.st_mtime_ns}
+        return sources
+
+    def _entry_dir(self, name):
+        return os.path.join(self.store_dir, name)
+
+    def _read_manifest(self, name):
+        try:
+            with open(os.path.join(self._entry_dir(name), self.MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, name, manifest):
+        path = os.path.join(self._entry_dir(name), self.MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
@@ -1,8 +1,86 @@
 import pandas as pd
 import numpy as np
+import io
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-import geopandas as gpd
-from shapely.geometry import Point
+from .snapshot_cache import SnapshotCache
+from .column_store import ColumnStore
+from .geometry import SHAPEFILE_PATH, NeighborhoodGeometry, get_geometry
+from .partitions import PartitionStore
+from .sql_backend import SQLBackend, DEFAULT_ENGINE
+from .timestamps import detect_timestamp_format, parse_timestamps
+from .time_index import TimeIndex, append_by_time, sort_by_time
+from .sensor_index import SensorIndex
+from .range_stats import RangeStats
+from .quantile_cube import QuantileCube
+from .distinct_cube import DistinctCube
+from .rollups import RollupCube, bucket_width
+from .window_cache import WindowCache
+from .quantiles import ExactQuantileSummary, KLLSketch
+from .cleaning import StreamingCleaner, clean_readings, removal_counts
+from .provenance import (
+    CleaningProvenance, OUT_OF_RANGE, NO_PREVIOUS_READING, RATE_OF_CHANGE, IQR_OUTLIER
+)
+from .audit import CleaningAudit, get_logger
+
+logger = get_logger('data_processing')
+
+
+class _LazyDataset:
+    """
+    DataProcessor attribute holding one dataset.
+
+    Reading the attribute loads the dataset on first access once load_data()
+    has registered its loader; assigning it replaces the loaded value.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.name not in obj._datasets and self.name in obj._loaders:
+            return obj._materialize(self.name)
+        return obj._datasets.get(self.name)
+
+    def __set__(self, obj, value):
+        obj._datasets[self.name] = value
+        obj._time_indexes.pop(self.name, None)
+        obj._sensor_indexes.pop(self.name, None)
+        obj._range_stats.pop(self.name, None)
+        obj._quantile_cubes.pop(self.name, None)
+        obj._distinct_cubes.pop(self.name, None)
+        obj._windows.discard(self.name)
+
+
+class _SourcePrefix(io.RawIOBase):
+    """
+    The first ``size`` bytes of a file as a readable binary stream.
+
+    Lets a readings file that is still being appended to be parsed only up to
+    the offset recorded for it, leaving later rows to ingest_new_rows().
+    """
+    def __init__(self, path, size):
+        self._file = open(path, 'rb')
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._file.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= count
+        return count
+
+    def close(self):
+        self._file.close()
+        super().close()
+
 
 class DataProcessor:
     # Class-level constants
@@ -18,165 +96,1547 @@ class DataProcessor:
     MIN_VALID_VALUE = 0.0  # Minimum valid radiation reading
     MAX_VALID_VALUE = 100.0  # Maximum valid radiation reading
     MAX_RATE_OF_CHANGE = 50.0  # Maximum allowed change between consecutive readings
+    IQR_MULTIPLIER = 1.5  # Readings beyond Q1/Q3 -/+ this many IQRs are outliers
+    STREAMING_SKETCH_SIZE = 1000  # KLL sketch parameter k of StreamingCleaner (rank error within 2.5/k w.h.p.)
+    IQR_SKETCH_SIZE = None  # KLL sketch parameter k for the IQR bounds of full loads (None: exact quantiles)
+    QUANTILE_SKETCH_SIZE = 200  # KLL sketch parameter k of the per-sensor, per-bucket value sketches
+    EXACT_QUANTILES = False  # Compute window medians from the rows instead of the sketches
+    EXACT_MEDIAN_ROWS = 50_000  # Windows with at most this many rows get exact medians
+    DISTINCT_SKETCH_PRECISION = 12  # HyperLogLog registers (2**p) of the per-bucket distinct counters
+    DISTINCT_EXACT_ROWS = 50_000  # Windows with at most this many rows get exact distinct counts
+    LOCATION_DECIMALS = 4  # Coordinates are rounded to this many decimals (~11 m) for distinct locations
+    
+    # Time buckets charts are planned for (see plan_buckets)
+    CHART_POINT_BUDGET = 1000  # Points per line chart, about its width in pixels
+    ANIMATION_FRAME_BUDGET = 200  # Frames per animated map
+    PLANNER_FREQS = ['1min', '5min', '15min', '30min', '1h', '2h', '4h', '6h', '12h', '1D']  # Widths to coarsen to
+    
+    # Rows per chunk for streaming ingest (None reads each file in one go)
+    CHUNK_SIZE = None
+    
+    # Run the independent startup stages (CSV reads, shapefile, cleaning) concurrently
+    PARALLEL_STARTUP = True
+    
+    # Data source paths (relative to the app directory)
+    STATIC_SENSORS_PATH = '../data/StaticSensorLocations.csv'
+    STATIC_READINGS_PATH = '../data/StaticSensorReadings.csv'
+    MOBILE_READINGS_PATH = '../data/MobileSensorReadings.csv'
+    SHAPEFILE_PATH = SHAPEFILE_PATH
+    
+    # Snapshot cache of cleaned readings
+    CACHE_DIR = '../data/.cache'
+    CACHE_VERSION = 9  # Bump when the cleaning pipeline or schema changes
+    
+    # Directory of memory-mapped cleaned columns shared by all server workers (None disables)
+    COLUMN_STORE_DIR = os.environ.get('RADWATCH_COLUMN_STORE')
+    
+    # Day-partitioned storage of cleaned readings for time-range queries
+    PARTITION_DIR = '../data/.partitions'
+    PARTITION_CACHE_BYTES = 256 * 1024 * 1024  # Partitions kept in memory before the coldest are evicted
+    WINDOW_CACHE_ENTRIES = 32  # Filtered date-range windows shared between callbacks
+    
+    # Embedded SQL database (DuckDB, else SQLite) holding cleaned readings for queries
+    SQL_DB_PATH = f'../data/.cache/readings.{DEFAULT_ENGINE}'
+    
+    # Datasets, in the order load_data() materializes them
+    DATASETS = ['static_sensors', 'static_readings', 'mobile_readings', 'gdf']
+    READINGS_DATASETS = ['static_readings', 'mobile_readings']
+    
+    # Compact in-memory schema applied at ingest; readings values are only
+    # downcast once cleaned, so the cleaning thresholds see the parsed float64 values
+    CATEGORY_COLUMNS = [USER_ID, UNITS]
+    FLOAT32_COLUMNS = [VALUE, LATITUDE, LONGITUDE]
+    
+    # Raw column name -> standardized column name
+    COLUMN_MAP = {
+        'Sensor-id': SENSOR_ID,
+        'Timestamp': TIMESTAMP,
+        'User-id': USER_ID,
+        'Value': VALUE,
+        'Units': UNITS,
+        'Lat': LATITUDE,
+        'Long': LONGITUDE,
+        'Latitude': LATITUDE,
+        'Longitude': LONGITUDE
+    }
+    
+    # Loaded on first access (see load_data)
+    static_sensors = _LazyDataset()
+    static_readings = _LazyDataset()
+    mobile_readings = _LazyDataset()
+    gdf = _LazyDataset()
     
     def __init__(self):
-        self.static_sensors = None
-        self.static_readings = None
-        self.mobile_readings = None
-        self.start_date = None
-        self.end_date = None
-        self.gdf = None
-        
-        try:
-            self.gdf = gpd.read_file('../data/StHimarkNeighborhoodShapefile/StHimark.shp')
-            if self.gdf.crs != 'EPSG:4326':
-                self.gdf = self.gdf.to_crs('EPSG:4326')
-        except Exception as e:
-            print(f"Warning: Could not load neighborhood shapefile: {str(e)}")
-            self.gdf = None
+        self._datasets = {}  # dataset name -> loaded value
+        self._loaders = {}  # dataset name -> loader registered by load_data()
+        self._dataset_locks = {name: threading.Lock() for name in self.DATASETS}
+        self._summaries = {}  # readings dataset name -> row counts and time range
+        self._sensor_summaries = {}  # readings dataset name -> per-sensor moments and latest reading
+        self._time_indexes = {}  # readings dataset name -> TimeIndex of the loaded frame
+        self._sensor_indexes = {}  # readings dataset name -> SensorIndex of the loaded frame
+        self._range_stats = {}  # readings dataset name -> RangeStats of the loaded frame
+        self._quantile_cubes = {}  # readings dataset name -> QuantileCube of the loaded frame
+        self._exact_quantiles = self.EXACT_QUANTILES
+        self._distinct_cubes = {}  # readings dataset name -> DistinctCube of the loaded frame
+        self._rollups = {}  # readings dataset name -> RollupCube of per-sensor bucket moments
+        self._windows = WindowCache(self.WINDOW_CACHE_ENTRIES)  # (name, start, end, data_version) -> window
+        self._column_store = None
+        self._readings_store = None  # PartitionStore or SQLBackend holding the readings
+        self._store_builders = {}  # readings dataset name -> builder of the cleaned frame
+        self._store_locks = {name: threading.Lock() for name in self.READINGS_DATASETS}
+        self._stores_ready = set()
+        self._timestamp_formats = {}  # source path -> detected timestamp format
+        self.stage_timings = {}  # startup stage -> seconds
+        self.data_version = 0  # Incremented whenever readings change after loading
+        self._tail_state = {}  # dataset name -> state for ingest_new_rows()
+        self._ingest_lock = threading.Lock()
+        self.audit = CleaningAudit()  # Per-reason row counters and ingest events
 
-    def clean_radiation_data(self, df):
+    def clean_radiation_data(self, df, state=None):
         """
         Clean radiation readings by removing anomalies and invalid values
         
         Args:
             df (pd.DataFrame): DataFrame containing radiation readings
+            state (dict): Optional dict filled with the per-sensor last in-range values
+                ('last_values') and the quantile summary behind the IQR bounds
+                ('summary'), so later rows can be cleaned incrementally, and with the
+                CleaningProvenance of every row ('provenance'); the index of ``df``
+                must then hold each row's position in the source file
             
         Returns:
             pd.DataFrame: Cleaned DataFrame
         """
         if df is None or len(df) == 0:
             return df
-            
-        cleaned = df.copy()
-        
-        # Remove readings outside valid range
-        mask = (cleaned[self.VALUE] >= self.MIN_VALID_VALUE) & \
-               (cleaned[self.VALUE] <= self.MAX_VALID_VALUE)
         
-        invalid_count = len(cleaned) - mask.sum()
-        if invalid_count > 0:
-            print(f"Removed {invalid_count} readings outside valid range ({self.MIN_VALID_VALUE}-{self.MAX_VALID_VALUE})")
+        # Every check runs on NumPy arrays in one pass; only the final take copies rows
+        result = clean_readings(
+            df[self.SENSOR_ID], df[self.TIMESTAMP], df[self.VALUE],
+            self.MIN_VALID_VALUE, self.MAX_VALID_VALUE, self.MAX_RATE_OF_CHANGE, self.IQR_MULTIPLIER,
+            sketch_size=self.IQR_SKETCH_SIZE
+        )
+        counts = removal_counts(result['reasons'])
         
-        cleaned = cleaned[mask]
+        self._log_removed(counts[OUT_OF_RANGE], counts[NO_PREVIOUS_READING] + counts[RATE_OF_CHANGE],
+                          counts[IQR_OUTLIER])
         
-        # Sort by sensor and timestamp for rate-of-change calculation
-        cleaned = cleaned.sort_values([self.SENSOR_ID, self.TIMESTAMP])
+        cleaned = df.take(result['kept'])
         
-        # Calculate rate of change for each sensor
-        cleaned['value_diff'] = cleaned.groupby(self.SENSOR_ID)[self.VALUE].diff()
+        if state is not None:
+            last = result['last']
+            state['last_values'] = pd.Series(
+                df[self.VALUE].to_numpy()[last],
+                index=pd.Index(df[self.SENSOR_ID].iloc[last].array, name=self.SENSOR_ID),
+                name=self.VALUE
+            )
+            state['summary'] = result['summary']
+            if state['summary'] is None:
+                state['summary'] = ExactQuantileSummary().update(result['spike_free'])
+            provenance = state['provenance'] = CleaningProvenance()
+            provenance.add_raw(df.index, df[self.SENSOR_ID], df[self.VALUE])
+            provenance.mark_all(df.index, df[self.SENSOR_ID], result['reasons'])
+            provenance.add_clean(cleaned[self.SENSOR_ID], cleaned[self.VALUE])
         
-        # Remove readings with excessive rate of change
-        mask = abs(cleaned['value_diff']) <= self.MAX_RATE_OF_CHANGE
+        logger.info("Final clean dataset contains %d readings", len(cleaned))
+        return cleaned
+
+    def create_streaming_cleaner(self):
+        """
+        Cleaner for readings that arrive in micro-batches, using this processor's thresholds
         
-        spike_count = len(cleaned) - mask.sum()
+        Returns:
+            StreamingCleaner: Call clean(batch) with each batch of parsed readings
+        """
+        return StreamingCleaner(
+            self.MIN_VALID_VALUE, self.MAX_VALID_VALUE, self.MAX_RATE_OF_CHANGE, self.IQR_MULTIPLIER,
+            sketch_size=self.STREAMING_SKETCH_SIZE, sensor_column=self.SENSOR_ID,
+            timestamp_column=self.TIMESTAMP, value_column=self.VALUE
+        )
+
+    def _log_removed(self, invalid_count, spike_count, outlier_count):
+        """Log how many rows each cleaning step removed"""
+        if invalid_count > 0:
+            logger.info("Removed %d readings outside valid range (%s-%s)",
+                        invalid_count, self.MIN_VALID_VALUE, self.MAX_VALID_VALUE)
         if spike_count > 0:
-            print(f"Removed {spike_count} readings with excessive rate of change (>{self.MAX_RATE_OF_CHANGE})")
-        
-        cleaned = cleaned[mask]
-        
-        # Remove the temporary column
-        cleaned = cleaned.drop('value_diff', axis=1)
+            logger.info("Removed %d readings with excessive rate of change (>%s)",
+                        spike_count, self.MAX_RATE_OF_CHANGE)
+        if outlier_count > 0:
+            logger.info("Removed %d statistical outliers", outlier_count)
+
+    def _mark_removed(self, provenance, rows, reason):
+        """Record the removal reason of rows dropped by a cleaning step"""
+        if provenance is not None:
+            provenance.mark(rows.index, rows[self.SENSOR_ID], reason)
+
+    def load_data(self, use_cache=True, rebuild_cache=False, chunk_size=None, parallel=None,
+                  lazy=False, column_store_dir=None, partitioned=False, sql_backend=False,
+                  exact_quantiles=None):
+        """
+        Load and clean all data sources
         
-        # Remove statistical outliers using IQR method
-        Q1 = cleaned[self.VALUE].quantile(0.25)
-        Q3 = cleaned[self.VALUE].quantile(0.75)
-        IQR = Q3 - Q1
-        outlier_mask = (cleaned[self.VALUE] >= Q1 - 1.5 * IQR) & \
-                      (cleaned[self.VALUE] <= Q3 + 1.5 * IQR)
+        The sensor locations, both readings files and the neighborhood shapefile are
+        independent, so by default each runs as its own stage (read, parse, clean)
+        in a thread pool and loading finishes when the slowest stage does.
         
-        outlier_count = len(cleaned) - outlier_mask.sum()
-        if outlier_count > 0:
-            print(f"Removed {outlier_count} statistical outliers")
+        With ``lazy=True`` nothing is read up front: each dataset is loaded the
+        first time it is accessed, and row counts, the time range and the
+        per-sensor aggregates of the full datasets are served from the snapshot
+        cache where possible. Call warm_up() or
+        start_background_warmup() to load the rest ahead of use.
         
-        cleaned = cleaned[outlier_mask]
+        Args:
+            use_cache (bool): Serve cleaned readings from the snapshot cache when valid
+            rebuild_cache (bool): Ignore existing snapshots and re-clean the raw files
+            chunk_size (int): Stream readings in chunks of this many rows to bound
+                memory (defaults to CHUNK_SIZE; None reads each file whole)
+            parallel (bool): Run the startup stages concurrently (defaults to PARALLEL_STARTUP)
+            lazy (bool): Defer loading each dataset until it is first accessed
+            column_store_dir (str): Share cleaned readings between worker processes as
+                memory-mapped column files in this directory (defaults to COLUMN_STORE_DIR)
+            partitioned (bool): Keep cleaned readings on disk partitioned by day (under
+                PARTITION_DIR) and serve get_readings() time ranges from the overlapping
+                partitions only, instead of holding the full readings in memory
+            sql_backend (bool): Keep cleaned readings in an embedded SQL database
+                (SQL_DB_PATH) and run range filters, per-sensor aggregates and time
+                bucketing there instead of in memory
+            exact_quantiles (bool): Compute medians of date-range windows exactly from the
+                readings rather than from the mergeable sketches (defaults to EXACT_QUANTILES)
+        """
+        if chunk_size is None:
+            chunk_size = self.CHUNK_SIZE
+        if parallel is None:
+            parallel = self.PARALLEL_STARTUP
+        if column_store_dir is None:
+            column_store_dir = self.COLUMN_STORE_DIR
+        if exact_quantiles is None:
+            exact_quantiles = self.EXACT_QUANTILES
+        self._exact_quantiles = exact_quantiles
         
-        print(f"Final clean dataset contains {len(cleaned)} readings")
-        return cleaned
-
-    def load_data(self):
-        """Load and clean all data sources"""
         try:
-            # Load raw data
-            self.static_sensors = pd.read_csv('../data/StaticSensorLocations.csv')
-            self.static_readings = pd.read_csv('../data/StaticSensorReadings.csv')
-            self.mobile_readings = pd.read_csv('../data/MobileSensorReadings.csv')
+            cache = SnapshotCache(self.CACHE_DIR) if use_cache else None
+            self._column_store = ColumnStore(column_store_dir) if column_store_dir else None
+            self.stage_timings = {}
+            self._datasets = {}
+            self._summaries = {}
+            self._sensor_summaries = {}
+            self._time_indexes = {}
+            self._sensor_indexes = {}
+            self._range_stats = {}
+            self._quantile_cubes = {}
+            self._distinct_cubes = {}
+            self._rollups = {}
+            self._windows.clear()
             
-            # Standardize column names
-            self.standardize_column_names()
+            self._loaders = {
+                'static_sensors': self._load_static_sensors,
+                'static_readings': lambda: self._load_readings(
+                    'static_readings', self.STATIC_READINGS_PATH, cache, rebuild_cache, chunk_size
+                ),
+                'mobile_readings': lambda: self._load_readings(
+                    'mobile_readings', self.MOBILE_READINGS_PATH, cache, rebuild_cache, chunk_size
+                ),
+                'gdf': self._load_shapefile
+            }
             
-            # Convert timestamps
-            self.static_readings[self.TIMESTAMP] = pd.to_datetime(self.static_readings[self.TIMESTAMP])
-            self.mobile_readings[self.TIMESTAMP] = pd.to_datetime(self.mobile_readings[self.TIMESTAMP])
+            if partitioned and sql_backend:
+                raise ValueError("partitioned and sql_backend storage are mutually exclusive")
+            self._readings_store = None
+            self._stores_ready = set()
+            if partitioned:
+                store = PartitionStore(self.PARTITION_DIR, self.TIMESTAMP, self.PARTITION_CACHE_BYTES,
+                                       sort_by=[self.TIMESTAMP, self.SENSOR_ID])
+                self._readings_store = store if store.enabled else None
+            elif sql_backend:
+                self._readings_store = SQLBackend(self.SQL_DB_PATH, timestamp_column=self.TIMESTAMP,
+                                                  sensor_column=self.SENSOR_ID, value_column=self.VALUE)
+            if self._readings_store is not None:
+                for name in self.READINGS_DATASETS:
+                    self._store_builders[name] = self._loaders[name]
+                    self._loaders[name] = lambda name=name: self._load_from_store(name)
             
-            # Clean the readings
-            print("Cleaning static sensor readings...")
-            self.static_readings = self.clean_radiation_data(self.static_readings)
+            if lazy:
+                if cache is not None and not rebuild_cache:
+                    self._load_cached_summaries(cache)
+                logger.info("Datasets will be loaded on first access")
+                return True
             
-            print("\nCleaning mobile sensor readings...")
-            self.mobile_readings = self.clean_radiation_data(self.mobile_readings)
+            started = time.perf_counter()
+            if parallel:
+                with ThreadPoolExecutor(max_workers=len(self.DATASETS)) as pool:
+                    list(pool.map(self._materialize, self.DATASETS))
+            else:
+                for name in self.DATASETS:
+                    self._materialize(name)
+            self.stage_timings['total'] = time.perf_counter() - started
             
-            # Set the time range from cleaned data
-            self.start_date = min(
-                self.static_readings[self.TIMESTAMP].min(),
-                self.mobile_readings[self.TIMESTAMP].min()
-            )
-            self.end_date = max(
-                self.static_readings[self.TIMESTAMP].max(),
-                self.mobile_readings[self.TIMESTAMP].max()
-            )
+            if self._readings_store is not None:
+                # The full readings were only needed to fill the store
+                for name in self.READINGS_DATASETS:
+                    self.unload(name)
             
-            print("\nData loaded and cleaned successfully")
+            logger.info("Startup stage timings:\n%s", "\n".join(
+                f"  {stage:<28} {seconds:8.3f} s" for stage, seconds in self.stage_timings.items()
+            ))
+            self.audit.record_event('startup', **{
+                stage: round(seconds, 6) for stage, seconds in self.stage_timings.items()
+            })
+            logger.info("Data loaded and cleaned successfully")
             return True
             
         except Exception as e:
-            print(f"Error loading data: {str(e)}")
+            logger.error("Error loading data: %s", e, exc_info=True)
             return False
 
-    def standardize_column_names(self):
-        """Standardize column names across all datasets"""
-        column_maps = {
-            'Sensor-id': self.SENSOR_ID,
-            'Timestamp': self.TIMESTAMP,
-            ' User-id': self.USER_ID,
-            'User-id': self.USER_ID,
-            'Value': self.VALUE,
-            'Units': self.UNITS,
-            'Lat': self.LATITUDE,
-            'Long': self.LONGITUDE,
-            'Latitude': self.LATITUDE,
-            'Longitude': self.LONGITUDE
+    def _materialize(self, name):
+        """Load a dataset with its registered loader unless it is already loaded"""
+        with self._dataset_locks[name]:
+            if name not in self._datasets:
+                self._datasets[name] = self._run_stage(name, self._loaders[name])
+            return self._datasets[name]
+
+    def is_loaded(self, name):
+        """Whether a dataset has been materialized"""
+        return name in self._datasets
+
+    def unload(self, name):
+        """Release a loaded dataset; it is loaded again on next access"""
+        with self._dataset_locks[name]:
+            self._datasets.pop(name, None)
+            self._time_indexes.pop(name, None)
+            self._sensor_indexes.pop(name, None)
+            self._range_stats.pop(name, None)
+            self._quantile_cubes.pop(name, None)
+            self._distinct_cubes.pop(name, None)
+            self._windows.discard(name)
+
+    def get_readings(self, name, start_date=None, end_date=None):
+        """
+        Readings of a dataset within a time range
+        
+        With partitioned storage only the day partitions overlapping the range are
+        read (or taken from memory), with the SQL backend the range is selected by
+        the database; otherwise the loaded frame is filtered. Stored readings are
+        not kept in memory by this call, even for the full dataset.
+        
+        Args:
+            name (str): 'static_readings' or 'mobile_readings'
+            start_date, end_date: Inclusive bounds; the full dataset if either is empty
+            
+        Returns:
+            pd.DataFrame: Matching readings, ordered by time (and by sensor within a timestamp)
+        """
+        if self._readings_store is None or self.is_loaded(name):
+            return self.filter_time_range(getattr(self, name), start_date, end_date)
+        
+        self._prepare_store(name)
+        return self._readings_store.read(name, *self._query_range(start_date, end_date))
+
+    def get_sensor_readings(self, name, sensor_ids, start_date=None, end_date=None):
+        """
+        Readings of selected sensors, optionally within a time range
+        
+        In memory each sensor's rows are looked up in the dataset's SensorIndex
+        rather than matched row by row, so the cost follows the rows returned,
+        not the size of the dataset or the fleet.
+        
+        Args:
+            name (str): 'static_readings' or 'mobile_readings'
+            sensor_ids (list): Sensors to return; a single id is accepted too
+            start_date, end_date: Inclusive bounds; no time filter if either is empty
+            
+        Returns:
+            pd.DataFrame: Rows grouped by sensor in the order given, in time order within each
+        """
+        if not isinstance(sensor_ids, (list, tuple)):
+            sensor_ids = [sensor_ids]
+        start, end = self._query_range(start_date, end_date)
+        index = self._sensor_index(name)
+        if index is None:
+            # Stored readings: index only the selected range
+            index = SensorIndex(self.get_readings(name, start_date, end_date), self.SENSOR_ID, self.TIMESTAMP)
+            start = end = None
+        return index.rows(sensor_ids, start, end)
+
+    def get_sensor_counts(self, name):
+        """
+        Number of readings per sensor
+        
+        Returns:
+            pd.Series: Sensor id -> rows, ordered by sensor id
+        """
+        index = self._sensor_index(name)
+        if index is None:
+            counts = self.get_sensor_aggregates(name).set_index(self.SENSOR_ID)['count']
+            return counts.astype('int64').rename_axis(None).rename(None)
+        return index.counts()
+
+    def get_window(self, name, start_date=None, end_date=None):
+        """
+        Readings of a dataset within a time range, shared between callers
+        
+        Same rows as get_readings(), kept in an LRU cache keyed by dataset, range
+        and data_version: callbacks filtering the same date range reuse one view,
+        and concurrent identical requests compute it once. The frame is shared,
+        so callers must not modify it.
+        """
+        return self._window(name, start_date, end_date)['readings']
+
+    def get_window_stats(self, name, start_date=None, end_date=None):
+        """
+        Basic aggregates of the readings get_window() returns, cached with them
+        
+        The median of a window of more than EXACT_MEDIAN_ROWS rows comes from
+        get_quantile_summary(), so it is approximate unless exact quantiles were
+        requested; 'median_rank_error' bounds its error with high probability
+        (0.0 when exact).
+        
+        Returns:
+            dict: rows, count, mean, median, std, min and max of the values,
+                median_rank_error and the number of distinct sensors (NaN
+                statistics for an empty window)
+        """
+        return dict(self._window(name, start_date, end_date)['stats'])
+
+    def window_cache_stats(self):
+        """Hit, miss and shared-computation counters of the window cache"""
+        return self._windows.stats()
+
+    def _window(self, name, start_date, end_date):
+        """Cached readings and aggregates of a dataset within a time range"""
+        start, end = self._query_range(start_date, end_date)
+        
+        def compute():
+            readings = self.get_readings(name, start_date, end_date)
+            stats = self.get_range_stats(name, start_date, end_date)
+            if self._exact_quantiles or len(readings) <= self.EXACT_MEDIAN_ROWS:
+                stats['median'], stats['median_rank_error'] = readings[self.VALUE].median(), 0.0
+            else:
+                summary = self.get_quantile_summary(name, start_date, end_date)
+                stats['median'], stats['median_rank_error'] = summary.quantile(0.5), summary.rank_error
+            return {'readings': readings, 'stats': stats}
+        
+        return self._windows.get((name, start, end, self.data_version), compute)
+
+    def get_range_stats(self, name, start_date=None, end_date=None):
+        """
+        Count, mean, standard deviation, min and max of the values in a time range
+        
+        For a dataset held in memory these come from its RangeStats and SensorIndex
+        in the same time whatever the size of the range; for readings only a store
+        holds, the range is read and aggregated.
+        
+        Returns:
+            dict: rows, count (of values present), mean, std, min, max and sensors
+                (number of distinct sensors with readings in the range)
+        """
+        start, end = self._query_range(start_date, end_date)
+        index = self._range_index(name)
+        if index is None:
+            return self._frame_stats(self.get_readings(name, start_date, end_date))
+        stats = index.stats(start, end)
+        stats['sensors'] = len(self._sensor_index(name).active(start, end))
+        return stats
+
+    def _frame_stats(self, readings):
+        """get_range_stats() of a readings frame, aggregated directly"""
+        values = readings[self.VALUE]
+        return {
+            'rows': len(readings),
+            'count': int(values.count()),
+            'mean': values.mean(),
+            'std': values.std(),
+            'min': values.min(),
+            'max': values.max(),
+            'sensors': readings[self.SENSOR_ID].nunique()
+        }
+
+    def get_quantile_summary(self, name, start_date=None, end_date=None, sensor_ids=None, exact=None):
+        """
+        Mergeable quantile summary of a dataset's values in a time range
+        
+        Approximate summaries are merged from the per-sensor, per-bucket sketches of
+        the dataset's QuantileCube plus the raw rows at the range edges; the exact
+        one is built from the readings themselves.
+        
+        Args:
+            sensor_ids (list): Only these sensors' readings (all readings if None)
+            exact (bool): Exact quantiles (defaults to the load_data() setting)
+            
+        Returns:
+            KLLSketch or ExactQuantileSummary: quantile(q) gives the value and
+                rank_error bounds its error as a fraction of the count (with
+                high probability for a sketch)
+        """
+        if exact is None:
+            exact = self._exact_quantiles
+        cube = None if exact else self._quantile_cube(name)
+        if cube is None:
+            if sensor_ids is None:
+                readings = self.get_readings(name, start_date, end_date)
+            else:
+                readings = self.get_sensor_readings(name, sensor_ids, start_date, end_date)
+            if exact:
+                return ExactQuantileSummary().update(readings[self.VALUE])
+            return KLLSketch(self.QUANTILE_SKETCH_SIZE, seed=0).update(readings[self.VALUE])
+        start, end = self._query_range(start_date, end_date)
+        if sensor_ids is not None and not isinstance(sensor_ids, (list, tuple)):
+            sensor_ids = [sensor_ids]
+        return cube.sketch(start, end, sensor_ids)
+
+    def get_distinct_counts(self, name, start_date=None, end_date=None, exact=None):
+        """
+        Number of distinct sensors, users and locations with readings in a time range
+        
+        Locations are coordinates rounded to LOCATION_DECIMALS; missing keys are not
+        counted. Approximate counts are merged from the per-hour and per-day
+        HyperLogLog registers of the dataset's DistinctCube plus the raw rows at the
+        range edges, in the same time whatever the size of the range, and are within
+        about 1.04 / sqrt(2 ** DISTINCT_SKETCH_PRECISION) (1.6%) of the exact ones;
+        small counts are nearly exact.
+        
+        Args:
+            exact (bool): Count from the readings themselves; by default only ranges of
+                at most DISTINCT_EXACT_ROWS rows (and readings held only in a store) are
+                counted exactly
+
+        Returns:
+            dict: sensors, users and locations (for the keys the dataset has) and
+                relative_error, the standard error of the counts (0.0 when exact)
+        """
+        start, end = self._query_range(start_date, end_date)
+        cube = None if exact else self._distinct_cube(name)
+        if cube is not None and exact is None:
+            lo, hi = self._range_index(name).positions(start, end)
+            if hi - lo <= self.DISTINCT_EXACT_ROWS:
+                cube = None
+        if cube is None:
+            counts = {key: len(columns.dropna().drop_duplicates())
+                      for key, columns in self._distinct_keys(self.get_readings(name, start_date, end_date)).items()}
+            counts['relative_error'] = 0.0
+            return counts
+        counters = cube.sketch(start, end)
+        counts = {key: counter.count() for key, counter in counters.items()}
+        counts['relative_error'] = next(iter(counters.values())).relative_error if counters else 0.0
+        return counts
+
+    def _distinct_keys(self, readings):
+        """Key name -> frame of the columns whose distinct values get_distinct_counts() counts"""
+        keys = {'sensors': readings[[self.SENSOR_ID]]}
+        if self.USER_ID in readings.columns:
+            keys['users'] = readings[[self.USER_ID]]
+        if self.LATITUDE in readings.columns and self.LONGITUDE in readings.columns:
+            keys['locations'] = readings[[self.LATITUDE, self.LONGITUDE]].round(self.LOCATION_DECIMALS)
+        return keys
+
+    def _distinct_cube(self, name):
+        """DistinctCube of a readings dataset held in memory (None if only a store holds it)"""
+        if self._readings_store is not None and not self.is_loaded(name):
+            return None
+        df = getattr(self, name)
+        cube = self._distinct_cubes.get(name)
+        if cube is None or cube.frame is not df:
+            cube = self._distinct_cubes[name] = DistinctCube(df, self.TIMESTAMP, self._distinct_keys(df),
+                                                             self.DISTINCT_SKETCH_PRECISION)
+        return cube
+
+    def _quantile_cube(self, name):
+        """QuantileCube of a readings dataset held in memory (None if only a store holds it)"""
+        if self._readings_store is not None and not self.is_loaded(name):
+            return None
+        df = getattr(self, name)
+        cube = self._quantile_cubes.get(name)
+        if cube is None or cube.frame is not df:
+            cube = self._quantile_cubes[name] = QuantileCube(df, self.SENSOR_ID, self.TIMESTAMP, self.VALUE,
+                                                             self.QUANTILE_SKETCH_SIZE)
+        return cube
+
+    def _range_index(self, name):
+        """RangeStats of a readings dataset held in memory (None if only a store holds it)"""
+        if self._readings_store is not None and not self.is_loaded(name):
+            return None
+        df = getattr(self, name)
+        index = self._range_stats.get(name)
+        if index is None or index.frame is not df:
+            index = self._range_stats[name] = RangeStats(df, self.VALUE, self.TIMESTAMP)
+        return index
+
+    def _sensor_index(self, name):
+        """SensorIndex of a readings dataset held in memory (None if only a store holds it)"""
+        if self._readings_store is not None and not self.is_loaded(name):
+            return None
+        df = getattr(self, name)
+        index = self._sensor_indexes.get(name)
+        if index is None or index.frame is not df:
+            index = self._sensor_indexes[name] = SensorIndex(df, self.SENSOR_ID, self.TIMESTAMP)
+        return index
+
+    def get_sensor_aggregates(self, name, start_date=None, end_date=None):
+        """
+        Per-sensor statistics of the readings in a time range
+        
+        Those of the whole dataset come from the per-sensor summary kept since it
+        was cleaned (and cached with it), so they need no readings in memory.
+        
+        Returns:
+            pd.DataFrame: sensor_id, count, mean, std, min and max, plus the latitude,
+                longitude and user id of each sensor's latest reading for mobile readings
+        """
+        position_columns = self._position_columns(name)
+        start, end = self._query_range(start_date, end_date)
+        
+        summary = self._sensor_summaries.get(name) if start is None else None
+        if summary is not None:
+            return summary.drop(columns=self.TIMESTAMP)
+        
+        if isinstance(self._readings_store, SQLBackend):
+            self._prepare_store(name)
+            stats = self._readings_store.sensor_aggregates(name, start, end)
+            if position_columns:
+                positions = self._readings_store.latest_positions(name, position_columns, start, end)
+                stats = stats.merge(positions, on=self.SENSOR_ID, how='left')
+            return stats
+        
+        readings = self.get_readings(name, start_date, end_date)
+        return self._summarize_sensors(readings, position_columns).drop(columns=self.TIMESTAMP)
+
+    def get_bucketed_averages(self, name, freq='1h', start_date=None, end_date=None, by_sensor=False):
+        """
+        Count, mean and standard deviation of readings per time bucket
+        
+        Widths that are multiples of a RollupCube level and divide a day are merged
+        from the pre-aggregated per-sensor buckets unless the raw readings in the
+        range are fewer (see plan_buckets); others are grouped from raw rows.
+        
+        Args:
+            freq (str): Fixed bucket width, e.g. '1h' or '15min'
+            by_sensor (bool): Also group by sensor
+            
+        Returns:
+            pd.DataFrame: timestamp (bucket start), [sensor_id,] count, mean and std;
+                without by_sensor every bucket between the first and last is present
+        """
+        return self.get_planned_buckets(name, freq, start_date, end_date, by_sensor=by_sensor)[0]
+
+    def get_planned_buckets(self, name, freq, start_date=None, end_date=None, max_points=None, by_sensor=False):
+        """
+        get_bucketed_averages() at the width and from the source plan_buckets() picks
+        
+        Returns:
+            tuple: (buckets as get_bucketed_averages returns them, plan)
+        """
+        plan = self.plan_buckets(name, freq, start_date, end_date, max_points)
+        freq = plan['freq']
+        if plan['source'] == 'sql':
+            self._prepare_store(name)
+            start, end = self._query_range(start_date, end_date)
+            buckets = self._readings_store.bucketed(name, freq, start, end, by_sensor)
+            if not by_sensor and len(buckets) > 0:
+                # Match the empty buckets pd.Grouper produces
+                full_range = pd.date_range(buckets[self.TIMESTAMP].iloc[0],
+                                           buckets[self.TIMESTAMP].iloc[-1], freq=freq)
+                buckets = buckets.set_index(self.TIMESTAMP).reindex(full_range)
+                buckets['count'] = buckets['count'].fillna(0).astype('int64')
+                buckets = buckets.rename_axis(self.TIMESTAMP).reset_index()
+            return buckets, plan
+        
+        if plan['source'] == 'rollup':
+            return self._bucketed_from_rollup(name, self._rollup(name), freq, start_date, end_date, by_sensor), plan
+        
+        readings = self.get_readings(name, start_date, end_date)
+        keys = [pd.Grouper(key=self.TIMESTAMP, freq=freq)]
+        if by_sensor:
+            keys.append(self.SENSOR_ID)
+        return readings.groupby(keys, observed=True)[self.VALUE].agg(['count', 'mean', 'std']).reset_index(), plan
+
+    def plan_buckets(self, name, freq, start_date=None, end_date=None, max_points=None):
+        """
+        Bucket width and source for the bucketed averages of a time range
+        
+        A width that would give more than ``max_points`` buckets over the range is
+        coarsened to the narrowest PLANNER_FREQS width that fits (the widest if none
+        does). The source is then whichever aggregates fewer rows: the raw readings
+        in the range, or the rollup level serving the width plus the raw rows of the
+        partial buckets at the range edges. Readings in the SQL backend are bucketed
+        there.
+        
+        Args:
+            freq (str): Requested fixed bucket width
+            max_points (int): Most buckets wanted, e.g. the chart width in pixels
+                (None for no limit)
+            
+        Returns:
+            dict: freq (the width to use), requested_freq, buckets (over the range),
+                source ('rollup', 'raw' or 'sql'), level (the rollup level used),
+                rows (aggregated; None if unknown) and label, a short description
+                for display
+        """
+        start, end = self._query_range(start_date, end_date)
+        first, last = start, end
+        if start is None:
+            summary = self.get_summary(name)
+            first, last = (summary['start'], summary['end']) if summary is not None else (None, None)
+        chosen = freq
+        width = bucket_width(freq)
+        if max_points and width is not None and self._bucket_count(first, last, width) > max_points:
+            wider = [option for option in self.PLANNER_FREQS if bucket_width(option) > width]
+            fitting = [option for option in wider
+                       if self._bucket_count(first, last, bucket_width(option)) <= max_points]
+            if fitting:
+                chosen = fitting[0]
+            elif wider:
+                chosen = wider[-1]
+        
+        plan = {
+            'freq': chosen,
+            'requested_freq': freq,
+            'buckets': self._bucket_count(first, last, bucket_width(chosen)),
+            'source': 'raw',
+            'level': None,
+            'rows': None
         }
+        if isinstance(self._readings_store, SQLBackend):
+            plan['source'] = 'sql'
+        else:
+            plan.update(self._cheapest_bucket_source(name, chosen, start, end))
+        
+        sources = {'rollup': f"{plan['level']} rollups", 'raw': "raw readings", 'sql': "the SQL backend"}
+        plan['label'] = f"{chosen} buckets from {sources[plan['source']]}"
+        if chosen != freq:
+            plan['label'] += f" ({freq} requested; coarsened to fit {max_points:,} points)"
+        return plan
+
+    def _cheapest_bucket_source(self, name, freq, start, end):
+        """Rollup or raw rows for the buckets of [start, end], by the rows each aggregates"""
+        index = self._range_index(name)
+        raw_rows = None
+        if index is not None:
+            lo, hi = index.positions(start, end)
+            raw_rows = hi - lo
+        cube = self._rollup(name)
+        if cube is None or cube.level_for(freq) is None:
+            return {'source': 'raw', 'level': None, 'rows': raw_rows}
         
+        lo, hi = cube.covered(freq, start, end)
+        rollup_rows = cube.rows_in(freq, lo, hi)
+        if index is not None and lo is not None:
+            edges = [(start, end)]
+            if lo < hi:
+                edges = [(start, lo - pd.Timedelta(1, 'ns')), (hi, end)]
+            for edge_start, edge_end in edges:
+                if edge_start <= edge_end:
+                    edge_lo, edge_hi = index.positions(edge_start, edge_end)
+                    rollup_rows += edge_hi - edge_lo
+        if raw_rows is not None and raw_rows <= rollup_rows:
+            return {'source': 'raw', 'level': None, 'rows': raw_rows}
+        return {'source': 'rollup', 'level': cube.level_for(freq), 'rows': rollup_rows}
+
+    def _bucket_count(self, first, last, width):
+        """Buckets of ``width`` from the one holding ``first`` to the one holding ``last``"""
+        if first is None or last is None or pd.isna(first) or pd.isna(last) or width is None:
+            return 0
+        width = width.value
+        return int(pd.Timestamp(last).value // width - pd.Timestamp(first).value // width + 1)
+
+    def _bucketed_from_rollup(self, name, cube, freq, start_date, end_date, by_sensor):
+        """
+        get_bucketed_averages() served from the rollup cube
+        
+        Buckets wholly inside the range come from the cube; the partial buckets at
+        either edge are aggregated from the raw readings there.
+        """
+        start, end = self._query_range(start_date, end_date)
+        lo, hi = cube.covered(freq, start, end)
+        if lo is None:
+            return cube.finalize(cube.query(freq, by_sensor=by_sensor), by_sensor, freq)
+        
+        parts = []
+        edges = [(start, end)]
+        if lo < hi:
+            parts.append(cube.query(freq, lo, hi, by_sensor))
+            edges = [(start, lo - pd.Timedelta(1, 'ns')), (hi, end)]
+        for edge_start, edge_end in edges:
+            if edge_start <= edge_end:
+                parts.append(cube.moments(self.get_readings(name, edge_start, edge_end), freq, by_sensor))
+        return cube.finalize(pd.concat(parts, ignore_index=True), by_sensor, freq)
+
+    def get_periodic_profile(self, name, period):
+        """
+        Statistics of all readings per hour of the day, day of the week or month
+        
+        Args:
+            period (str): 'hour', 'dayofweek' or 'month'
+            
+        Returns:
+            pd.DataFrame: period, count, mean, std, min and max, ordered by period
+        """
+        freq = '1h' if period == 'hour' else '1D'
+        cube = self._rollup(name)
+        if cube is None:
+            cube = self._build_rollup(self.get_readings(name))
+        return cube.profile(freq, period)
+
+    def _rollup(self, name):
+        """
+        RollupCube of a readings dataset
+        
+        Built when the dataset is loaded and extended by ingest_new_rows(); rebuilt
+        if the in-memory frame was replaced by other means.
+        """
+        if self._readings_store is not None and not self.is_loaded(name):
+            # Filling the store builds the cube
+            self._prepare_store(name)
+            return self._rollups.get(name)
+        df = getattr(self, name)
+        cube = self._rollups.get(name)
+        if df is not None and (cube is None or not cube.built_from(df)):
+            cube = self._rollups[name] = self._build_rollup(df)
+        return cube
+
+    def _build_rollup(self, readings):
+        """RollupCube of a readings frame"""
+        return RollupCube(readings, self.SENSOR_ID, self.TIMESTAMP, self.VALUE)
+
+    def _query_range(self, start_date, end_date):
+        """Parsed bounds for a store query, or (None, None) for the full dataset"""
+        if start_date and end_date:
+            return pd.to_datetime(start_date), pd.to_datetime(end_date)
+        return None, None
+
+    def evict_partitions(self, max_bytes=0):
+        """Drop cached day partitions from memory, least recently used first"""
+        if isinstance(self._readings_store, PartitionStore):
+            self._readings_store.evict(max_bytes)
+
+    def _load_from_store(self, name):
+        """Full readings of a dataset kept in partitioned storage or the SQL backend"""
+        readings = self._prepare_store(name)
+        if readings is None:
+            readings = self._readings_store.read(name)
+        return readings
+
+    def _prepare_store(self, name):
+        """
+        Clean a readings source (or take it from the caches) and make sure the
+        readings store holds it
+        
+        Returns:
+            pd.DataFrame: The cleaned readings if they were built by this call, else None
+        """
+        with self._store_locks[name]:
+            if name in self._stores_ready:
+                return None
+            
+            readings = self._store_builders[name]()
+            state = self._tail_state[name]
+            stat = os.stat(state['path'])
+            key = {
+                'size': state['offset'],
+                'mtime_ns': stat.st_mtime_ns if stat.st_size == state['offset'] else None,
+                'rows': len(readings),
+                'params': self._cache_params()
+            }
+            if not self._readings_store.is_current(name, key):
+                with self._timed(f"{name}.store"):
+                    self._readings_store.write(name, readings, key)
+            self._stores_ready.add(name)
+            return readings
+
+    def warm_up(self, names=None):
+        """
+        Load datasets that have not been accessed yet
+        
+        Args:
+            names (list): Datasets to load (defaults to all of DATASETS)
+        """
+        for name in names or self.DATASETS:
+            if name in self._loaders and not self.is_loaded(name):
+                try:
+                    if name in self._store_builders and self._readings_store is not None:
+                        # Stored readings are read per range, so only the store is filled
+                        self._prepare_store(name)
+                    else:
+                        self._materialize(name)
+                except Exception as e:
+                    logger.error("Error warming up %s: %s", name, e)
+
+    def start_background_warmup(self, wait_for=None, timeout=60.0):
+        """
+        Warm up the remaining datasets from a daemon thread
+        
+        Args:
+            wait_for (tuple): Optional (host, port) to wait for before loading, so
+                the warm-up starts once the server is accepting connections
+            timeout (float): Seconds to wait for ``wait_for`` before warming up anyway
+        """
+        def run():
+            if wait_for is not None:
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    try:
+                        socket.create_connection(wait_for, timeout=1.0).close()
+                        break
+                    except OSError:
+                        time.sleep(0.2)
+            started = time.perf_counter()
+            self.warm_up()
+            logger.info("Background warm-up finished in %.3f s", time.perf_counter() - started)
+        
+        thread = threading.Thread(target=run, name='dataset-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def _load_cached_summaries(self, cache):
+        """Read the per-dataset summaries stored with the snapshot cache, if still valid"""
+        params = self._cache_params()
+        paths = {
+            'static_readings': self.STATIC_READINGS_PATH,
+            'mobile_readings': self.MOBILE_READINGS_PATH
+        }
+        for name, path in paths.items():
+            cached = cache.load(name, [path], params, frames=['summary', 'sensor_summary'])
+            if cached is not None:
+                self._summaries[name] = cached['summary'].iloc[0].to_dict()
+                self._sensor_summaries[name] = cached['sensor_summary']
+
+    def _summarize(self, readings):
+        """Row and distinct-sensor counts and time range of a readings frame"""
+        return {
+            'rows': len(readings),
+            'sensors': readings[self.SENSOR_ID].nunique(dropna=False),
+            'users': readings[self.USER_ID].nunique(dropna=False) if self.USER_ID in readings.columns else 0,
+            'start': readings[self.TIMESTAMP].min(),
+            'end': readings[self.TIMESTAMP].max()
+        }
+
+    def _summarize_sensors(self, readings, position_columns=()):
+        """
+        Per-sensor count, mean, std, min and max of the values of a time-sorted
+        readings frame, with the time (and ``position_columns``) of each sensor's
+        latest reading
+        """
+        grouped = readings.groupby(self.SENSOR_ID, observed=True)
+        summary = grouped[self.VALUE].agg(['count', 'mean', 'std', 'min', 'max'])
+        summary[self.TIMESTAMP] = grouped[self.TIMESTAMP].max()
+        if position_columns:
+            summary = summary.join(grouped[list(position_columns)].last())
+        return summary.reset_index()
+
+    def _merge_sensor_summaries(self, summary, other):
+        """_summarize_sensors() of two sets of readings from the summaries of each"""
+        left, right = (frame.set_index(self.SENSOR_ID) for frame in (summary, other))
+        left, right = left.align(right, join='outer')
+        left_count, right_count = left['count'].fillna(0), right['count'].fillna(0)
+        count = left_count + right_count
+        left_total = (left_count * left['mean']).fillna(0)
+        right_total = (right_count * right['mean']).fillna(0)
+        mean = (left_total + right_total) / count.where(count > 0)
+        # Squared deviations of each part about its mean, plus its offset from the joint mean
+        m2 = ((left['std'] ** 2 * (left_count - 1)).fillna(0) + (right['std'] ** 2 * (right_count - 1)).fillna(0)
+              + (left_count * right_count / count.where(count > 0) * (left['mean'] - right['mean']) ** 2).fillna(0))
+        merged = pd.DataFrame({
+            'count': count.astype('int64'),
+            'mean': mean,
+            'std': np.sqrt(m2 / (count - 1).where(count > 1)),
+            'min': np.fmin(left['min'], right['min']),
+            'max': np.fmax(left['max'], right['max']),
+            self.TIMESTAMP: np.fmax(left[self.TIMESTAMP], right[self.TIMESTAMP])
+        })
+        newer = right[self.TIMESTAMP].notna() & ~(right[self.TIMESTAMP] < left[self.TIMESTAMP])
+        for col in left.columns.difference(merged.columns, sort=False):
+            merged[col] = right[col].astype(object).where(newer, left[col].astype(object))
+        return merged.reset_index()
+
+    def _position_columns(self, name):
+        """Columns describing where a sensor of the dataset is: those of mobile readings"""
+        return [self.LATITUDE, self.LONGITUDE, self.USER_ID] if name == 'mobile_readings' else []
+
+    def get_summary(self, name):
+        """
+        Summary of a readings dataset, loading the dataset only if no summary is known
+        
+        Returns:
+            dict: rows, sensors, users, start and end, or None if nothing is loaded
+        """
+        summary = self._summaries.get(name)
+        if summary is None or summary['sensors'] is None:
+            readings = self.get_readings(name)
+            if readings is None:
+                return None
+            summary = self._summaries[name] = self._summarize(readings)
+        return summary
+
+    @property
+    def start_date(self):
+        """Earliest cleaned reading across both readings datasets"""
+        starts = [summary['start'] for summary in map(self.get_summary, self.READINGS_DATASETS)
+                  if summary is not None]
+        return min(starts) if starts else None
+
+    @property
+    def end_date(self):
+        """Latest cleaned reading across both readings datasets"""
+        ends = [summary['end'] for summary in map(self.get_summary, self.READINGS_DATASETS)
+                if summary is not None]
+        return max(ends) if ends else None
+
+    def _run_stage(self, stage, func, *args):
+        """Run one startup stage, recording its wall time"""
+        with self._timed(stage):
+            return func(*args)
+
+    @contextmanager
+    def _timed(self, stage):
+        """Record the wall time of a block in stage_timings"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage] = time.perf_counter() - started
+
+    def _load_static_sensors(self):
+        """Read the static sensor locations"""
+        sensors = pd.read_csv(self.STATIC_SENSORS_PATH)
+        self._standardize_frame(sensors)
+        return sensors
+
+    def _load_shapefile(self):
+        """The neighborhood polygons in EPSG:4326, shared with the maps through the geometry registry"""
+        geometry = get_geometry(self.SHAPEFILE_PATH)
+        if geometry is None:
+            logger.warning("Could not load neighborhood shapefile")
+            return None
+        return geometry.gdf
+
+    def _load_readings(self, name, path, cache=None, rebuild_cache=False, chunk_size=None):
+        """Return cleaned readings for one source, from the column store or snapshot cache if possible"""
+        params = self._cache_params()
+        # Only the first ``offset`` bytes are read; rows appended after this
+        # point, even while the file is being read, are left to ingest_new_rows()
+        offset = os.path.getsize(path)
+        
+        store = self._column_store
+        if store is not None:
+            # One worker builds the entry while the others wait, then all attach to it
+            with store.lock(name):
+                frames = None
+                sizes = {path: offset}
+                if not rebuild_cache:
+                    with self._timed(f"{name}.attach"):
+                        frames = store.load(name, [path], params, sizes)
+                if frames is None:
+                    sources = store.fingerprint([path], sizes)
+                    built = self._build_readings(name, path, offset, cache, rebuild_cache, chunk_size, params)
+                    with self._timed(f"{name}.column_store"):
+                        store.store(name, sources, built, params)
+                        # Attach to the stored columns too, so no worker keeps a private copy
+                        frames = store.load(name, [path], params, sizes) or built
+                else:
+                    logger.info("Attached %d cleaned %s from column store", len(frames['readings']), name)
+                    self.audit.record_event('loaded', dataset=name, source='column_store',
+                                            rows=len(frames['readings']))
+        else:
+            frames = self._build_readings(name, path, offset, cache, rebuild_cache, chunk_size, params)
+        
+        last_values = frames['last_values']
+        self._init_tail_state(name, path, offset, {
+            'last_values': pd.Series(
+                np.array(last_values[self.VALUE]),
+                index=np.array(last_values[self.SENSOR_ID])
+            ),
+            'summary': self._quantile_summary_from_frame(frames['value_counts']),
+            'provenance': CleaningProvenance.from_frames(frames['reasons'], frames['sensor_provenance'])
+        })
+        self._summaries[name] = frames['summary'].iloc[0].to_dict()
+        self._sensor_summaries[name] = frames['sensor_summary']
+        self.audit.update(name, self._tail_state[name]['provenance'])
+        with self._timed(f"{name}.rollups"):
+            self._rollups[name] = self._build_rollup(frames['readings'])
+        return frames['readings']
+
+    def _build_readings(self, name, path, offset, cache, rebuild_cache, chunk_size, params):
+        """
+        Clean the first ``offset`` bytes of one readings source, or read the result from the snapshot cache
+        
+        Returns:
+            dict: 'readings' plus the frames needed to restore the incremental
+                cleaning state ('last_values', 'value_counts'), its 'summary',
+                'sensor_summary' (see _summarize_sensors) and its provenance
+                ('reasons', 'sensor_provenance')
+        """
+        if cache is not None and not rebuild_cache:
+            with self._timed(f"{name}.cache"):
+                cached = cache.load(name, [path], params, sizes={path: offset})
+            if cached is not None:
+                logger.info("Loaded %d cleaned %s from snapshot cache", len(cached['readings']), name)
+                self.audit.record_event('loaded', dataset=name, source='snapshot_cache',
+                                        rows=len(cached['readings']))
+                return cached
+        
+        sources = None
+        if cache is not None and cache.enabled:
+            # Fingerprint what is about to be read, not the file as it is once cleaned
+            sources = cache.fingerprint([path], sizes={path: offset})
+        state = {}
+        if chunk_size:
+            with self._timed(f"{name}.stream"):
+                readings = self._load_readings_chunked(path, chunk_size, state, size=offset)
+        else:
+            with self._timed(f"{name}.read"):
+                with io.BufferedReader(_SourcePrefix(path, offset)) as source:
+                    readings = pd.read_csv(source, dtype=self._ingest_dtypes(path))
+                self._standardize_frame(readings, raw=True)
+            with self._timed(f"{name}.timestamps"):
+                readings[self.TIMESTAMP] = self._parse_timestamps(readings[self.TIMESTAMP], path)
+            with self._timed(f"{name}.clean"):
+                readings = self.clean_radiation_data(readings, state)
+                self._apply_schema(readings)
+        # Time order (sensor order within a timestamp, from the cleaning order) lets
+        # filter_time_range() slice ranges out with binary searches
+        with self._timed(f"{name}.sort"):
+            readings = sort_by_time(readings, self.TIMESTAMP)
+        
+        frames = {
+            'readings': readings,
+            'last_values': pd.DataFrame({
+                self.SENSOR_ID: state['last_values'].index,
+                self.VALUE: state['last_values'].to_numpy()
+            }),
+            'value_counts': state['summary'].to_frame(),
+            'summary': pd.DataFrame([self._summarize(readings)]),
+            'sensor_summary': self._summarize_sensors(readings, self._position_columns(name)),
+            **state['provenance'].to_frames()
+        }
+        self.audit.record_event('loaded', dataset=name, source='csv', rows=len(readings))
+        if cache is not None:
+            with self._timed(f"{name}.cache_store"):
+                cache.store(name, sources, frames, params)
+        return frames
+
+    def _init_tail_state(self, name, path, offset, state):
+        """Remember where a source was read up to and the cleaning state needed to extend it"""
+        self._tail_state[name] = {
+            'path': path,
+            'offset': offset,
+            'columns': list(pd.read_csv(path, nrows=0).columns),
+            'last_values': state.get('last_values', pd.Series(dtype=np.float64)),
+            'summary': state['summary'] if 'summary' in state else self._new_quantile_summary(),
+            'provenance': state.get('provenance', CleaningProvenance())
+        }
+
+    def ingest_new_rows(self):
+        """
+        Parse and clean only the rows appended to the readings files since they were read
+        
+        New rows are range-checked, compared against each sensor's retained last
+        in-range value and filtered with IQR bounds updated from the retained
+        quantile summary, then appended to the in-memory readings. Rows already
+        loaded are not re-evaluated.
+        
+        Returns:
+            dict: Dataset name -> number of cleaned rows appended
+        """
+        appended = {}
+        with self._ingest_lock:
+            for name, state in list(self._tail_state.items()):
+                try:
+                    new_rows = self._read_tail(state)
+                    if new_rows is None or len(new_rows) == 0:
+                        appended[name] = 0
+                        continue
+                    
+                    raw_rows = len(new_rows)
+                    new_rows = self._clean_incremental(new_rows, state)
+                    removed = self.audit.update(name, state['provenance'])
+                    self.audit.record_event('appended', dataset=name, rows=raw_rows, **removed)
+                    if len(new_rows) > 0:
+                        # Stored datasets that are not in memory only grow in their store
+                        if name not in self._stores_ready or self.is_loaded(name):
+                            setattr(self, name, self._append_frames(getattr(self, name), new_rows))
+                        self._on_readings_appended(name, new_rows)
+                    appended[name] = len(new_rows)
+                except Exception as e:
+                    logger.error("Error ingesting new rows for %s: %s", name, e)
+                    appended[name] = 0
+        return appended
+
+    def start_tail_ingest(self, interval):
+        """Call ingest_new_rows() every ``interval`` seconds from a daemon thread"""
+        def poll():
+            while True:
+                time.sleep(interval)
+                appended = self.ingest_new_rows()
+                if any(appended.values()):
+                    logger.info("Ingested new readings: %s", appended)
+        
+        thread = threading.Thread(target=poll, name='tail-ingest', daemon=True)
+        thread.start()
+        return thread
+
+    def _read_tail(self, state):
+        """Parse the complete lines appended to a source file since its recorded offset"""
+        path = state['path']
+        size = os.path.getsize(path)
+        if size < state['offset']:
+            logger.warning("%s shrank since it was loaded, skipping incremental ingest", path)
+            return None
+        if size == state['offset']:
+            return None
+        
+        with open(path, 'rb') as f:
+            f.seek(state['offset'])
+            data = f.read(size - state['offset'])
+        
+        # Leave a trailing partial line for the next call
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        state['offset'] += end
+        
+        rows = pd.read_csv(
+            io.BytesIO(data[:end]),
+            header=None,
+            names=state['columns'],
+            dtype=self._ingest_dtypes(path)
+        )
+        self._standardize_frame(rows, raw=True)
+        rows[self.TIMESTAMP] = self._parse_timestamps(rows[self.TIMESTAMP], path)
+        # Label rows with their position in the source file, like the initial load
+        start = state['provenance'].size
+        rows.index = pd.RangeIndex(start, start + len(rows))
+        return rows
+
+    def _clean_incremental(self, rows, state):
+        """Clean appended rows against the retained per-sensor and quantile state"""
+        provenance = state['provenance']
+        provenance.add_raw(rows.index, rows[self.SENSOR_ID], rows[self.VALUE])
+        valid = (rows[self.VALUE] >= self.MIN_VALID_VALUE) & \
+                (rows[self.VALUE] <= self.MAX_VALID_VALUE)
+        self._mark_removed(provenance, rows[~valid], OUT_OF_RANGE)
+        rows, state['last_values'] = self._filter_spikes(rows[valid], state['last_values'], provenance)
+        
+        state['summary'].update(rows[self.VALUE])
+        summary = state['summary']
+        lower, upper = self._iqr_bounds(summary.quantile(0.25), summary.quantile(0.75))
+        inside = (rows[self.VALUE] >= lower) & (rows[self.VALUE] <= upper)
+        self._mark_removed(provenance, rows[~inside], IQR_OUTLIER)
+        rows = rows[inside]
+        provenance.add_clean(rows[self.SENSOR_ID], rows[self.VALUE])
+        return rows.astype({self.VALUE: np.float32})
+
+    def _append_frames(self, base, new_rows):
+        """Append rows to a readings frame, keeping categorical columns categorical and time order"""
+        new_rows = new_rows.copy()
+        for col in base.columns:
+            if isinstance(base[col].dtype, pd.CategoricalDtype) and col in new_rows.columns:
+                categories = base[col].cat.categories
+                missing = pd.Index(new_rows[col].dropna().unique()).difference(categories)
+                if len(missing) > 0:
+                    base = base.assign(**{col: base[col].cat.add_categories(missing)})
+                    categories = base[col].cat.categories
+                new_rows[col] = pd.Categorical(new_rows[col].astype(object), categories=categories)
+        return append_by_time(base, new_rows, self.TIMESTAMP, self.SENSOR_ID)
+
+    def _on_readings_appended(self, name, new_rows):
+        """Update derived state after rows were appended to a readings dataset"""
+        if name in self._stores_ready:
+            self._readings_store.append(name, new_rows)
+        if name in self._rollups:
+            self._rollups[name].append(self._datasets.get(name), new_rows)
+        sensor_summary = self._sensor_summaries.get(name)
+        if sensor_summary is not None:
+            appended = self._summarize_sensors(sort_by_time(new_rows, self.TIMESTAMP), self._position_columns(name))
+            self._sensor_summaries[name] = self._merge_sensor_summaries(sensor_summary, appended)
+        summary = self._summaries.get(name)
+        if summary is not None:
+            summary['rows'] += len(new_rows)
+            summary['start'] = min(summary['start'], new_rows[self.TIMESTAMP].min())
+            summary['end'] = max(summary['end'], new_rows[self.TIMESTAMP].max())
+            # Distinct counts are recomputed on the next get_summary() call
+            summary['sensors'] = summary['users'] = None
+        self.data_version += 1
+
+    def _load_readings_chunked(self, path, chunk_size, state=None, size=None):
+        """
+        Stream a readings file in fixed-size chunks and clean it with bounded working memory
+        
+        Range and rate-of-change checks run per chunk, carrying each sensor's last
+        in-range value across chunk boundaries; the IQR step is finished from a
+        mergeable quantile summary of the surviving values. Produces the same rows
+        as clean_radiation_data provided each sensor's readings appear in time order
+        in the file. The carried values and the summary are stored in ``state``.
+        Only the first ``size`` bytes of the file are read, if given.
+        """
+        dtypes = self._ingest_dtypes(path)
+        last_values = pd.Series(dtype=np.float64)
+        summary = self._new_quantile_summary()
+        provenance = CleaningProvenance()
+        chunks = []
+        invalid_count = spike_count = 0
+        
+        if size is None:
+            size = os.path.getsize(path)
+        with io.BufferedReader(_SourcePrefix(path, size)) as source:
+            for chunk in pd.read_csv(source, dtype=dtypes, chunksize=chunk_size):
+                self._standardize_frame(chunk, raw=True)
+                chunk[self.TIMESTAMP] = self._parse_timestamps(chunk[self.TIMESTAMP], path)
+                provenance.add_raw(chunk.index, chunk[self.SENSOR_ID], chunk[self.VALUE])
+            
+                valid = (chunk[self.VALUE] >= self.MIN_VALID_VALUE) & \
+                        (chunk[self.VALUE] <= self.MAX_VALID_VALUE)
+                self._mark_removed(provenance, chunk[~valid], OUT_OF_RANGE)
+                in_range = chunk[valid]
+                invalid_count += len(chunk) - len(in_range)
+            
+                chunk, last_values = self._filter_spikes(in_range, last_values, provenance)
+                spike_count += len(in_range) - len(chunk)
+            
+                summary.update(chunk[self.VALUE])
+                chunks.append(chunk)
+        
+        if not chunks:
+            return pd.read_csv(path, nrows=0)
+        
+        # Per-chunk categoricals only share dtypes once their categories are unified
+        category_dtypes = {}
+        for col in chunks[0].columns:
+            if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+                categories = chunks[0][col].cat.categories
+                for chunk in chunks[1:]:
+                    categories = categories.union(chunk[col].cat.categories)
+                category_dtypes[col] = pd.CategoricalDtype(categories)
+        
+        outlier_count = 0
+        lower, upper = self._iqr_bounds(summary.quantile(0.25), summary.quantile(0.75))
+        for i, chunk in enumerate(chunks):
+            inside = (chunk[self.VALUE] >= lower) & (chunk[self.VALUE] <= upper)
+            self._mark_removed(provenance, chunk[~inside], IQR_OUTLIER)
+            kept = chunk[inside]
+            outlier_count += len(chunk) - len(kept)
+            provenance.add_clean(kept[self.SENSOR_ID], kept[self.VALUE])
+            chunks[i] = kept.astype({**category_dtypes, self.VALUE: np.float32})
+        
+        readings = pd.concat(chunks)
+        del chunks
+        if state is not None:
+            state['last_values'] = last_values
+            state['summary'] = summary
+            state['provenance'] = provenance
+        # Match the batch path's ordering (sensor, then time)
+        readings = readings.sort_values([self.SENSOR_ID, self.TIMESTAMP])
+        
+        self._log_removed(invalid_count, spike_count, outlier_count)
+        logger.info("Final clean dataset contains %d readings", len(readings))
+        return readings
+
+    def _filter_spikes(self, chunk, last_values, provenance=None):
+        """
+        Drop readings whose change from the sensor's previous in-range reading is too large
+        
+        Args:
+            chunk (pd.DataFrame): In-range readings
+            last_values (pd.Series): Sensor -> last in-range value from earlier chunks
+            provenance (CleaningProvenance): Optional record to mark removed rows in
+            
+        Returns:
+            tuple: (filtered chunk, updated last_values)
+        """
+        chunk = chunk.sort_values([self.SENSOR_ID, self.TIMESTAMP])
+        values = chunk[self.VALUE]
+        
+        previous = values.groupby(chunk[self.SENSOR_ID], observed=True).shift()
+        first = previous.isna()
+        previous[first] = chunk.loc[first, self.SENSOR_ID].map(last_values).astype(values.dtype)
+        keep = (values - previous).abs() <= self.MAX_RATE_OF_CHANGE
+        no_previous = previous.isna()
+        self._mark_removed(provenance, chunk[~keep & no_previous], NO_PREVIOUS_READING)
+        self._mark_removed(provenance, chunk[~keep & ~no_previous], RATE_OF_CHANGE)
+        
+        latest = values.groupby(chunk[self.SENSOR_ID], observed=True).last()
+        last_values = latest.combine_first(last_values).astype(values.dtype)
+        return chunk[keep], last_values
+
+    def _new_quantile_summary(self):
+        """Empty summary behind the IQR bounds: exact, or a KLLSketch of IQR_SKETCH_SIZE"""
+        if self.IQR_SKETCH_SIZE is None:
+            return ExactQuantileSummary()
+        return KLLSketch(self.IQR_SKETCH_SIZE, seed=0)
+
+    def _quantile_summary_from_frame(self, frame):
+        """Summary behind the IQR bounds restored from its cached frame"""
+        if self.IQR_SKETCH_SIZE is None:
+            return ExactQuantileSummary.from_frame(frame)
+        return KLLSketch.from_frame(frame, self.IQR_SKETCH_SIZE, seed=0)
+
+    def _iqr_bounds(self, q1, q3):
+        """Lower and upper bounds of the IQR outlier filter"""
+        iqr = q3 - q1
+        return q1 - self.IQR_MULTIPLIER * iqr, q3 + self.IQR_MULTIPLIER * iqr
+
+    def _parse_timestamps(self, values, path):
+        """Parse raw timestamps using the format detected once per source file"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        fmt = self._timestamp_formats.get(path)
+        if fmt is None:
+            # Every distinct stamp, not just the leading rows: a day-first feed looks
+            # month-first until the 13th of the month, which may be far into the file
+            fmt = detect_timestamp_format(values.unique())
+            self._timestamp_formats[path] = fmt
+        return parse_timestamps(values, fmt)
+
+    def _cache_params(self):
+        """Parameters that invalidate cached snapshots when changed"""
+        return {
+            'version': self.CACHE_VERSION,
+            'min_valid_value': self.MIN_VALID_VALUE,
+            'max_valid_value': self.MAX_VALID_VALUE,
+            'max_rate_of_change': self.MAX_RATE_OF_CHANGE,
+            'iqr_sketch_size': self.IQR_SKETCH_SIZE
+        }
+
+    def standardize_column_names(self):
+        """Standardize column names and apply the compact schema across all datasets"""
         for df in [self.static_sensors, self.static_readings, self.mobile_readings]:
             if df is not None:
-                df.columns = df.columns.str.strip()
-                df.rename(columns=column_maps, inplace=True)
+                self._standardize_frame(df)
+
+    def _standardize_frame(self, df, raw=False):
+        """
+        Standardize column names of a single dataset and apply the compact schema in place
+        
+        Args:
+            raw (bool): Readings still to be cleaned; their values stay float64
+        """
+        df.columns = df.columns.str.strip()
+        df.rename(columns=self.COLUMN_MAP, inplace=True)
+        self._apply_schema(df, raw)
+
+    def _apply_schema(self, df, raw=False):
+        """Convert standardized columns to compact dtypes in place (values too unless ``raw``)"""
+        if self.SENSOR_ID in df.columns:
+            if pd.api.types.is_numeric_dtype(df[self.SENSOR_ID]):
+                df[self.SENSOR_ID] = pd.to_numeric(df[self.SENSOR_ID], downcast='integer')
+            elif not isinstance(df[self.SENSOR_ID].dtype, pd.CategoricalDtype):
+                df[self.SENSOR_ID] = df[self.SENSOR_ID].astype('category')
+        
+        for col in self.CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        
+        for col in self.FLOAT32_COLUMNS:
+            if raw and col == self.VALUE:
+                continue
+            if col in df.columns and df[col].dtype != np.float32:
+                df[col] = df[col].astype(np.float32)
+
+    def _ingest_dtypes(self, path):
+        """Build a read_csv dtype map so wide columns are parsed straight into the compact schema (values stay float64 until cleaned)"""
+        raw_columns = pd.read_csv(path, nrows=0).columns
+        dtypes = {}
+        for raw in raw_columns:
+            column = self.COLUMN_MAP.get(raw.strip())
+            if column in self.CATEGORY_COLUMNS:
+                dtypes[raw] = 'category'
+            elif column in self.FLOAT32_COLUMNS and column != self.VALUE:
+                dtypes[raw] = np.float32
+        return dtypes
+
+    def memory_report(self):
+        """
+        Report memory usage per column under the default and the compact schema
+        
+        The 'before' figures are measured by converting each column back to the
+        dtype pandas infers from the CSV (object strings, float64, int64).
+        
+        Returns:
+            pd.DataFrame: One row per (dataset, column) with before/after bytes
+        """
+        rows = []
+        datasets = {
+            'static_sensors': self.static_sensors,
+            'static_readings': self.static_readings,
+            'mobile_readings': self.mobile_readings
+        }
+        for name, df in datasets.items():
+            if df is None:
+                continue
+            for column in df.columns:
+                series = df[column]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    default = series.astype(object)
+                elif pd.api.types.is_float_dtype(series):
+                    default = series.astype(np.float64)
+                elif pd.api.types.is_integer_dtype(series):
+                    default = series.astype(np.int64)
+                else:
+                    default = series
+                rows.append({
+                    'dataset': name,
+                    'column': column,
+                    'dtype': str(series.dtype),
+                    'before_bytes': default.memory_usage(deep=True, index=False),
+                    'after_bytes': series.memory_usage(deep=True, index=False)
+                })
+        
+        report = pd.DataFrame(rows, columns=['dataset', 'column', 'dtype', 'before_bytes', 'after_bytes'])
+        report['reduction_pct'] = (1 - report['after_bytes'] / report['before_bytes'].where(report['before_bytes'] > 0)) * 100
+        return report
 
     def filter_time_range(self, df, start_date, end_date):
-        """Filter dataframe by time range"""
+        """
+        Filter dataframe by time range
+        
+        The loaded readings datasets are kept in time order, so their ranges are
+        found with binary searches and returned as row slices; other frames are
+        filtered with a mask.
+        """
         if start_date and end_date:
             start_date = pd.to_datetime(start_date)
             end_date = pd.to_datetime(end_date)
+            index = self._time_index(df)
+            if index is not None:
+                return index.slice(start_date, end_date)
             mask = (df[self.TIMESTAMP] >= start_date) & (df[self.TIMESTAMP] <= end_date)
             return df[mask]
         return df
 
-    def calculate_period_statistics(self, static_data, mobile_data):
-        """Calculate statistics for the current time period"""
+    def _time_index(self, df):
+        """TimeIndex of a loaded readings dataset, or None if ``df`` is not one"""
+        for name in self.READINGS_DATASETS:
+            if df is not None and self._datasets.get(name) is df:
+                index = self._time_indexes.get(name)
+                if index is None or index.frame is not df:
+                    index = self._time_indexes[name] = TimeIndex(df, self.TIMESTAMP)
+                return index
+        return None
+
+    def calculate_period_statistics(self, start_date=None, end_date=None):
+        """
+        Calculate statistics of both readings datasets for a time period (see get_range_stats)
+        
+        The older call form, passing the static and mobile readings frames of the
+        period themselves, still works: those frames are aggregated directly.
+        """
         try:
+            if isinstance(start_date, pd.DataFrame) and isinstance(end_date, pd.DataFrame):
+                static, mobile = self._frame_stats(start_date), self._frame_stats(end_date)
+            else:
+                static = self.get_range_stats('static_readings', start_date, end_date)
+                mobile = self.get_range_stats('mobile_readings', start_date, end_date)
             stats = {
-                'static_mean': static_data[self.VALUE].mean(),
-                'static_max': static_data[self.VALUE].max(),
-                'static_min': static_data[self.VALUE].min(),
-                'static_std': static_data[self.VALUE].std(),
-                'mobile_mean': mobile_data[self.VALUE].mean(),
-                'mobile_max': mobile_data[self.VALUE].max(),
-                'mobile_min': mobile_data[self.VALUE].min(),
-                'mobile_std': mobile_data[self.VALUE].std(),
-                'num_static_readings': len(static_data),
-                'num_mobile_readings': len(mobile_data),
-                'unique_mobile_sensors': mobile_data[self.SENSOR_ID].nunique()
+                'static_mean': static['mean'],
+                'static_max': static['max'],
+                'static_min': static['min'],
+                'static_std': static['std'],
+                'mobile_mean': mobile['mean'],
+                'mobile_max': mobile['max'],
+                'mobile_min': mobile['min'],
+                'mobile_std': mobile['std'],
+                'num_static_readings': static['rows'],
+                'num_mobile_readings': mobile['rows'],
+                'unique_mobile_sensors': mobile['sensors']
             }
             
             # Handle NaN values
@@ -187,7 +1647,7 @@ class DataProcessor:
             return stats
             
         except Exception as e:
-            print(f"Error calculating statistics: {str(e)}")
+            logger.error("Error calculating statistics: %s", e)
             return {
                 'static_mean': 0, 'static_max': 0, 'static_min': 0, 'static_std': 0,
                 'mobile_mean': 0, 'mobile_max': 0, 'mobile_min': 0, 'mobile_std': 0,
@@ -197,7 +1657,9 @@ class DataProcessor:
     
     def get_sensor_stats(self):
         """Get basic statistics about the sensors"""
-        if self.static_sensors is None or self.static_readings is None or self.mobile_readings is None:
+        static_summary = self.get_summary('static_readings')
+        mobile_summary = self.get_summary('mobile_readings')
+        if self.static_sensors is None or static_summary is None or mobile_summary is None:
             return {
                 'static_sensor_count': 0,
                 'mobile_sensor_count': 0,
@@ -209,25 +1671,23 @@ class DataProcessor:
             
         return {
             'static_sensor_count': len(self.static_sensors[self.SENSOR_ID].unique()),
-            'mobile_sensor_count': len(self.mobile_readings[self.SENSOR_ID].unique()),
-            'unique_users': len(self.mobile_readings[self.USER_ID].unique()),
+            'mobile_sensor_count': mobile_summary['sensors'],
+            'unique_users': mobile_summary['users'],
             'date_range': (self.start_date, self.end_date),
-            'static_reading_count': len(self.static_readings),
-            'mobile_reading_count': len(self.mobile_readings)
+            'static_reading_count': static_summary['rows'],
+            'mobile_reading_count': mobile_summary['rows']
         }
     
     def get_hourly_averages(self, sensor_type='static'):
-        """Calculate hourly radiation averages"""
-        if sensor_type == 'static':
-            df = self.static_readings
-        else:
-            df = self.mobile_readings
-            
-        return df.groupby([
-            df[self.TIMESTAMP].dt.date,
-            df[self.TIMESTAMP].dt.hour,
-            self.SENSOR_ID
-        ])[self.VALUE].mean().reset_index()
+        """Calculate hourly radiation averages per sensor (date, hour, sensor_id, value)"""
+        name = 'static_readings' if sensor_type == 'static' else 'mobile_readings'
+        hourly = self.get_bucketed_averages(name, '1h', by_sensor=True)
+        return pd.DataFrame({
+            'date': hourly[self.TIMESTAMP].dt.date,
+            'hour': hourly[self.TIMESTAMP].dt.hour,
+            self.SENSOR_ID: hourly[self.SENSOR_ID],
+            self.VALUE: hourly['mean']
+        })
     
     def get_sensor_locations(self, timestamp=None):
         """Get sensor locations at a specific timestamp"""
@@ -270,28 +1730,23 @@ class DataProcessor:
                 }
                 
             total_neighborhoods = len(self.gdf)
-            neighborhoods_with_data = set()
+            geometry = self._neighborhood_geometry()
+            covered = []
             
-            # Check actual reading locations, not just sensor positions
+            # Check actual reading locations, not just sensor positions: a static
+            # sensor's readings are all at its location, so sensors with readings suffice
             if static_sensors is not None:
-                static_readings = pd.merge(
-                    static_sensors,
-                    self.static_readings,
-                    on=self.SENSOR_ID
-                )
-                
-                for _, reading in static_readings.iterrows():
-                    point = Point(reading[self.LONGITUDE], reading[self.LATITUDE])
-                    for idx, neighborhood in self.gdf.iterrows():
-                        if point.within(neighborhood.geometry):
-                            neighborhoods_with_data.add(neighborhood.get('Nbrhood', str(idx)))
+                counts = self.get_sensor_counts('static_readings')
+                with_readings = static_sensors[static_sensors[self.SENSOR_ID].isin(counts.index[counts > 0])]
+                covered.append(geometry.covered(with_readings[self.LONGITUDE], with_readings[self.LATITUDE]))
             
             if mobile_readings is not None:
-                for _, reading in mobile_readings.iterrows():
-                    point = Point(reading[self.LONGITUDE], reading[self.LATITUDE])
-                    for idx, neighborhood in self.gdf.iterrows():
-                        if point.within(neighborhood.geometry):
-                            neighborhoods_with_data.add(neighborhood.get('Nbrhood', str(idx)))
+                covered.append(geometry.covered(mobile_readings[self.LONGITUDE], mobile_readings[self.LATITUDE]))
+            
+            neighborhoods_with_data = set()
+            for idx in np.unique(np.concatenate(covered)) if covered else []:
+                neighborhood = self.gdf.iloc[idx]
+                neighborhoods_with_data.add(neighborhood.get('Nbrhood', str(self.gdf.index[idx])))
             
             num_covered = len(neighborhoods_with_data)
             coverage_pct = (num_covered / total_neighborhoods * 100) if total_neighborhoods > 0 else 0
@@ -309,9 +1764,7 @@ class DataProcessor:
             }
             
         except Exception as e:
-            print(f"Error calculating coverage statistics: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Error calculating coverage statistics: %s", e)
             return {
                 'total_neighborhoods': 0,
                 'covered_neighborhoods': 0,
@@ -320,6 +1773,13 @@ class DataProcessor:
                 'neighborhoods_without_data': []
             }
             
+    def _neighborhood_geometry(self):
+        """NeighborhoodGeometry of self.gdf: the shared registry entry unless gdf was replaced"""
+        geometry = get_geometry(self.SHAPEFILE_PATH)
+        if geometry is None or geometry.gdf is not self.gdf:
+            geometry = NeighborhoodGeometry(self.gdf)
+        return geometry
+
     # Add these methods to your DataProcessor class
 
     def calculate_sensor_quality(self, sensor_id=None, readings=None):
@@ -387,44 +1847,57 @@ class DataProcessor:
             }
 
         except Exception as e:
-            print(f"Error calculating quality score: {str(e)}")
+            logger.error("Error calculating quality score: %s", e)
             return None
 
+    def get_provenance(self, name='static_readings'):
+        """
+        Cleaning provenance of a readings dataset (cleaning the dataset if needed)
+        
+        Returns:
+            CleaningProvenance: Removal reason per raw row and per-sensor raw/clean statistics
+        """
+        if self._readings_store is not None and name in self._store_builders:
+            self._prepare_store(name)
+        elif getattr(self, name) is None:
+            return None
+        state = self._tail_state.get(name)
+        return state['provenance'] if state is not None else None
+
     def get_raw_data_insights(self, sensor_id=None):
         """
         Generate insights about raw data before and after cleaning
+        
+        Answered from the provenance retained by the cleaning pass, without
+        re-reading the raw file.
+        
         Args:
             sensor_id: Optional specific sensor to analyze
         """
         try:
-            # Load raw data again for comparison
-            raw_readings = pd.read_csv('../data/StaticSensorReadings.csv')
-            raw_readings[self.TIMESTAMP] = pd.to_datetime(raw_readings[self.TIMESTAMP])
-            
-            if sensor_id:
-                raw_readings = raw_readings[raw_readings[self.SENSOR_ID] == sensor_id]
-                clean_readings = self.static_readings[
-                    self.static_readings[self.SENSOR_ID] == sensor_id
-                ]
-            else:
-                clean_readings = self.static_readings
+            provenance = self.get_provenance('static_readings')
+            summary = provenance.summary(sensor_id if sensor_id else None) if provenance else None
+            if summary is None or summary['raw']['rows'] == 0:
+                raise ValueError(f"no raw readings recorded for sensor {sensor_id}")
+            raw, clean = summary['raw'], summary['clean']
 
             insights = {
-                'raw_count': len(raw_readings),
-                'cleaned_count': len(clean_readings),
-                'removed_percentage': (1 - len(clean_readings)/len(raw_readings)) * 100,
+                'raw_count': raw['rows'],
+                'cleaned_count': clean['rows'],
+                'removed_percentage': (1 - clean['rows']/raw['rows']) * 100,
                 'raw_stats': {
-                    'mean': raw_readings[self.VALUE].mean(),
-                    'std': raw_readings[self.VALUE].std(),
-                    'min': raw_readings[self.VALUE].min(),
-                    'max': raw_readings[self.VALUE].max()
+                    'mean': raw['mean'],
+                    'std': raw['std'],
+                    'min': raw['min'],
+                    'max': raw['max']
                 },
                 'cleaned_stats': {
-                    'mean': clean_readings[self.VALUE].mean(),
-                    'std': clean_readings[self.VALUE].std(),
-                    'min': clean_readings[self.VALUE].min(),
-                    'max': clean_readings[self.VALUE].max()
+                    'mean': clean['mean'],
+                    'std': clean['std'],
+                    'min': clean['min'],
+                    'max': clean['max']
                 },
+                'removal_reasons': summary['removed'],
                 'cleaning_impact': []
             }
 
@@ -445,5 +1918,5 @@ class DataProcessor:
             return insights
 
         except Exception as e:
-            print(f"Error generating raw data insights: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error("Error generating raw data insights: %s", e)
+            return None
@@ -0,0 +1,200 @@
+# app/utils/distinct_cube.py
+import numpy as np
+import pandas as pd
+
+from .hll import HyperLogLog, hash_rows, register_updates
+
+# Bucket widths sketched, finest first; each level's registers are merged from the one below
+LEVELS = ['1h', '1D']
+
+
+class DistinctCube:
+    """
+    HyperLogLog registers of the distinct keys of a time-sorted readings frame per time bucket.
+
+    Each key (e.g. sensors, users or rounded locations) gets registers per
+    hourly and per daily bucket holding readings. A time window is answered
+    with the register-wise maximum over the whole days inside it, the whole
+    hours around those days and the raw rows of the partial hours at either
+    end; every row's register and rank are computed once up front, so no
+    hashing happens at query time.
+
+    An hour usually holds few readings compared with the 2**precision
+    registers, so hourly buckets keep only their nonzero registers, as
+    (register, rank) pairs, unless a dense row would be smaller; daily
+    buckets keep a dense row of registers each.
+    """
+
+    def __init__(self, frame, time_column, keys, precision=12):
+        """
+        Args:
+            frame (pd.DataFrame): Readings sorted with time_index.sort_by_time
+            keys (dict): Key name -> frame of the key columns, aligned with ``frame``;
+                rows with a missing key value are not counted
+            precision (int): Registers per sketch are 2**precision
+        """
+        self.frame = frame
+        self.precision = precision
+        self._times = frame[time_column].to_numpy()
+        self._widths = [pd.Timedelta(freq).value for freq in LEVELS]
+        self._timed = int(np.searchsorted(self._times, np.datetime64('NaT'), side='left'))
+        self._rows = {}  # key name -> (register index, rank) per row; rank 0 adds nothing
+        for name, columns in keys.items():
+            hashes, valid = hash_rows(columns)
+            index, rank = register_updates(hashes, precision)
+            rank[~valid] = 0
+            self._rows[name] = (index, rank)
+
+        ids = self._times[:self._timed].view(np.int64) // self._widths[0] * self._widths[0]
+        self.levels = {name: [self._register_rows(ids, *rows)] for name, rows in self._rows.items()}
+        for width in self._widths[1:]:
+            for levels in self.levels.values():
+                levels.append(self._merge_level(levels[-1], width))
+
+    def sketch(self, start=None, end=None):
+        """
+        Distinct counters of the readings with start <= timestamp <= end
+
+        Args:
+            start, end: Inclusive bounds; every reading (missing timestamps
+                included) if either is None
+
+        Returns:
+            dict: Key name -> HyperLogLog
+        """
+        spans, rows = [], []
+        if start is None or end is None:
+            spans.append((len(LEVELS) - 1, slice(None)))
+            rows.append((self._timed, len(self._times)))
+        else:
+            self._cover(spans, rows, pd.Timestamp(start).value, pd.Timestamp(end).value + 1, len(LEVELS) - 1)
+
+        result = {}
+        for name, (index, rank) in self._rows.items():
+            counter = HyperLogLog(self.precision)
+            for level, inside in spans:
+                registers = self.levels[name][level][1]
+                if isinstance(registers, BucketRegisters):
+                    registers.merge_into(counter.registers, inside)
+                elif len(registers[inside]) > 0:
+                    np.maximum(counter.registers, registers[inside].max(axis=0), out=counter.registers)
+            for lo, hi in rows:
+                np.maximum.at(counter.registers, index[lo:hi], rank[lo:hi])
+            result[name] = counter
+        return result
+
+    def _cover(self, spans, rows, lo, hi, level):
+        """
+        Collect the (level, bucket slice) spans and raw row ranges that together
+        cover lo <= time < hi (nanoseconds)
+        """
+        if lo >= hi:
+            return
+        if level < 0:
+            positions = np.searchsorted(self._times, np.array([lo, hi], dtype='datetime64[ns]'), side='left')
+            rows.append((int(positions[0]), int(positions[1])))
+            return
+        width = self._widths[level]
+        first, last = -(-lo // width) * width, hi // width * width
+        if first >= last:
+            self._cover(spans, rows, lo, hi, level - 1)
+            return
+        self._cover(spans, rows, lo, first, level - 1)
+        # Bucket ids are the same for every key, so any key's level gives the slice
+        ids = next(iter(self.levels.values()))[level][0] if self.levels else np.zeros(0, dtype=np.int64)
+        spans.append((level, slice(int(np.searchsorted(ids, first, side='left')),
+                                   int(np.searchsorted(ids, last, side='left')))))
+        self._cover(spans, rows, last, hi, level - 1)
+
+    @property
+    def nbytes(self):
+        """Memory held by the registers of every key and level"""
+        return sum(registers.nbytes for levels in self.levels.values() for _, registers in levels)
+
+    def _register_rows(self, ids, index, rank):
+        """Finest level: bucket ids (start in nanoseconds) and the registers of each bucket"""
+        m = 1 << self.precision
+        change = np.ones(len(ids), dtype=bool)
+        change[1:] = ids[1:] != ids[:-1]
+        bucket = np.cumsum(change) - 1
+        rank = rank[:len(ids)]
+        updates = rank > 0
+        slots = bucket[updates] * m + index[:len(ids)][updates]
+        ranks = rank[updates]
+        # Sorted by slot and then rank, the last entry of each slot holds its register
+        order = np.lexsort((ranks, slots))
+        slots, ranks = slots[order], ranks[order]
+        last = np.ones(len(slots), dtype=bool)
+        last[:-1] = slots[1:] != slots[:-1]
+        return ids[change], BucketRegisters(slots[last] // m, (slots[last] % m).astype(np.uint16),
+                                            ranks[last], int(change.sum()), m)
+
+    def _merge_level(self, finer, width):
+        """Coarser level with buckets of ``width`` merged from the finer level's registers"""
+        finer_ids, finer_registers = finer
+        ids = finer_ids // width * width
+        if len(ids) == 0:
+            return ids, np.zeros((0, 1 << self.precision), dtype=np.uint8)
+        starts = np.flatnonzero(np.diff(ids, prepend=ids[0] - 1))
+        if isinstance(finer_registers, BucketRegisters):
+            return ids[starts], finer_registers.reduce(starts, 1 << self.precision)
+        return ids[starts], np.maximum.reduceat(finer_registers, starts, axis=0)
+
+
+class BucketRegisters:
+    """
+    HyperLogLog registers of consecutive buckets, each stored in whichever
+    form is smaller: the nonzero registers as (register, rank) pairs, or a
+    dense row of all 2**precision registers
+    """
+
+    # Bytes per stored pair: a uint16 register index and a uint8 rank
+    PAIR_BYTES = 3
+
+    def __init__(self, bucket, index, rank, buckets, m):
+        """
+        Args:
+            bucket, index, rank: Nonzero registers, sorted by bucket, at most one
+                entry per register of a bucket
+            buckets (int): Number of buckets
+            m (int): Registers per bucket
+        """
+        counts = np.bincount(bucket, minlength=buckets)
+        dense = counts * self.PAIR_BYTES >= m
+        # Row of each bucket in ``rows``, -1 for buckets stored as pairs
+        self.row = np.where(dense, np.cumsum(dense) - 1, -1)
+        self.rows = np.zeros((int(dense.sum()), m), dtype=np.uint8)
+        in_dense = dense[bucket]
+        self.rows[self.row[bucket[in_dense]], index[in_dense]] = rank[in_dense]
+        self.offsets = np.concatenate([[0], np.cumsum(np.where(dense, 0, counts))])
+        self.index = index[~in_dense]
+        self.rank = rank[~in_dense]
+
+    def __len__(self):
+        return len(self.row)
+
+    @property
+    def nbytes(self):
+        return self.row.nbytes + self.rows.nbytes + self.offsets.nbytes + self.index.nbytes + self.rank.nbytes
+
+    def merge_into(self, registers, buckets):
+        """Raise dense ``registers`` to the registers of a slice of buckets"""
+        first, last, _ = buckets.indices(len(self))
+        last = max(first, last)
+        lo, hi = self.offsets[first], self.offsets[last]
+        np.maximum.at(registers, self.index[lo:hi], self.rank[lo:hi])
+        rows = self.row[first:last]
+        rows = rows[rows >= 0]
+        if len(rows) > 0:
+            np.maximum(registers, self.rows[rows].max(axis=0), out=registers)
+
+    def reduce(self, starts, m):
+        """Dense registers of the groups of buckets beginning at ``starts``"""
+        group = np.cumsum(np.isin(np.arange(len(self)), starts)) - 1
+        entry_group = np.repeat(group, np.diff(self.offsets))
+        registers = np.zeros(len(starts) * m, dtype=np.uint8)
+        np.maximum.at(registers, entry_group * m + self.index, self.rank)
+        registers = registers.reshape(-1, m)
+        dense = self.row >= 0
+        np.maximum.at(registers, group[dense], self.rows[self.row[dense]])
+        return registers
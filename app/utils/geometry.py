@@ -0,0 +1,172 @@
+# app/utils/geometry.py
+import os
+import threading
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from .audit import get_logger
+
+logger = get_logger('geometry')
+
+SHAPEFILE_PATH = '../data/StHimarkNeighborhoodShapefile/StHimark.shp'
+NAME_COLUMN = 'Nbrhood'
+
+_registry = {}  # Absolute shapefile path -> NeighborhoodGeometry
+_registry_lock = threading.Lock()
+
+
+class NeighborhoodGeometry:
+    """
+    Neighborhood polygons reprojected to EPSG:4326, with what the maps draw precomputed.
+
+    One instance per shapefile is shared by every MapVisualizer and
+    DataProcessor in the process (see get_geometry), so ``gdf`` and the arrays
+    must be treated as read-only.
+    """
+
+    def __init__(self, gdf):
+        self.gdf = gdf
+        if NAME_COLUMN in gdf.columns:
+            self.names = gdf[NAME_COLUMN].fillna('').astype(str).tolist()
+        else:
+            self.names = [''] * len(gdf)
+        self.outlines = [_exterior_coordinates(geom) for geom in gdf.geometry]
+        # Per shapely geometry, as the maps always did: label positions, not measurements
+        self.centroids = np.array(
+            [(geom.centroid.x, geom.centroid.y) if geom is not None and not geom.is_empty else (np.nan, np.nan)
+             for geom in gdf.geometry],
+            dtype=np.float64
+        ).reshape(-1, 2)
+        self.bounds = gdf.geometry.total_bounds  # minx, miny, maxx, maxy
+        self._tree = None  # STRtree over the polygons, built on first lookup
+
+    def __len__(self):
+        return len(self.gdf)
+
+    def locate(self, lons, lats):
+        """
+        Neighborhood each point lies within
+
+        Identical coordinates are looked up once, and the distinct points are
+        matched against an STRtree of the polygons in one bulk query, as
+        Point.within would (points on a boundary are outside).
+
+        Returns:
+            np.ndarray: Per point the position in ``gdf`` of the first polygon
+                holding it, -1 if none does or a coordinate is missing
+        """
+        codes, xs, ys = _distinct_points(lons, lats)
+        points, polygons = self._within(xs, ys)
+        first = np.full(len(xs), len(self), dtype=np.int64)
+        np.minimum.at(first, points, polygons)
+        first[first == len(self)] = -1
+        return np.where(codes >= 0, first[codes], -1)
+
+    def covered(self, lons, lats):
+        """Positions in ``gdf`` of the polygons holding at least one of the points"""
+        _, xs, ys = _distinct_points(lons, lats)
+        return np.unique(self._within(xs, ys)[1])
+
+    def _within(self, xs, ys):
+        """(point, polygon) position pairs of points lying within polygons"""
+        if self._tree is None:
+            # Building twice under concurrent first use is harmless; the assignment is atomic
+            self._tree = shapely.STRtree(self.gdf.geometry.to_numpy())
+        if len(xs) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self._tree.query(shapely.points(xs, ys), predicate='within')
+
+    @property
+    def center(self):
+        """(lat, lon) of the middle of the bounds"""
+        return (self.bounds[1] + self.bounds[3]) / 2, (self.bounds[0] + self.bounds[2]) / 2
+
+
+def get_geometry(shapefile_path=SHAPEFILE_PATH):
+    """
+    Load a neighborhood shapefile once per process
+
+    Args:
+        shapefile_path (str): Path to the .shp file
+
+    Returns:
+        NeighborhoodGeometry: Shared geometry, or None if the file could not be loaded
+    """
+    key = os.path.abspath(shapefile_path)
+    geometry = _registry.get(key)
+    if geometry is not None:
+        return geometry
+
+    with _registry_lock:
+        if key not in _registry:
+            geometry = _load(shapefile_path)
+            if geometry is None:
+                return None
+            _registry[key] = geometry
+        return _registry[key]
+
+
+def clear_geometry():
+    """Forget loaded shapefiles, e.g. after the file changed on disk"""
+    with _registry_lock:
+        _registry.clear()
+
+
+def _load(shapefile_path):
+    logger.info("Loading shapefile from: %s", os.path.abspath(shapefile_path))
+    if not os.path.exists(shapefile_path):
+        parent_dir = os.path.dirname(shapefile_path)
+        logger.error(
+            "Shapefile not found at %s (working directory %s, contents of %s: %s)",
+            shapefile_path, os.getcwd(), parent_dir,
+            os.listdir(parent_dir) if os.path.exists(parent_dir) else "directory does not exist"
+        )
+        return None
+
+    try:
+        gdf = gpd.read_file(shapefile_path)
+        logger.info("Loaded %d neighborhoods with columns %s", len(gdf), gdf.columns.tolist())
+
+        if gdf.crs != 'EPSG:4326':
+            logger.info("Converting CRS from %s to EPSG:4326", gdf.crs)
+            gdf = gdf.to_crs('EPSG:4326')
+        return NeighborhoodGeometry(gdf)
+    except Exception as e:
+        logger.exception("Error loading shapefile: %s", e)
+        return None
+
+
+def _exterior_coordinates(geom):
+    """
+    Longitudes and latitudes of a polygon's exterior ring
+
+    MultiPolygon rings are joined with None separators so they draw as one
+    Scattermapbox line trace. Returns two empty lists for other geometry types.
+    """
+    if geom is None or geom.is_empty:
+        return [], []
+    if geom.geom_type == 'Polygon':
+        lons, lats = zip(*geom.exterior.coords)
+        return list(lons), list(lats)
+    if geom.geom_type == 'MultiPolygon':
+        lons, lats = [], []
+        for polygon in geom.geoms:
+            poly_lons, poly_lats = zip(*polygon.exterior.coords)
+            lons += list(poly_lons) + [None]
+            lats += list(poly_lats) + [None]
+        return lons, lats
+    return [], []
+
+
+def _distinct_points(lons, lats):
+    """
+    Distinct (lon, lat) pairs, hashed as complex numbers
+
+    Returns:
+        tuple: (code of each point's pair, -1 if a coordinate is missing; distinct
+            longitudes; distinct latitudes)
+    """
+    keys = np.asarray(lons, dtype=np.float64) + 1j * np.asarray(lats, dtype=np.float64)
+    codes, distinct = pd.factorize(keys)
+    return codes, distinct.real, distinct.imag
@@ -0,0 +1,126 @@
+# app/utils/hll.py
+import numpy as np
+import pandas as pd
+
+
+def hash_rows(frame):
+    """
+    64-bit hash of every row of a frame of key columns
+
+    Returns:
+        tuple: (hashes as uint64, mask of the rows with no missing key value)
+    """
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy(np.uint64)
+    return hashes, frame.notna().all(axis=1).to_numpy()
+
+
+def register_updates(hashes, precision):
+    """
+    Register index and rank of each hash
+
+    The top ``precision`` bits pick the register; the rank is the position of
+    the first set bit among the rest (a guard bit caps it at 65 - precision).
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.uint32)
+    rest = (hashes << np.uint64(precision)) | np.uint64(1 << (precision - 1))
+    return index, _leading_zeros(rest) + np.uint8(1)
+
+
+def _leading_zeros(x):
+    """Leading zero bits of non-zero uint64 values, by binary search on the bit length"""
+    zeros = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (x >> np.uint64(64 - shift)) == 0
+        zeros[empty] += shift
+        x = np.where(empty, x << np.uint64(shift), x)
+    return zeros
+
+
+def estimate(registers, precision):
+    """
+    Distinct-count estimate from HyperLogLog registers
+
+    Ertl's improved estimator ("New cardinality estimation algorithms for
+    HyperLogLog sketches", 2017) works from the histogram of register values
+    and, unlike the original estimator, needs neither a switch to linear
+    counting nor bias-correction tables to stay unbiased from small counts up.
+    """
+    m = len(registers)
+    q = 64 - precision
+    histogram = np.bincount(registers, minlength=q + 2).astype(np.float64)
+    z = m * _tau(1 - histogram[q + 1] / m)
+    for k in range(q, 0, -1):
+        z = 0.5 * (z + histogram[k])
+    z += m * _sigma(histogram[0] / m)
+    return int(round(m * m / (2 * np.log(2) * z)))
+
+
+def _sigma(x):
+    if x == 1:
+        return np.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x):
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    Mergeable approximate distinct counter (HyperLogLog).
+
+    Keeps 2**precision one-byte registers, each holding the longest run of
+    leading zeros seen among the hashes routed to it. Merging two counters takes
+    the register-wise maximum, so the counter of a union is the merge of the
+    parts' counters whatever they overlap. count() has a standard error of
+    about 1.04 / sqrt(2**precision) of the true count (relative_error; 1.6%
+    with the default 4096 registers) and is near exact for small counts.
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add the non-missing values of an array or Series"""
+        values = pd.Series(values)
+        self.add_hashes(*hash_rows(values.to_frame()))
+        return self
+
+    def add_hashes(self, hashes, valid=None):
+        """Add 64-bit hashes (only those where ``valid`` is True, if given)"""
+        if valid is not None:
+            hashes = hashes[valid]
+        index, rank = register_updates(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """Add another counter of the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self):
+        """Standard error of count() relative to the true count"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def count(self):
+        return estimate(self.registers, self.precision)
@@ -1,52 +1,23 @@
 # app/utils/mapping.py
-import geopandas as gpd
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from shapely.geometry import Point
-import os
 import numpy as np  # Added numpy import
 from .data_processing import DataProcessor
+from .geometry import SHAPEFILE_PATH, get_geometry
+from .audit import get_logger
+
+logger = get_logger('mapping')
 
 class MapVisualizer:
-    def __init__(self, shapefile_path='../data/StHimarkNeighborhoodShapefile/StHimark.shp'):
-        print("\n=== Initializing MapVisualizer ===")
-        print(f"Looking for shapefile at: {os.path.abspath(shapefile_path)}")
-        
-        try:
-            if not os.path.exists(shapefile_path):
-                print(f"ERROR: Shapefile not found at {shapefile_path}")
-                print("Current working directory:", os.getcwd())
-                parent_dir = os.path.dirname(shapefile_path)
-                if os.path.exists(parent_dir):
-                    print(f"Contents of {parent_dir}:", os.listdir(parent_dir))
-                else:
-                    print(f"Directory {parent_dir} does not exist")
-                self.gdf = None
-                return
-                
-            self.gdf = gpd.read_file(shapefile_path)
-            print("Successfully loaded shapefile")
-            print("Shapefile columns:", self.gdf.columns.tolist())
-            print("Number of neighborhoods:", len(self.gdf))
-            
-            # Print first few rows of data
-            print("\nSample of neighborhood data:")
-            print(self.gdf[['Nbrhood']].head())
-            
-            if self.gdf.crs != 'EPSG:4326':
-                print(f"Converting CRS from {self.gdf.crs} to EPSG:4326")
-                self.gdf = self.gdf.to_crs('EPSG:4326')
-                
-        except Exception as e:
-            print(f"ERROR loading shapefile: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            self.gdf = None
+    def __init__(self, shapefile_path=SHAPEFILE_PATH):
+        # The shapefile is loaded and reprojected once per process and shared
+        self.geometry = get_geometry(shapefile_path)
+        self.gdf = self.geometry.gdf if self.geometry is not None else None
 
     def create_base_map(self, active_layers=None):
         """Create base map with neighborhood boundaries"""
-        print("\n=== Creating Base Map ===")
+        logger.debug("Creating base map")
         if active_layers is None:
             active_layers = ['static', 'mobile', 'boundaries']
                 
@@ -54,23 +25,14 @@ class MapVisualizer:
         
         # Add neighborhood boundaries if available
         if self.gdf is not None and 'boundaries' in active_layers:
-            print(f"Adding neighborhoods. Number of neighborhoods: {len(self.gdf)}")
+            logger.debug("Adding %d neighborhoods", len(self.gdf))
             
-            # Convert each polygon to line coordinates
-            for idx, row in self.gdf.iterrows():
+            # Outlines and label positions are precomputed by the geometry registry
+            for idx, ((lons, lats), name) in enumerate(zip(self.geometry.outlines, self.geometry.names)):
                 try:
-                    # Extract polygon coordinates
-                    if row.geometry.type == 'Polygon':
-                        coords = row.geometry.exterior.coords
-                        lons, lats = zip(*coords)
-                    elif row.geometry.type == 'MultiPolygon':
-                        lons, lats = [], []
-                        for polygon in row.geometry.geoms:
-                            coords = polygon.exterior.coords
-                            poly_lons, poly_lats = zip(*coords)
-                            lons += list(poly_lons) + [None]
-                            lats += list(poly_lats) + [None]
-                    
+                    if not lons:
+                        continue
+
                     # Add boundary lines
                     fig.add_trace(go.Scattermapbox(
                         lon=lons,
@@ -80,26 +42,26 @@ class MapVisualizer:
                             width=2,
                             color='rgb(70,70,70)'
                         ),
-                        name=f"Neighborhood: {row.get('Nbrhood', 'unnamed')}",
+                        name=f"Neighborhood: {name or 'unnamed'}",
                         hoverinfo='text',
-                        text=f"Neighborhood: {row.get('Nbrhood', 'unnamed')}",
+                        text=f"Neighborhood: {name or 'unnamed'}",
                         showlegend=False
                     ))
                     
                     # Add neighborhood labels at centroid
-                    centroid = row.geometry.centroid
+                    centroid_lon, centroid_lat = self.geometry.centroids[idx]
                     fig.add_trace(go.Scattermapbox(
-                        lon=[centroid.x],
-                        lat=[centroid.y],
+                        lon=[centroid_lon],
+                        lat=[centroid_lat],
                         mode='text',
-                        text=[row.get('Nbrhood', '')],
+                        text=[name],
                         textfont=dict(size=10, color='rgb(50,50,50)'),
                         showlegend=False,
                         hoverinfo='none'
                     ))
                     
                 except Exception as e:
-                    print(f"Error adding neighborhood {idx}: {str(e)}")
+                    logger.warning("Error adding neighborhood %s: %s", idx, e)
         
         # Set map center and zoom
         center_lat = 42.0
@@ -107,17 +69,16 @@ class MapVisualizer:
         zoom = -1
         
         if self.gdf is not None:
-            bounds = self.gdf.geometry.total_bounds
-            print(f"Map bounds: {bounds}")
-            center_lat = (bounds[1] + bounds[3]) / 2
-            center_lon = (bounds[0] + bounds[2]) / 2
+            bounds = self.geometry.bounds
+            logger.debug("Map bounds: %s", bounds)
+            center_lat, center_lon = self.geometry.center
             
             # Calculate zoom level based on bounds
             lat_range = bounds[3] - bounds[1]
             if lat_range > 0:
                 zoom = 10.75
         
-        print(f"Map center: ({center_lat}, {center_lon}), Zoom: {zoom}")
+        logger.debug("Map center: (%s, %s), zoom: %s", center_lat, center_lon, zoom)
         
         fig.update_layout(
             mapbox=dict(
@@ -140,7 +101,12 @@ class MapVisualizer:
         return fig
     
     def add_sensors(self, fig, static_sensors, mobile_readings=None, active_layers=None):
-        """Add sensor locations to the map"""
+        """
+        Add sensor locations to the map
+        
+        ``mobile_readings`` are either readings, placed at each sensor's latest one, or
+        one row per sensor at its latest position (see DataProcessor.get_sensor_aggregates).
+        """
         if active_layers is None:
             active_layers = ['static', 'mobile']
             
@@ -162,7 +128,9 @@ class MapVisualizer:
         
         # Add mobile sensors
         if mobile_readings is not None and 'mobile' in active_layers:
-            latest_readings = mobile_readings.sort_values(DataProcessor.TIMESTAMP).groupby(DataProcessor.SENSOR_ID).last()
+            latest_readings = mobile_readings
+            if DataProcessor.TIMESTAMP in mobile_readings.columns:
+                latest_readings = mobile_readings.sort_values(DataProcessor.TIMESTAMP).groupby(DataProcessor.SENSOR_ID).last()
             fig.add_trace(go.Scattermapbox(
                 lat=latest_readings[DataProcessor.LATITUDE],
                 lon=latest_readings[DataProcessor.LONGITUDE],
@@ -180,8 +148,13 @@ class MapVisualizer:
         return fig
 
     def add_radiation_heatmap(self, fig, readings, static_sensors, active_layers=None):
-        """Add radiation heatmap layer"""
-        print("\n=== Adding Radiation Heatmap ===")
+        """
+        Add radiation heatmap layer
+        
+        ``readings`` may also be per-sensor aggregates (count and mean, see
+        DataProcessor.get_sensor_aggregates), averaged per location by their counts.
+        """
+        logger.debug("Adding radiation heatmap")
         if active_layers is None or 'heatmap' not in active_layers:
             return fig
             
@@ -195,11 +168,15 @@ class MapVisualizer:
             )
             
             # Calculate average values for each location
-            heatmap_data = heatmap_data.groupby(
-                [DataProcessor.LATITUDE, DataProcessor.LONGITUDE]
-            )[DataProcessor.VALUE].mean().reset_index()
+            locations = [DataProcessor.LATITUDE, DataProcessor.LONGITUDE]
+            if 'count' in heatmap_data.columns and 'mean' in heatmap_data.columns:
+                heatmap_data['total'] = heatmap_data['count'] * heatmap_data['mean']
+                totals = heatmap_data.groupby(locations)[['total', 'count']].sum()
+                heatmap_data = (totals['total'] / totals['count']).rename(DataProcessor.VALUE).reset_index()
+            else:
+                heatmap_data = heatmap_data.groupby(locations)[DataProcessor.VALUE].mean().reset_index()
             
-            print(f"Generated heatmap data: {len(heatmap_data)} locations")
+            logger.debug("Generated heatmap data: %d locations", len(heatmap_data))
             
             # Add heatmap layer with optimized properties
             fig.add_trace(go.Densitymapbox(
@@ -233,32 +210,52 @@ class MapVisualizer:
             return fig
             
         except Exception as e:
-            print(f"ERROR creating heatmap: {str(e)}")
-            import traceback
-            print("Full traceback:")
-            print(traceback.format_exc())
+            logger.exception("Error creating heatmap: %s", e)
             return fig
         
-    def add_animated_radiation_data(self, fig, readings, sensors, sensor_type, time_agg, animation_speed, active_layers):
-        """Add animated radiation visualization for either static or mobile sensors with improved heatmap handling"""
+    def add_animated_radiation_data(self, fig, readings, sensors, sensor_type, time_agg, animation_speed, active_layers,
+                                    buckets=None):
+        """
+        Add animated radiation visualization for either static or mobile sensors with improved heatmap handling
+
+        For static sensors, ``buckets`` may hold per-sensor means and counts per
+        ``time_agg`` bucket (DataProcessor.get_bucketed_averages with by_sensor);
+        they are combined per location instead of grouping the raw readings.
+        """
         try:
             # Prepare data
-            if sensor_type == 'static':
+            if sensor_type == 'static' and buckets is not None:
                 data = pd.merge(
-                    readings,
+                    buckets[[DataProcessor.TIMESTAMP, DataProcessor.SENSOR_ID, 'mean', 'count']],
                     sensors,
                     on=DataProcessor.SENSOR_ID,
                     how='inner'
                 )
+                data['total'] = data['mean'] * data['count']
+                time_groups = data.groupby([
+                    DataProcessor.TIMESTAMP,
+                    DataProcessor.LATITUDE,
+                    DataProcessor.LONGITUDE
+                ])[['total', 'count']].sum().reset_index()
+                time_groups['mean'] = time_groups['total'] / time_groups['count']
+                time_groups = time_groups.drop(columns='total')
             else:
-                data = readings.copy()
-            
-            # Group data by time period
-            time_groups = data.groupby([
-                pd.Grouper(key=DataProcessor.TIMESTAMP, freq=time_agg),
-                DataProcessor.LATITUDE,
-                DataProcessor.LONGITUDE
-            ])[DataProcessor.VALUE].agg(['mean', 'count']).reset_index()
+                if sensor_type == 'static':
+                    data = pd.merge(
+                        readings,
+                        sensors,
+                        on=DataProcessor.SENSOR_ID,
+                        how='inner'
+                    )
+                else:
+                    data = readings.copy()
+
+                # Group data by time period
+                time_groups = data.groupby([
+                    pd.Grouper(key=DataProcessor.TIMESTAMP, freq=time_agg),
+                    DataProcessor.LATITUDE,
+                    DataProcessor.LONGITUDE
+                ])[DataProcessor.VALUE].agg(['mean', 'count']).reset_index()
                         
             # Create frames for animation
             frames = []
@@ -418,9 +415,7 @@ class MapVisualizer:
             return fig
             
         except Exception as e:
-            print(f"ERROR in animated visualization: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Error in animated visualization: %s", e)
             return fig
         
 
@@ -429,8 +424,7 @@ class MapVisualizer:
         Create a map showing areas affected by radiation within specified range
         threshold_range: tuple of (min_threshold, max_threshold)
         """
-        print("\n=== Creating Affected Areas Map ===")
-        print(f"Threshold Range: {threshold_range[0]} - {threshold_range[1]} cpm")
+        logger.debug("Creating affected areas map for %s - %s cpm", threshold_range[0], threshold_range[1])
         
         try:
             # Create base map with boundaries
@@ -446,7 +440,7 @@ class MapVisualizer:
                     (readings[DataProcessor.VALUE] <= threshold_range[1])
                 ].copy()
                 all_readings.append(mobile_data)
-                print(f"Mobile readings in range: {len(mobile_data)}")
+                logger.debug("Mobile readings in range: %d", len(mobile_data))
                 
             # Process static readings if provided
             if static_sensors is not None:
@@ -461,7 +455,7 @@ class MapVisualizer:
                     (static_data[DataProcessor.VALUE] <= threshold_range[1])
                 ]
                 all_readings.append(static_data)
-                print(f"Static readings in range: {len(static_data)}")
+                logger.debug("Static readings in range: %d", len(static_data))
                 
             # Combine all readings
             if all_readings:
@@ -504,22 +498,20 @@ class MapVisualizer:
                         zmax=80
                     ))
                     
-                    print(f"Successfully created affected areas visualization")
+                    logger.debug("Created affected areas visualization")
                 else:
-                    print("No readings in specified range")
+                    logger.debug("No readings in specified range")
             
             return fig
             
         except Exception as e:
-            print(f"ERROR creating affected areas map: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Error creating affected areas map: %s", e)
             return self.create_base_map(['boundaries'])
 
 
     def create_coverage_map(self, static_sensors, mobile_readings, coverage_radius=200):
         """Create a map showing areas with and without actual sensor readings"""
-        print("\n=== Creating Data Coverage Analysis Map ===")
+        logger.debug("Creating data coverage analysis map")
         
         try:
             # Create base map
@@ -551,20 +543,17 @@ class MapVisualizer:
             
             # Add neighborhood boundaries with gap highlighting
             if self.gdf is not None:
-                for _, row in self.gdf.iterrows():
+                # Neighborhoods holding at least one reading, in one bulk lookup
+                with_readings = set(self.geometry.covered(
+                    combined_readings[DataProcessor.LONGITUDE], combined_readings[DataProcessor.LATITUDE]
+                ))
+                for position, (_, row) in enumerate(self.gdf.iterrows()):
                     if row.geometry.type == 'Polygon':
                         coords = row.geometry.exterior.coords
                         lons, lats = zip(*coords)
                         
                         # Check if neighborhood has readings
-                        neighborhood_poly = row.geometry
-                        has_readings = False
-                        
-                        for _, reading in combined_readings.iterrows():
-                            point = Point(reading[DataProcessor.LONGITUDE], reading[DataProcessor.LATITUDE])
-                            if point.within(neighborhood_poly):
-                                has_readings = True
-                                break
+                        has_readings = position in with_readings
                         
                         # Color code based on data presence
                         fill_color = 'rgba(255,255,255,0)' if has_readings else 'rgba(255,0,0,0.2)'
@@ -626,23 +615,21 @@ class MapVisualizer:
             return fig
             
         except Exception as e:
-            print(f"ERROR creating coverage map: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Error creating coverage map: %s", e)
             return self.create_base_map(['boundaries'])
 
 
 
     def create_data_coverage_map(self, static_readings, mobile_readings, static_sensors):
         """Create a map showing areas where sensor data exists vs where it's missing"""
-        print("\n=== Creating Data Coverage Map ===")
+        logger.debug("Creating data coverage map")
         
         try:
             # Create base map
             fig = self.create_base_map(['boundaries'])
             
             if self.gdf is not None:
-                bounds = self.gdf.total_bounds
+                bounds = self.geometry.bounds
                 
                 # Increase grid size for better performance and coverage visualization
                 grid_size = 0.002  # Approximately 200m
@@ -699,18 +686,13 @@ class MapVisualizer:
                         ]
                         coverage_matrix[y_start:y_end, x_start:x_end][sub_circle] = 1
                 
-                # Convert to points
-                uncovered_points = []
-                covered_points = []
-                
-                for i, y in enumerate(y_grid):
-                    for j, x in enumerate(x_grid):
-                        point = Point(x, y)
-                        if any(point.within(geom) for geom in self.gdf.geometry):
-                            if coverage_matrix[i, j] == 0:
-                                uncovered_points.append([x, y])
-                            else:
-                                covered_points.append([x, y])
+                # Convert to points: the grid cells inside a neighborhood, split by coverage
+                grid_lons, grid_lats = np.meshgrid(x_grid, y_grid)
+                inside = (self.geometry.locate(grid_lons.ravel(), grid_lats.ravel()) >= 0).reshape(grid_lons.shape)
+                uncovered = inside & (coverage_matrix == 0)
+                covered = inside & (coverage_matrix != 0)
+                uncovered_points = np.column_stack([grid_lons[uncovered], grid_lats[uncovered]]).tolist()
+                covered_points = np.column_stack([grid_lons[covered], grid_lats[covered]]).tolist()
                 
                 # Add covered areas first (green)
                 if covered_points:
@@ -760,7 +742,5 @@ class MapVisualizer:
             return fig
             
         except Exception as e:
-            print(f"ERROR creating coverage map: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Error creating coverage map: %s", e)
             return self.create_base_map(['boundaries'])
\ No newline at end of file
@@ -0,0 +1,237 @@
+# app/utils/partitions.py
+import json
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from .snapshot_cache import PARQUET_AVAILABLE, _jsonable
+from .audit import get_logger
+
+logger = get_logger('partitions')
+
+# Partition key of rows without a timestamp; only returned by unbounded reads
+NO_TIMESTAMP = 'none'
+
+
+class PartitionStore:
+    """
+    Cleaned readings stored on disk as one Parquet file per dataset and day.
+
+    Range reads open only the day partitions overlapping the requested
+    window. Partitions read recently are kept in an in-memory LRU bounded by
+    ``max_bytes``; colder ones are evicted and re-read from disk when needed
+    again, so memory follows the active window rather than the full history.
+    """
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, root, timestamp_column='timestamp', max_bytes=None, sort_by=None):
+        self.root = root
+        self.timestamp_column = timestamp_column
+        self.max_bytes = max_bytes
+        self.sort_by = sort_by  # Order of the rows returned by read()
+        self.enabled = PARQUET_AVAILABLE
+        if not self.enabled:
+            logger.warning("pyarrow is not installed, partitioned storage disabled")
+        self._manifests = {}
+        self._cached = OrderedDict()  # (dataset, day) -> DataFrame, least recently used first
+        self._cached_bytes = 0
+        self._lock = threading.RLock()
+
+    def is_current(self, name, key):
+        """Whether the stored partitions of ``name`` were written for ``key``"""
+        manifest = self._manifest(name)
+        return manifest is not None and manifest.get('key') == _jsonable(key)
+
+    def write(self, name, df, key):
+        """
+        Replace the stored partitions of a dataset
+
+        Args:
+            name (str): Dataset name, e.g. 'static_readings'
+            df (pd.DataFrame): Cleaned readings
+            key (dict): Identifies the data the partitions were built from (see is_current)
+        """
+        with self._lock:
+            dataset_dir = os.path.join(self.root, name)
+            os.makedirs(dataset_dir, exist_ok=True)
+            previous = self._manifest(name)
+
+            partitions = {}
+            for day, rows in self._split_by_day(df):
+                partitions[day] = self._write_partition(name, day, rows)
+
+            # Manifest goes last so a partially written set is never read
+            self._write_manifest(name, {'key': _jsonable(key), 'partitions': partitions})
+            self._drop_cached(name)
+
+            if previous is not None:
+                for day, partition in previous['partitions'].items():
+                    if day not in partitions:
+                        _remove(os.path.join(dataset_dir, partition['file']))
+
+    def append(self, name, rows):
+        """Add rows to the partitions of their days, rewriting only those partitions"""
+        with self._lock:
+            manifest = self._manifest(name)
+            if manifest is None:
+                return
+            for day, day_rows in self._split_by_day(rows):
+                if day in manifest['partitions']:
+                    day_rows = concat_frames([self._read_partition(name, day), day_rows])
+                manifest['partitions'][day] = self._write_partition(name, day, day_rows)
+                self._uncache((name, day))
+            self._write_manifest(name, manifest)
+
+    def partitions(self, name, start=None, end=None):
+        """
+        Days whose partitions overlap [start, end]
+
+        Args:
+            name (str): Dataset name
+            start, end (pd.Timestamp): Inclusive bounds; None reads everything
+
+        Returns:
+            list: Partition keys in time order
+        """
+        with self._lock:
+            # append() adds days to the manifest under the lock
+            manifest = self._manifest(name)
+            if manifest is None:
+                return []
+            days = sorted(manifest['partitions'])
+        if start is None or end is None:
+            return days
+
+        first_day, last_day = start.floor('D'), end.floor('D')
+        return [
+            day for day in days
+            if day != NO_TIMESTAMP and first_day <= pd.Timestamp(day) <= last_day
+        ]
+
+    def read(self, name, start=None, end=None):
+        """
+        Rows of a dataset with timestamps in [start, end], scanning only overlapping partitions
+
+        Returns:
+            pd.DataFrame: Matching rows (ordered by ``sort_by`` if set), or None if the
+                dataset has no partitions
+        """
+        days = self.partitions(name, start, end)
+        frames = []
+        for day in days:
+            frame = self._read_partition(name, day)
+            # Only the first and last day can straddle the bounds
+            if start is not None and end is not None and day in (days[0], days[-1]):
+                stamps = frame[self.timestamp_column]
+                frame = frame[(stamps >= start) & (stamps <= end)]
+            frames.append(frame)
+
+        if not frames:
+            # Keep the columns and dtypes of the stored data
+            any_day = next(iter(self.partitions(name)), None)
+            return self._read_partition(name, any_day).iloc[:0] if any_day else None
+        # Each partition is already in sort_by order and days are read in time order
+        return concat_frames(frames)
+
+    def evict(self, max_bytes=0):
+        """Drop least recently used partitions from memory until at most ``max_bytes`` remain"""
+        with self._lock:
+            while self._cached and self._cached_bytes > max_bytes:
+                _, frame = self._cached.popitem(last=False)
+                self._cached_bytes -= _frame_bytes(frame)
+
+    @property
+    def cached_bytes(self):
+        """Memory held by cached partitions"""
+        return self._cached_bytes
+
+    def _read_partition(self, name, day):
+        with self._lock:
+            frame = self._cached.get((name, day))
+            if frame is not None:
+                self._cached.move_to_end((name, day))
+                return frame
+
+            partition = self._manifest(name)['partitions'][day]
+            frame = pd.read_parquet(os.path.join(self.root, name, partition['file']))
+            if self.sort_by:
+                frame = frame.sort_values(self.sort_by, kind='stable')
+            self._cached[(name, day)] = frame
+            self._cached_bytes += _frame_bytes(frame)
+            if self.max_bytes is not None:
+                self.evict(self.max_bytes)
+            return frame
+
+    def _write_partition(self, name, day, rows):
+        file_name = f"day={day}.parquet"
+        target = os.path.join(self.root, name, file_name)
+        rows.to_parquet(target + '.tmp')
+        os.replace(target + '.tmp', target)
+        return {'file': file_name, 'rows': len(rows)}
+
+    def _split_by_day(self, df):
+        """Yield (day key, rows) pairs, keeping the row order within each day"""
+        days = df[self.timestamp_column].dt.floor('D')
+        for day, rows in df.groupby(days, sort=True):
+            yield day.strftime('%Y-%m-%d'), rows
+        missing = days.isna()
+        if missing.any():
+            yield NO_TIMESTAMP, df[missing]
+
+    def _uncache(self, key):
+        frame = self._cached.pop(key, None)
+        if frame is not None:
+            self._cached_bytes -= _frame_bytes(frame)
+
+    def _drop_cached(self, name):
+        for key in [key for key in self._cached if key[0] == name]:
+            self._uncache(key)
+
+    def _manifest(self, name):
+        if name not in self._manifests:
+            try:
+                with open(os.path.join(self.root, name, self.MANIFEST)) as f:
+                    self._manifests[name] = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return self._manifests[name]
+
+    def _write_manifest(self, name, manifest):
+        path = os.path.join(self.root, name, self.MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+        self._manifests[name] = manifest
+
+
+def concat_frames(frames):
+    """Concatenate frames whose categorical columns may have different categories"""
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 1:
+        return frames[0]
+
+    category_dtypes = {}
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = frames[0][col].cat.categories
+            for frame in frames[1:]:
+                if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    categories = categories.union(frame[col].cat.categories)
+                else:
+                    categories = categories.union(pd.Index(frame[col].dropna().unique()))
+            category_dtypes[col] = pd.CategoricalDtype(categories)
+
+    if category_dtypes:
+        frames = [frame.astype(category_dtypes) for frame in frames]
+    return pd.concat(frames)
+
+
+def _frame_bytes(frame):
+    return int(frame.memory_usage(index=True, deep=False).sum())
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
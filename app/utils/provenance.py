@@ -0,0 +1,214 @@
+# app/utils/provenance.py
+import warnings
+import numpy as np
+import pandas as pd
+
+# Removal-reason codes recorded for every raw row
+KEPT = 0
+OUT_OF_RANGE = 1
+NO_PREVIOUS_READING = 2  # First in-range reading of a sensor: no rate of change to check
+RATE_OF_CHANGE = 3
+IQR_OUTLIER = 4
+
+REMOVAL_REASONS = {
+    KEPT: 'kept',
+    OUT_OF_RANGE: 'out_of_range',
+    NO_PREVIOUS_READING: 'no_previous_reading',
+    RATE_OF_CHANGE: 'rate_of_change',
+    IQR_OUTLIER: 'iqr_outlier'
+}
+
+
+class CleaningProvenance:
+    """
+    Compact record of what the cleaning pass did to one readings source.
+
+    Keeps a uint8 removal-reason code per raw row, addressed by the row's
+    position in the source file, and per-sensor row counts and
+    count/sum/sum of squares/min/max of the raw and the cleaned values. Raw
+    versus cleaned statistics for one sensor or all of them are then computed
+    from a few numbers instead of re-reading the source. Both parts grow with
+    appended rows.
+    """
+
+    def __init__(self):
+        self._reasons = np.zeros(0, dtype=np.uint8)
+        self._size = 0
+        self._sensors = pd.DataFrame()
+
+    @property
+    def size(self):
+        """Number of raw rows recorded"""
+        return self._size
+
+    @property
+    def reasons(self):
+        """Removal-reason code of every raw row, in source order"""
+        return self._reasons[:self._size]
+
+    def add_raw(self, positions, sensors, values):
+        """
+        Record a batch of raw rows, initially as kept
+
+        Args:
+            positions (array-like): Row positions in the source file
+            sensors (array-like): Sensor id of each row
+            values (array-like): Raw value of each row
+        """
+        positions = np.asarray(positions)
+        if len(positions) == 0:
+            return
+        size = max(self._size, int(positions.max()) + 1)
+        if size > len(self._reasons):
+            # Grow geometrically so repeated appends stay cheap
+            grown = np.zeros(max(size, 2 * len(self._reasons)), dtype=np.uint8)
+            grown[:self._size] = self._reasons[:self._size]
+            self._reasons = grown
+        self._reasons[positions] = KEPT
+        self._size = size
+        self._merge(_sensor_stats(sensors, values, 'raw_'))
+
+    def mark(self, positions, sensors, reason):
+        """Record that the rows at ``positions`` were removed for ``reason``"""
+        positions = np.asarray(positions)
+        if len(positions) == 0:
+            return
+        self._reasons[positions] = reason
+        counts = pd.Series(np.asarray(sensors)).groupby(np.asarray(sensors), dropna=False).size()
+        self._merge(counts.to_frame(f"removed_{REMOVAL_REASONS[reason]}"))
+
+    def mark_all(self, positions, sensors, reasons):
+        """Record a removal-reason code for every row at ``positions`` (KEPT rows are left as they are)"""
+        positions = np.asarray(positions)
+        sensors = np.asarray(sensors)
+        for reason in REMOVAL_REASONS:
+            if reason != KEPT:
+                selected = reasons == reason
+                if selected.any():
+                    self.mark(positions[selected], sensors[selected], reason)
+
+    def add_clean(self, sensors, values):
+        """Record the values that survived cleaning"""
+        if len(values) > 0:
+            self._merge(_sensor_stats(sensors, values, 'clean_'))
+
+    def summary(self, sensor_id=None):
+        """
+        Raw and cleaned statistics for one sensor or all sensors
+
+        Args:
+            sensor_id: Sensor to summarize (all sensors when None)
+
+        Returns:
+            dict: 'raw' and 'clean' (rows, count, mean, std, min, max) and
+                'removed' (reason -> rows), or None if the sensor has no rows
+        """
+        if self._sensors.empty:
+            return None
+        values = self._sensors.to_numpy(dtype=np.float64)
+        if sensor_id is not None:
+            position = self._sensors.index.get_indexer([sensor_id])[0]
+            if position < 0:
+                return None
+            values = values[position:position + 1]
+
+        columns = self._sensors.columns
+        totals = dict(zip(columns, np.nansum(values, axis=0)))
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN min/max
+            totals.update({
+                col: reduce(values[:, i])
+                for i, col in enumerate(columns)
+                for suffix, reduce in (('_min', np.nanmin), ('_max', np.nanmax))
+                if col.endswith(suffix)
+            })
+        return {
+            'raw': _describe(totals, 'raw_'),
+            'clean': _describe(totals, 'clean_'),
+            'removed': {
+                label: int(totals.get(f"removed_{label}", 0))
+                for code, label in REMOVAL_REASONS.items() if code != KEPT
+            }
+        }
+
+    def reason_counts(self):
+        """
+        Rows per sensor and removal reason
+
+        Returns:
+            pd.DataFrame: One row per sensor, one int64 column per REMOVAL_REASONS label
+        """
+        columns = {
+            label: 'clean_rows' if code == KEPT else f"removed_{label}"
+            for code, label in REMOVAL_REASONS.items()
+        }
+        return pd.DataFrame({
+            label: (self._sensors[column] if column in self._sensors.columns
+                    else pd.Series(0, index=self._sensors.index))
+            for label, column in columns.items()
+        }, index=self._sensors.index).fillna(0).astype('int64')
+
+    def to_frames(self):
+        """Serialize as a per-row 'reasons' frame and a per-sensor 'sensor_provenance' frame"""
+        return {
+            'reasons': pd.DataFrame({'reason': self.reasons}),
+            'sensor_provenance': self._sensors.rename_axis('sensor').reset_index()
+        }
+
+    @classmethod
+    def from_frames(cls, reasons, sensor_provenance):
+        """Rebuild a record serialized with to_frames()"""
+        provenance = cls()
+        # Used as is (possibly a read-only memory map) until rows are appended
+        provenance._reasons = reasons['reason'].to_numpy(dtype=np.uint8)
+        provenance._size = len(provenance._reasons)
+        provenance._sensors = sensor_provenance.set_index('sensor')
+        return provenance
+
+    def _merge(self, stats):
+        """Add per-sensor statistics into the running totals"""
+        if self._sensors.empty:
+            self._sensors = stats
+            return
+        combined = pd.concat([self._sensors, stats])
+        how = {
+            col: 'min' if col.endswith('_min') else 'max' if col.endswith('_max') else 'sum'
+            for col in combined.columns
+        }
+        self._sensors = combined.groupby(level=0, dropna=False).agg(how)
+
+
+def _sensor_stats(sensors, values, prefix):
+    """Per-sensor row counts and count/sum/sumsq/min/max of the non-null values"""
+    values = pd.Series(np.asarray(values, dtype=np.float64))
+    keys = np.asarray(sensors)
+    grouped = values.groupby(keys, dropna=False)
+    stats = pd.DataFrame({
+        'rows': grouped.size(),
+        'count': grouped.count(),
+        'sum': grouped.sum(),
+        'sumsq': (values * values).groupby(keys, dropna=False).sum(),
+        'min': grouped.min(),
+        'max': grouped.max()
+    })
+    return stats.add_prefix(prefix)
+
+
+def _describe(totals, prefix):
+    """Mean, sample standard deviation and range from accumulated moments"""
+    rows = int(totals.get(f"{prefix}rows", 0))
+    count = int(totals.get(f"{prefix}count", 0))
+    total = totals.get(f"{prefix}sum", 0.0)
+    mean = total / count if count > 0 else np.nan
+    std = np.nan
+    if count > 1:
+        variance = (totals[f"{prefix}sumsq"] - total * mean) / (count - 1)
+        std = np.sqrt(max(variance, 0.0))
+    return {
+        'rows': rows,
+        'count': count,
+        'mean': mean,
+        'std': std,
+        'min': totals.get(f"{prefix}min", np.nan),
+        'max': totals.get(f"{prefix}max", np.nan)
+    }
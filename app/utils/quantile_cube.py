@@ -0,0 +1,220 @@
+# app/utils/quantile_cube.py
+import numpy as np
+import pandas as pd
+
+from .quantiles import KLLSketch
+
+# Bucket widths sketched, finest first; each level's sketches are merged from the one below
+LEVELS = ['1h', '1D']
+
+ALL_SENSORS = None  # Key of the sketch over every reading of a bucket
+ALL_CODE = -1  # Sensor code of the ALL_SENSORS sketches
+
+
+class QuantileCube:
+    """
+    KLL sketches of the values of a time-sorted readings frame per sensor and time bucket.
+
+    Every hourly and daily bucket holds one KLLSketch per sensor and one over
+    all of its readings (ALL_SENSORS, which also covers readings without a
+    sensor id). A time window is answered by merging the sketches of the whole
+    days inside it, then of the whole hours around those days, and sketching
+    the raw rows of the partial hours at either end, so the work follows the
+    number of buckets touched rather than the rows in the window. Stored
+    sketches are pooled without further compaction, so the window's sketch is
+    as accurate as the stored ones and states that bound
+    (KLLSketch.rank_error, met with high probability), which is 0 when
+    everything it covers is held exactly.
+
+    Each level keeps its sketches' retained items in flat arrays (see
+    BucketSketches). Most sketches hold at most k values and so keep them all;
+    those are built by grouping the rows with array operations, and only the
+    sketches that must compact go through KLLSketch one by one.
+    """
+
+    def __init__(self, frame, sensor_column, time_column, value_column, k=200):
+        self.frame = frame
+        self.k = k
+        self._times = frame[time_column].to_numpy()
+        self._values = frame[value_column].to_numpy()
+        self._codes, sensors = pd.factorize(frame[sensor_column], sort=True)
+        self._sensors = list(sensors)
+        self._code_of = {sensor: code for code, sensor in enumerate(self._sensors)}
+        # One generator for every stored sketch keeps the cube reproducible without one per sketch
+        self._rng = np.random.default_rng(0)
+        self._widths = [pd.Timedelta(freq).value for freq in LEVELS]
+        self.levels = [self._sketch_rows(self._widths[0])]
+        for width in self._widths[1:]:
+            self.levels.append(self._merge_level(self.levels[-1], width))
+
+    def __len__(self):
+        """Number of sketches held"""
+        return sum(len(sketches) for _, sketches in self.levels)
+
+    def sketch(self, start=None, end=None, sensors=None):
+        """
+        Sketch of the values with start <= timestamp <= end
+
+        Args:
+            start, end: Inclusive bounds; every reading (missing timestamps
+                included) if either is None
+            sensors (list): Sensor ids to cover; None covers all readings
+
+        Returns:
+            KLLSketch: quantile(q) gives the estimate and rank_error its bound
+                (with high probability)
+        """
+        keys = [ALL_SENSORS] if sensors is None else list(sensors)
+        rows, parts = [], []
+        if start is None or end is None:
+            parts.append(self.levels[-1][1].items(0, len(self.levels[-1][0]), self._key_codes(keys)))
+            # Readings without a timestamp sort last and belong to no bucket
+            first_untimed = int(np.searchsorted(self._times, np.datetime64('NaT'), side='left'))
+            rows.append(self._rows(keys, first_untimed, len(self._times)))
+        else:
+            self._cover(rows, parts, keys, pd.Timestamp(start).value, pd.Timestamp(end).value + 1,
+                        len(LEVELS) - 1)
+        result = KLLSketch(self.k, seed=0).update(np.concatenate(rows) if rows else [])
+        if parts:
+            values, levels = (np.concatenate(items) for items in zip(*parts))
+            result.merge(KLLSketch.from_items(values, levels, self.k), compact=False)
+        return result
+
+    def _cover(self, rows, parts, keys, lo, hi, level):
+        """
+        Collect the raw values and the sketches of ``level`` and finer buckets
+        that together cover lo <= time < hi (nanoseconds)
+        """
+        if lo >= hi:
+            return
+        if level < 0:
+            positions = np.searchsorted(self._times, np.array([lo, hi], dtype='datetime64[ns]'), side='left')
+            rows.append(self._rows(keys, int(positions[0]), int(positions[1])))
+            return
+        width = self._widths[level]
+        first, last = -(-lo // width) * width, hi // width * width
+        if first >= last:
+            self._cover(rows, parts, keys, lo, hi, level - 1)
+            return
+        self._cover(rows, parts, keys, lo, first, level - 1)
+        ids, sketches = self.levels[level]
+        parts.append(sketches.items(int(np.searchsorted(ids, first, side='left')),
+                                    int(np.searchsorted(ids, last, side='left')), self._key_codes(keys)))
+        self._cover(rows, parts, keys, last, hi, level - 1)
+
+    def _rows(self, keys, lo, hi):
+        """Values of rows [lo, hi) of the selected sensors"""
+        values = self._values[lo:max(lo, hi)]
+        if keys != [ALL_SENSORS]:
+            codes = [self._code_of[key] for key in keys if key in self._code_of]
+            values = values[np.isin(self._codes[lo:max(lo, hi)], codes)]
+        return values
+
+    def _key_codes(self, keys):
+        """Sensor codes of the sketches selected by ``keys``"""
+        if keys == [ALL_SENSORS]:
+            return [ALL_CODE]
+        return [self._code_of[key] for key in keys if key in self._code_of]
+
+    def _sketch_rows(self, width):
+        """Finest level: bucket ids (start in nanoseconds) and the BucketSketches of every bucket and sensor"""
+        timed = int(np.searchsorted(self._times, np.datetime64('NaT'), side='left'))
+        ids = self._times[:timed].view(np.int64) // width * width
+        change = np.ones(len(ids), dtype=bool)
+        change[1:] = ids[1:] != ids[:-1]
+        bucket = np.cumsum(change) - 1
+        values = self._values[:timed].astype(np.float64)
+        codes = self._codes[:timed]
+        # Every row goes to its sensor's sketch and to the bucket's ALL_SENSORS one
+        keep = ~np.isnan(values)
+        sensor_rows = keep & (codes >= 0)
+        bucket = np.concatenate([bucket[sensor_rows], bucket[keep]])
+        codes = np.concatenate([codes[sensor_rows], np.full(int(keep.sum()), ALL_CODE)])
+        values = np.concatenate([values[sensor_rows], values[keep]])
+        return ids[change], self._sketch_groups(bucket, codes, values, np.zeros(len(values), dtype=np.int8))
+
+    def _merge_level(self, finer, width):
+        """Coarser level with buckets of ``width`` merged from the finer level's sketches"""
+        finer_ids, finer_sketches = finer
+        ids = finer_ids // width * width
+        change = np.ones(len(ids), dtype=bool)
+        change[1:] = ids[1:] != ids[:-1]
+        coarse = np.cumsum(change) - 1
+        sizes = np.diff(finer_sketches.offsets)
+        bucket = np.repeat(coarse[finer_sketches.bucket], sizes)
+        codes = np.repeat(finer_sketches.code, sizes)
+        return ids[change], self._sketch_groups(bucket, codes, finer_sketches.values, finer_sketches.levels)
+
+    def _sketch_groups(self, bucket, codes, values, levels):
+        """
+        BucketSketches of items grouped by (bucket, sensor code)
+
+        A group standing for at most k values is kept as it is (all of its
+        values, unless it was compacted before); the others are compacted into
+        a sketch.
+        """
+        # By bucket, then sensor; stable, so each group keeps its items' order
+        order = np.argsort(bucket * (len(self._sensors) + 1) + (codes - ALL_CODE), kind='stable')
+        bucket, codes, values, levels = bucket[order], codes[order], values[order], levels[order]
+        change = np.ones(len(bucket), dtype=bool)
+        change[1:] = (bucket[1:] != bucket[:-1]) | (codes[1:] != codes[:-1])
+        starts = np.flatnonzero(change)
+        sizes = np.diff(np.append(starts, len(bucket)))
+        weights = np.add.reduceat(np.left_shift(1, levels.astype(np.int64)), starts) if len(starts) else sizes
+        compact = np.flatnonzero(weights > self.k)
+
+        sketches = []
+        for group in compact:
+            lo, hi = starts[group], starts[group] + sizes[group]
+            sketch = self._new_sketch().merge(KLLSketch.from_items(values[lo:hi], levels[lo:hi], self.k))
+            sketches.append(sketch.items())
+        kept_sizes = sizes.copy()
+        kept_sizes[compact] = 0
+        new_sizes = kept_sizes.copy()
+        new_sizes[compact] = [len(items) for items, _ in sketches]
+        offsets = np.concatenate([[0], np.cumsum(new_sizes)])
+
+        # Groups kept as they are move as a block; compacted ones are written in their place
+        kept = np.repeat(kept_sizes > 0, sizes)
+        shift = np.repeat(offsets[:-1] - starts, sizes)[kept]
+        new_values = np.empty(offsets[-1], dtype=np.float64)
+        new_levels = np.empty(offsets[-1], dtype=np.int8)
+        new_values[np.flatnonzero(kept) + shift] = values[kept]
+        new_levels[np.flatnonzero(kept) + shift] = levels[kept]
+        for group, (items, item_levels) in zip(compact, sketches):
+            new_values[offsets[group]:offsets[group + 1]] = items
+            new_levels[offsets[group]:offsets[group + 1]] = item_levels
+        return BucketSketches(bucket[starts], codes[starts], offsets, new_values, new_levels)
+
+    def _new_sketch(self):
+        return KLLSketch(self.k, seed=self._rng)
+
+
+class BucketSketches:
+    """
+    KLL sketches of a cube level, one per bucket and sensor, as flat arrays
+
+    Sketch ``i`` covers bucket ``bucket[i]`` (its position in the level's bucket
+    ids) and sensor code ``code[i]`` (ALL_CODE for every reading), and retains
+    the items ``values[offsets[i]:offsets[i + 1]]`` at ``levels[...]``.
+    Sketches are sorted by bucket, then sensor code.
+    """
+
+    def __init__(self, bucket, code, offsets, values, levels):
+        self.bucket = bucket
+        self.code = code
+        self.offsets = offsets
+        self.values = values
+        self.levels = levels
+
+    def __len__(self):
+        return len(self.bucket)
+
+    def items(self, first, last, codes):
+        """Retained values and levels of the sketches of buckets [first, last) with one of ``codes``"""
+        lo, hi = np.searchsorted(self.bucket, [first, last], side='left')
+        groups = lo + np.flatnonzero(np.isin(self.code[lo:hi], codes))
+        starts, sizes = self.offsets[groups], self.offsets[groups + 1] - self.offsets[groups]
+        # Positions of every item of the selected groups, without a loop over groups
+        index = np.arange(int(sizes.sum())) + np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+        return self.values[index], self.levels[index]
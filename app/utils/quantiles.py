@@ -0,0 +1,246 @@
+# app/utils/quantiles.py
+import numpy as np
+import pandas as pd
+
+
+class ExactQuantileSummary:
+    """
+    Mergeable exact quantile summary.
+
+    Keeps a count per distinct value, so summaries built over separate chunks
+    can be added together and still reproduce ``pd.Series.quantile`` (linear
+    interpolation) over the combined data exactly. Memory grows with the
+    number of distinct values, which is small for readings reported at a
+    fixed precision.
+    """
+
+    def __init__(self):
+        self._counts = pd.Series(dtype='int64')
+
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        distinct, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        return self._add(distinct, counts)
+
+    def merge(self, other):
+        """Add another summary into this one"""
+        return self._add(other._counts.index.to_numpy(dtype=np.float64),
+                         other._counts.to_numpy(dtype=np.int64))
+
+    def _add(self, values, counts):
+        """Add per-value counts, keeping the counts sorted by value"""
+        if len(self._counts) > 0:
+            values = np.concatenate([self._counts.index.to_numpy(dtype=np.float64), values])
+            counts = np.concatenate([self._counts.to_numpy(dtype=np.int64), counts])
+            # Usually two sorted runs, which the stable sort merges in linear time
+            order = np.argsort(values, kind='stable')
+            values, counts = values[order], counts[order]
+            starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+            values, counts = values[starts], np.add.reduceat(counts, starts)
+        self._counts = pd.Series(counts.astype(np.int64), index=values)
+        return self
+
+    def to_frame(self):
+        """Serialize as a (value, count) frame"""
+        return pd.DataFrame({'value': self._counts.index.to_numpy(dtype=np.float64),
+                             'count': self._counts.to_numpy(dtype=np.int64)})
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Rebuild a summary serialized with to_frame()"""
+        summary = cls()
+        summary._counts = pd.Series(frame['count'].to_numpy(dtype=np.int64),
+                                    index=frame['value'].to_numpy(dtype=np.float64))
+        return summary
+
+    @property
+    def count(self):
+        return int(self._counts.sum())
+
+    @property
+    def rank_error(self):
+        """Bound on the error of quantile() as a fraction of the count (always exact)"""
+        return 0.0
+
+    def quantile(self, q):
+        """
+        Quantile of all values seen so far
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: Same value as pd.Series.quantile(q) over the raw data, NaN if empty
+        """
+        n = self.count
+        if n == 0:
+            return np.nan
+
+        counts = self._counts.sort_index()
+        return _weighted_quantile(counts.index.to_numpy(dtype=np.float64), counts.to_numpy(), q)
+
+
+class KLLSketch:
+    """
+    Mergeable approximate quantile sketch with bounded memory (Karnin, Lang and Liberty).
+
+    Values are kept in levels, where an item at level h stands for 2**h input
+    values. When a level outgrows its capacity it is sorted and every other
+    item, from a random offset, is promoted to the next level. Memory stays at
+    about 3 * k items however many values are added, and quantile ranks are
+    typically off by under 1 / k of the count. The 2.5 / k reported by
+    rank_error holds with high probability, merges included, not with
+    certainty: compaction is randomized. Until the first compaction the sketch
+    holds every value, and quantile() then equals pd.Series.quantile.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self._levels = [np.zeros(0, dtype=np.float64)]
+        self._count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other, compact=True):
+        """
+        Add another sketch into this one
+
+        With ``compact=False`` the items are only pooled: quantiles over many
+        merged sketches then carry no error beyond the sketches' own, at the cost
+        of holding all their items until the next update or compacting merge.
+        """
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.zeros(0, dtype=np.float64))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self._count += other._count
+        if compact:
+            self._compress()
+        return self
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def size(self):
+        """Number of items retained"""
+        return sum(len(items) for items in self._levels)
+
+    @property
+    def exact(self):
+        """Whether every value added is still held (no compaction has happened)"""
+        return len(self._levels) == 1
+
+    @property
+    def rank_error(self):
+        """
+        Rank error of quantile() as a fraction of the count: 0 while exact, else 2.5 / k
+
+        Once the sketch has compacted this bound holds with high probability, not always.
+        """
+        return 0.0 if self.exact else 2.5 / self.k
+
+    def to_frame(self):
+        """Serialize the retained items as a (value, level) frame"""
+        values, levels = self.items()
+        return pd.DataFrame({'value': values, 'level': levels})
+
+    @classmethod
+    def from_frame(cls, frame, k=200, seed=None):
+        """Rebuild a sketch serialized with to_frame()"""
+        return cls.from_items(frame['value'].to_numpy(dtype=np.float64), frame['level'].to_numpy(), k, seed)
+
+    @classmethod
+    def from_items(cls, values, levels, k=200, seed=None):
+        """
+        Sketch holding retained items as they are, without compacting them
+
+        Args:
+            values (np.ndarray): Item values
+            levels (np.ndarray): Level of each item; an item at level h stands for 2**h values
+        """
+        sketch = cls(k, seed)
+        sketch._levels = [values[levels == level] for level in range(int(levels.max(initial=0)) + 1)]
+        sketch._count = int(np.sum(2 ** levels.astype(np.int64)))
+        return sketch
+
+    def items(self):
+        """Retained values and the level of each"""
+        return (np.concatenate(self._levels),
+                np.concatenate([np.full(len(items), level, dtype=np.int8)
+                                for level, items in enumerate(self._levels)]))
+
+    def quantile(self, q):
+        """
+        Approximate quantile of all values seen so far
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: Estimate with linear interpolation like pd.Series.quantile (exact
+                while the sketch is exact), NaN if empty
+        """
+        if self._count == 0:
+            return np.nan
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(items), 2 ** level, dtype=np.int64) for level, items in enumerate(self._levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        return _weighted_quantile(values[order], weights[order], q)
+
+    def _capacity(self, level):
+        """Items a level may hold; lower levels get geometrically less room"""
+        depth = len(self._levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.zeros(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays behind so the total weight is preserved
+                paired = len(items) - len(items) % 2
+                promoted = items[self._rng.integers(2):paired:2]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                self._levels[level] = items[paired:]
+            level += 1
+
+
+def _weighted_quantile(values, counts, q):
+    """
+    Linear-interpolation quantile of sorted values repeated ``counts`` times
+
+    Same arithmetic as np.percentile, which pandas calls with q * 100.
+    """
+    n = int(counts.sum())
+    cumulative = np.cumsum(counts)
+    q = np.float64(q) * 100 / 100
+    position = (n - 1) * q
+    lower = int(np.floor(position))
+    upper = min(lower + 1, n - 1)
+    lower_value = values[np.searchsorted(cumulative, lower, side='right')]
+    upper_value = values[np.searchsorted(cumulative, upper, side='right')]
+    return _lerp(lower_value, upper_value, position - lower)
+
+
+def _lerp(a, b, t):
+    """Linear interpolation computed the way numpy's 'linear' quantile method does"""
+    diff = b - a
+    if t >= 0.5:
+        return b - diff * (1 - t)
+    return a + diff * t
@@ -0,0 +1,101 @@
+# app/utils/range_stats.py
+import numpy as np
+
+from .timestamps import as_datetime64
+
+
+class RangeStats:
+    """
+    Count, mean, standard deviation, min and max of any time range of a frame
+    sorted with time_index.sort_by_time, without scanning the rows in it.
+
+    Holds running totals of the count, sum and sum of squares of the values
+    (offset by the overall mean, so the sum of squares does not lose the
+    variance of small windows to cancellation), so the moments of a window
+    are the difference of two entries. Minima and maxima come from a sparse
+    table over fixed-size blocks of rows: the whole blocks of a window are two
+    table lookups and only the partial blocks at its ends are scanned, which
+    keeps the table a few kilobytes instead of one row per level. Missing
+    values are ignored, as pandas does.
+    """
+
+    BLOCK_ROWS = 1024
+
+    def __init__(self, frame, value_column, time_column):
+        self.frame = frame
+        self._times = frame[time_column].to_numpy()
+        self._values = frame[value_column].to_numpy()
+        values = self._values.astype(np.float64)
+        valid = ~np.isnan(values)
+        self._center = float(values[valid].mean()) if valid.any() else 0.0
+        shifted = np.where(valid, values - self._center, 0.0)
+        count_dtype = np.int32 if len(values) < 2 ** 31 else np.int64
+        self._count = np.concatenate([[0], np.cumsum(valid, dtype=count_dtype)])
+        self._sum = np.concatenate([[0.0], np.cumsum(shifted)])
+        self._sumsq = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+        self._min_table = self._sparse_table(np.fmin)
+        self._max_table = self._sparse_table(np.fmax)
+
+    def __len__(self):
+        return len(self._values)
+
+    def positions(self, start=None, end=None):
+        """First and one-past-last row with start <= timestamp <= end (all rows if unbounded)"""
+        if start is None or end is None:
+            return 0, len(self._values)
+        start, end = as_datetime64(start), as_datetime64(end)
+        lo = int(np.searchsorted(self._times, start, side='left'))
+        hi = int(np.searchsorted(self._times, end, side='right'))
+        return lo, max(lo, hi)
+
+    def stats(self, start=None, end=None):
+        """
+        Statistics of the values with start <= timestamp <= end
+
+        Returns:
+            dict: rows in the range, count (of values present), mean, std (sample),
+                min and max; NaN where undefined
+        """
+        lo, hi = self.positions(start, end)
+        count = int(self._count[hi] - self._count[lo])
+        total = self._sum[hi] - self._sum[lo]
+        mean = std = np.nan
+        if count > 0:
+            mean = self._center + total / count
+        if count > 1:
+            m2 = (self._sumsq[hi] - self._sumsq[lo]) - total * total / count
+            std = float(np.sqrt(max(m2, 0.0) / (count - 1)))
+        return {
+            'rows': hi - lo,
+            'count': count,
+            'mean': mean,
+            'std': std,
+            'min': self._extreme(self._min_table, np.fmin, lo, hi),
+            'max': self._extreme(self._max_table, np.fmax, lo, hi)
+        }
+
+    def _sparse_table(self, combine):
+        """Level k holds ``combine`` over 2**k consecutive blocks starting at each block"""
+        blocks = -(-len(self._values) // self.BLOCK_ROWS)
+        padded = np.full(blocks * self.BLOCK_ROWS, np.nan)
+        padded[:len(self._values)] = self._values
+        table = [combine.reduce(padded.reshape(blocks, self.BLOCK_ROWS), axis=1)]
+        width = 1
+        while 2 * width <= blocks:
+            level = table[-1]
+            table.append(combine(level[:-width], level[width:]))
+            width *= 2
+        return table
+
+    def _extreme(self, table, combine, lo, hi):
+        """``combine`` over rows [lo, hi), NaN if there are none"""
+        first_block = -(-lo // self.BLOCK_ROWS)
+        last_block = hi // self.BLOCK_ROWS
+        if last_block <= first_block:
+            return float(combine.reduce(self._values[lo:hi])) if hi > lo else np.nan
+        level = int(np.log2(last_block - first_block))
+        result = combine(table[level][first_block], table[level][last_block - 2 ** level])
+        for part in (self._values[lo:first_block * self.BLOCK_ROWS], self._values[last_block * self.BLOCK_ROWS:hi]):
+            if len(part) > 0:
+                result = combine(result, combine.reduce(part))
+        return float(result)
@@ -0,0 +1,220 @@
+# app/utils/rollups.py
+import weakref
+import numpy as np
+import pandas as pd
+
+# Bucket widths materialized per sensor, finest first; each level is derived from the previous one
+LEVELS = ['1min', '15min', '1h', '1D']
+
+MOMENT_COLUMNS = ['count', 'sum', 'm2', 'min', 'max']
+
+
+class RollupCube:
+    """
+    Per-sensor moments of readings in fixed time buckets at several resolutions.
+
+    Every level holds, per (bucket start, sensor), the count, sum, sum of
+    squared deviations from the bucket mean (``m2``), min and max of the
+    values. Levels are built finest first, each coarser one by merging the
+    buckets of the level below, and appended rows are merged in the same way,
+    so no level is ever recomputed from raw rows. Means are sums over counts,
+    and standard deviations come from ``m2``, which merges without the
+    cancellation a raw sum of squares would suffer.
+
+    Any bucket width that is a whole multiple of a level and divides a day
+    (so buckets line up with pd.Grouper's) is served by merging that level's
+    buckets. Only buckets lying completely inside a query range are taken
+    from the cube; callers aggregate the partial buckets at the range edges
+    from raw rows (see covered()).
+    """
+
+    def __init__(self, frame, sensor_column, time_column, value_column):
+        self._source = weakref.ref(frame)
+        self.sensor_column = sensor_column
+        self.time_column = time_column
+        self.value_column = value_column
+        self.value_dtype = frame[value_column].dtype
+        self.levels = self._build_levels(self.moments(frame, LEVELS[0], by_sensor=True))
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels.values())
+
+    def built_from(self, frame):
+        """Whether the cube summarizes this frame (the one it was built from or last appended to)"""
+        return self._source() is frame
+
+    def append(self, frame, rows):
+        """Merge appended rows into every level; ``frame`` is the dataset they now belong to"""
+        if frame is not None:
+            self._source = weakref.ref(frame)
+        new = self._build_levels(self.moments(rows, LEVELS[0], by_sensor=True))
+        for freq, added in new.items():
+            if len(added) == 0:
+                continue
+            level = self.levels[freq]
+            # Only buckets from the earliest new one onwards can change
+            split = int(np.searchsorted(level[self.time_column].to_numpy(),
+                                        added[self.time_column].iloc[0].to_datetime64(), side='left'))
+            tail = self._merge(pd.concat([level.iloc[split:], added]),
+                               [self.time_column, self.sensor_column])
+            self.levels[freq] = pd.concat([level.iloc[:split], tail], ignore_index=True)
+
+    def level_for(self, freq):
+        """Coarsest level ``freq`` can be built from, or None if it cannot be served"""
+        width = bucket_width(freq)
+        if width is None or pd.Timedelta('1D') % width != pd.Timedelta(0):
+            return None
+        for level in reversed(LEVELS):
+            if width % pd.Timedelta(level) == pd.Timedelta(0):
+                return level
+        return None
+
+    def covered(self, freq, start=None, end=None):
+        """
+        Part of [start, end] made of whole ``freq`` buckets
+
+        Returns:
+            tuple: (lo, hi) so that buckets in [lo, hi) lie inside the range (either
+                is None when unbounded); lo >= hi means no bucket fits
+        """
+        if start is None or end is None:
+            return None, None
+        return pd.Timestamp(start).ceil(freq), (pd.Timestamp(end) + pd.Timedelta(1, 'ns')).floor(freq)
+
+    def query(self, freq, lo=None, hi=None, by_sensor=False):
+        """
+        Level buckets starting in [lo, hi), relabelled with their ``freq`` bucket
+
+        Returns:
+            pd.DataFrame: timestamp, sensor_id, count, sum, m2, min and max, one row
+                per level bucket; finalize() merges the rows of each ``freq`` bucket
+                (and sensor). Readings without a sensor id are left out with
+                ``by_sensor``.
+        """
+        level = self.levels[self.level_for(freq)]
+        level = level.iloc[self._rows_between(level, lo, hi)]
+        if by_sensor:
+            level = level[level[self.sensor_column].notna()]
+        return level.assign(**{self.time_column: level[self.time_column].dt.floor(freq)})
+
+    def rows_in(self, freq, lo=None, hi=None):
+        """Number of level rows query() reads for the buckets starting in [lo, hi)"""
+        level = self.levels[self.level_for(freq)]
+        rows = self._rows_between(level, lo, hi)
+        return rows.stop - rows.start
+
+    def _rows_between(self, level, lo, hi):
+        """Slice of the level rows of buckets starting in [lo, hi) (all rows if lo is None)"""
+        if lo is None:
+            return slice(0, len(level))
+        times = level[self.time_column].to_numpy()
+        first = int(np.searchsorted(times, lo.to_datetime64(), side='left'))
+        return slice(first, max(first, int(np.searchsorted(times, hi.to_datetime64(), side='left'))))
+
+    def moments(self, rows, freq, by_sensor=False):
+        """Moments per ``freq`` bucket (and sensor) computed from raw readings"""
+        rows = rows[rows[self.time_column].notna()]
+        keys = [rows[self.time_column].dt.floor(freq).rename(self.time_column)]
+        if by_sensor:
+            keys.append(rows[self.sensor_column])
+        grouped = rows[self.value_column].astype(np.float64).groupby(keys, observed=True, dropna=False)
+        stats = grouped.agg(['count', 'sum', 'min', 'max'])
+        stats['m2'] = grouped.var(ddof=0).to_numpy() * stats['count'].to_numpy()
+        stats = stats[stats['count'] > 0].reset_index()
+        return stats[[self.time_column, self.sensor_column] + MOMENT_COLUMNS if by_sensor
+                     else [self.time_column] + MOMENT_COLUMNS]
+
+    def profile(self, freq, period):
+        """
+        Count, mean, sample std, min and max of all values per recurring period
+
+        Args:
+            freq (str): Level to fold, e.g. '1h' for hours of the day
+            period (str): Datetime attribute of the bucket start, e.g. 'hour',
+                'dayofweek' or 'month'
+
+        Returns:
+            pd.DataFrame: period, count, mean, std, min and max, ordered by period
+        """
+        level = self.levels[freq]
+        stats = level[MOMENT_COLUMNS].assign(period=getattr(level[self.time_column].dt, period).to_numpy())
+        stats = self._merge(stats, ['period'])
+        count = stats['count'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'period': stats['period'],
+                'count': count.astype('int64'),
+                'mean': (stats['sum'].to_numpy() / count).astype(self.value_dtype),
+                'std': np.where(count > 1, np.sqrt(stats['m2'].to_numpy() / (count - 1)), np.nan).astype(self.value_dtype),
+                'min': stats['min'].astype(self.value_dtype),
+                'max': stats['max'].astype(self.value_dtype)
+            })
+
+    def finalize(self, stats, by_sensor=False, freq=None):
+        """
+        Count, mean and sample standard deviation from merged moments
+
+        Without by_sensor every ``freq`` bucket between the first and the last is
+        present, with a count of 0, like pd.Grouper produces; with it, readings
+        without a sensor id are left out.
+        """
+        keys = [self.time_column, self.sensor_column] if by_sensor else [self.time_column]
+        if by_sensor:
+            stats = stats[stats[self.sensor_column].notna()]
+        stats = self._merge(stats, keys)
+        count = stats['count'].to_numpy()
+        result = stats[keys].copy()
+        result['count'] = count.astype('int64')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['mean'] = (stats['sum'].to_numpy() / count).astype(self.value_dtype)
+            result['std'] = np.sqrt(stats['m2'].to_numpy() / (count - 1)).astype(self.value_dtype)
+        result.loc[count < 2, 'std'] = np.nan
+        if not by_sensor and freq is not None and len(result) > 0:
+            full_range = pd.date_range(result[self.time_column].iloc[0], result[self.time_column].iloc[-1], freq=freq)
+            result = result.set_index(self.time_column).reindex(full_range)
+            result['count'] = result['count'].fillna(0).astype('int64')
+            result = result.rename_axis(self.time_column).reset_index()
+        return result.reset_index(drop=True)
+
+    def _build_levels(self, finest):
+        """All levels from the moments of the finest one"""
+        levels = {LEVELS[0]: finest.reset_index(drop=True)}
+        for finer, freq in zip(LEVELS, LEVELS[1:]):
+            level = levels[finer]
+            level = level.assign(**{self.time_column: level[self.time_column].dt.floor(freq)})
+            levels[freq] = self._merge(level, [self.time_column, self.sensor_column])
+        return levels
+
+    def _merge(self, stats, keys):
+        """
+        Combine moments sharing the same keys (Chan et al.'s parallel variance update)
+
+        Returns:
+            pd.DataFrame: keys plus the merged moments, ordered by keys
+        """
+        if len(stats) == 0:
+            return stats[keys + MOMENT_COLUMNS].reset_index(drop=True)
+        codes = stats.groupby(keys, observed=True, dropna=False, sort=True).ngroup().to_numpy()
+        order = np.argsort(codes, kind='stable')
+        starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+        count, total, m2, low, high = (stats[column].to_numpy(np.float64)[order] for column in MOMENT_COLUMNS)
+        merged_count = np.add.reduceat(count, starts)
+        merged_sum = np.add.reduceat(total, starts)
+        # m2 of a union: the parts' m2 plus each part's squared offset from the joint mean
+        joint_mean = np.repeat(merged_sum / merged_count, np.diff(np.append(starts, len(order))))
+        spread = m2 + count * (total / count - joint_mean) ** 2
+        merged = stats[keys].iloc[order[starts]].reset_index(drop=True)
+        merged['count'] = merged_count.astype(np.int64)
+        merged['sum'] = merged_sum
+        merged['m2'] = np.add.reduceat(spread, starts)
+        merged['min'] = np.minimum.reduceat(low, starts)
+        merged['max'] = np.maximum.reduceat(high, starts)
+        return merged
+
+def bucket_width(freq):
+    """Fixed width of a pandas frequency string, or None for calendar frequencies"""
+    try:
+        offset = pd.tseries.frequencies.to_offset(freq)
+        return pd.Timedelta(offset.nanos, 'ns')
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,76 @@
+# app/utils/sensor_index.py
+import numpy as np
+import pandas as pd
+
+from .timestamps import as_datetime64
+
+
+class SensorIndex:
+    """
+    Sensor-contiguous view of a time-sorted readings frame.
+
+    The frame itself stays in time order (see time_index.sort_by_time); this
+    index holds the row positions regrouped by sensor, time order kept within
+    each sensor, plus an offsets table mapping every sensor to its start and
+    end in that permutation. One sensor's readings, or the part of them in a
+    time window, are then a slice of the permutation found without scanning
+    the frame, and the sensor list and row counts are ready for dropdowns.
+    """
+
+    def __init__(self, frame, sensor_column, time_column):
+        self.frame = frame
+        codes, sensors = pd.factorize(frame[sensor_column], sort=True)
+        # Stable, so rows of a sensor keep the frame's time order; missing ids group first
+        order = np.argsort(codes, kind='stable')
+        self._order = order.astype(np.int32) if len(order) < 2 ** 31 else order
+        self._times = frame[time_column].to_numpy()[order]
+        bounds = np.cumsum(np.bincount(codes + 1, minlength=len(sensors) + 1))
+        self.sensors = list(sensors)
+        self._offsets = {
+            sensor: (int(start), int(end)) for sensor, start, end in zip(self.sensors, bounds[:-1], bounds[1:])
+        }
+
+    def __len__(self):
+        return len(self._order)
+
+    def counts(self):
+        """Rows per sensor, in sensor order"""
+        return pd.Series({sensor: end - start for sensor, (start, end) in self._offsets.items()},
+                         dtype='int64')
+
+    def positions(self, sensor, start=None, end=None):
+        """Frame positions of a sensor's rows, optionally with start <= timestamp <= end"""
+        lo, hi = self._offsets.get(sensor, (0, 0))
+        if start is not None and end is not None and hi > lo:
+            times = self._times[lo:hi]
+            start, end = as_datetime64(start), as_datetime64(end)
+            lo, hi = (lo + int(np.searchsorted(times, start, side='left')),
+                      lo + int(np.searchsorted(times, end, side='right')))
+        return self._order[lo:max(lo, hi)]
+
+    def active(self, start=None, end=None):
+        """Sensors with at least one reading with start <= timestamp <= end (all sensors if unbounded)"""
+        if start is None or end is None:
+            return [sensor for sensor, (lo, hi) in self._offsets.items() if hi > lo]
+        start, end = as_datetime64(start), as_datetime64(end)
+        active = []
+        for sensor in self.sensors:
+            lo, hi = self._offsets[sensor]
+            times = self._times[lo:hi]
+            if times.searchsorted(end, side='right') > times.searchsorted(start, side='left'):
+                active.append(sensor)
+        return active
+
+    def rows(self, sensors, start=None, end=None):
+        """
+        Readings of some sensors
+
+        Args:
+            sensors (list): Sensor ids; unknown ids match nothing
+            start, end: Optional inclusive time bounds
+
+        Returns:
+            pd.DataFrame: Rows grouped by sensor in the order given, in time order within each
+        """
+        positions = [self.positions(sensor, start, end) for sensor in sensors]
+        return self.frame.take(np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64))
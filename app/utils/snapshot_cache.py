@@ -0,0 +1,192 @@
+# app/utils/snapshot_cache.py
+import hashlib
+import json
+import os
+import pandas as pd
+from .audit import get_logger
+
+logger = get_logger('snapshot_cache')
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+class SnapshotCache:
+    """
+    On-disk Parquet cache of cleaned datasets.
+
+    Each entry lives in its own directory under ``cache_dir`` and holds one
+    or more frames plus a ``manifest.json`` recording the size, mtime and
+    content hash of the source files and the parameters used to build it.
+    An entry is only served while all of those still match. The fingerprint
+    is taken before the sources are read (see fingerprint()), so an entry
+    never claims rows appended while it was being built.
+    """
+    MANIFEST = 'manifest.json'
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.enabled = PARQUET_AVAILABLE
+        if not self.enabled:
+            logger.warning("pyarrow is not installed, snapshot cache disabled")
+
+    def load(self, name, source_paths, params=None, frames=None, sizes=None):
+        """
+        Load a cached entry if it is still valid for its sources
+
+        Args:
+            name (str): Entry name, e.g. 'static_readings'
+            source_paths (list): Files the entry was built from
+            params (dict): Build parameters that must match the cached ones
+            frames (list): Only read these frames (defaults to all of them)
+            sizes (dict): Path -> number of leading bytes the caller reads, for
+                files that may have grown since (defaults to the current sizes)
+
+        Returns:
+            dict: Frame name -> DataFrame, or None on a cache miss
+        """
+        if not self.enabled:
+            return None
+
+        manifest = self._read_manifest(name)
+        if manifest is None or manifest.get('params') != _jsonable(params):
+            return None
+
+        cached_sources = manifest.get('sources', {})
+        if set(cached_sources) != set(source_paths):
+            return None
+
+        refreshed = False
+        for path in source_paths:
+            cached = cached_sources[path]
+            stat = os.stat(path)
+            size = (sizes or {}).get(path, stat.st_size)
+            if size != cached['size']:
+                return None
+            if stat.st_mtime_ns != cached['mtime_ns']:
+                # Same size but touched (or appended to since): only the content hash can tell
+                if self._hash_file(path, size) != cached['sha256']:
+                    return None
+                if stat.st_size == size:
+                    cached['mtime_ns'] = stat.st_mtime_ns
+                    refreshed = True
+
+        if frames is None:
+            frames = manifest['frames']
+        elif not set(frames) <= set(manifest['frames']):
+            return None
+
+        try:
+            frames = {
+                frame: pd.read_parquet(os.path.join(self._entry_dir(name), f"{frame}.parquet"))
+                for frame in frames
+            }
+        except Exception as e:
+            logger.warning("Could not read cached %s: %s", name, e)
+            return None
+
+        if refreshed:
+            self._write_manifest(name, manifest)
+        return frames
+
+    def fingerprint(self, source_paths, sizes=None):
+        """
+        Size, mtime and content hash of source files, to pass to store()
+
+        Take it before reading the sources: a fingerprint taken after the build
+        would also cover rows appended while the frames were being built.
+
+        Args:
+            source_paths (list): Files the entry is built from
+            sizes (dict): Path -> number of leading bytes the entry is built from
+                (defaults to the current sizes)
+
+        Returns:
+            dict: Path -> {'size', 'mtime_ns', 'sha256'}
+        """
+        sources = {}
+        for path in source_paths:
+            stat = os.stat(path)
+            size = (sizes or {}).get(path, stat.st_size)
+            sources[path] = {
+                'size': size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': self._hash_file(path, size)
+            }
+        return sources
+
+    def store(self, name, sources, frames, params=None):
+        """
+        Write frames to the cache, replacing any previous entry
+
+        Args:
+            name (str): Entry name
+            sources (dict): fingerprint() of the files the frames were built from,
+                taken before they were read
+            frames (dict): Frame name -> DataFrame
+            params (dict): Build parameters to record with the entry
+        """
+        if not self.enabled:
+            return
+
+        try:
+            entry_dir = self._entry_dir(name)
+            os.makedirs(entry_dir, exist_ok=True)
+
+            for frame, df in frames.items():
+                target = os.path.join(entry_dir, f"{frame}.parquet")
+                df.to_parquet(target + '.tmp')
+                os.replace(target + '.tmp', target)
+
+            # Manifest goes last so a partially written entry is never served
+            self._write_manifest(name, {
+                'sources': sources,
+                'params': _jsonable(params),
+                'frames': list(frames)
+            })
+        except Exception as e:
+            logger.warning("Could not write %s to snapshot cache: %s", name, e)
+
+    def invalidate(self, name):
+        """Drop an entry so the next load rebuilds it"""
+        manifest_path = os.path.join(self._entry_dir(name), self.MANIFEST)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    def _entry_dir(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _read_manifest(self, name):
+        try:
+            with open(os.path.join(self._entry_dir(name), self.MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, name, manifest):
+        path = os.path.join(self._entry_dir(name), self.MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def _hash_file(self, path, size=None):
+        """SHA-256 of a file, or of its first ``size`` bytes"""
+        digest = hashlib.sha256()
+        remaining = os.path.getsize(path) if size is None else size
+        with open(path, 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(self.HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest.hexdigest()
+
+
+def _jsonable(params):
+    """Round-trip params through JSON so they compare equal to a loaded manifest"""
+    return json.loads(json.dumps(params or {}, sort_keys=True))
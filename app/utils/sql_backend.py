@@ -0,0 +1,300 @@
+# app/utils/sql_backend.py
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Engine used when none is requested: DuckDB if installed, else the standard library's SQLite
+DEFAULT_ENGINE = 'duckdb' if DUCKDB_AVAILABLE else 'sqlite'
+
+META_TABLE = '_radwatch_tables'
+ROW_ID = 'row_id'  # Holds the frame index (the reading's position in its source file)
+
+
+class SQLBackend:
+    """
+    Cleaned readings in an embedded, on-disk SQL database queried in-process.
+
+    Range filters, per-sensor aggregates and time bucketing run inside the
+    engine and only their results are materialized as DataFrames. Tables live
+    in a database file, so the engine can work over more data than fits in
+    memory. DuckDB executes aggregates on all cores. With SQLite, each table
+    gets indexes on (sensor, timestamp) and on timestamp.
+
+    Timestamps are stored as int64 nanoseconds and categorical columns as text;
+    frames returned by read() are converted back to the dtypes they were
+    written with.
+    """
+
+    def __init__(self, db_path, engine=None, timestamp_column='timestamp',
+                 sensor_column='sensor_id', value_column='value', threads=None):
+        self.engine = engine or DEFAULT_ENGINE
+        if self.engine == 'duckdb' and not DUCKDB_AVAILABLE:
+            raise ValueError("duckdb is not installed")
+        self.db_path = db_path
+        self.timestamp_column = timestamp_column
+        self.sensor_column = sensor_column
+        self.value_column = value_column
+        self.enabled = True
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.RLock()
+        if self.engine == 'duckdb':
+            self._conn = duckdb.connect(db_path)
+            if threads:
+                self._conn.execute(f"SET threads TO {int(threads)}")
+        else:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._execute(
+            f"CREATE TABLE IF NOT EXISTS {META_TABLE} (name TEXT PRIMARY KEY, key TEXT, dtypes TEXT)"
+        )
+        self._commit()
+
+    def is_current(self, name, key):
+        """Whether table ``name`` was written for ``key``"""
+        row = self._fetchone(f"SELECT key FROM {META_TABLE} WHERE name = ?", [name])
+        return row is not None and row[0] == _dumps(key)
+
+    def write(self, name, df, key):
+        """
+        Replace the table of a dataset
+
+        Args:
+            name (str): Dataset name, e.g. 'static_readings'
+            df (pd.DataFrame): Cleaned readings
+            key (dict): Identifies the data the table was built from (see is_current)
+        """
+        table = _quote(name)
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        rows = self._to_sql_frame(df)
+
+        with self._lock:
+            self._execute(f"DROP TABLE IF EXISTS {table}")
+            if self.engine == 'duckdb':
+                # Inserting in time order keeps DuckDB's per-block min/max useful for range scans
+                self._conn.register('incoming', rows)
+                try:
+                    self._execute(
+                        f"CREATE TABLE {table} AS SELECT * FROM incoming "
+                        f"ORDER BY {_quote(self.timestamp_column)}"
+                    )
+                finally:
+                    self._conn.unregister('incoming')
+            else:
+                rows.to_sql(name, self._conn, index=False, chunksize=100000)
+                self._execute(
+                    f"CREATE INDEX {_quote(name + '_sensor_time')} ON {table} "
+                    f"({_quote(self.sensor_column)}, {_quote(self.timestamp_column)})"
+                )
+                self._execute(
+                    f"CREATE INDEX {_quote(name + '_time')} ON {table} ({_quote(self.timestamp_column)})"
+                )
+            self._execute(f"DELETE FROM {META_TABLE} WHERE name = ?", [name])
+            self._execute(
+                f"INSERT INTO {META_TABLE} VALUES (?, ?, ?)", [name, _dumps(key), json.dumps(dtypes)]
+            )
+            self._commit()
+
+    def append(self, name, rows):
+        """Insert appended rows into a dataset's table"""
+        rows = self._to_sql_frame(rows)
+        with self._lock:
+            if self.engine == 'duckdb':
+                self._conn.register('incoming', rows)
+                try:
+                    self._execute(f"INSERT INTO {_quote(name)} SELECT * FROM incoming")
+                finally:
+                    self._conn.unregister('incoming')
+            else:
+                rows.to_sql(name, self._conn, index=False, if_exists='append', chunksize=100000)
+            self._commit()
+
+    def read(self, name, start=None, end=None):
+        """
+        Rows of a dataset with timestamps in [start, end]
+
+        Returns:
+            pd.DataFrame: Rows ordered by time, sensor and source position, with the
+                written dtypes and index
+        """
+        where, params = self._range(start, end)
+        df = self._query(
+            f"SELECT * FROM {_quote(name)}{where} "
+            f"ORDER BY {_quote(self.timestamp_column)} NULLS LAST, {_quote(self.sensor_column)}, {ROW_ID}",
+            params
+        )
+        return self._from_sql_frame(name, df)
+
+    def sensor_aggregates(self, name, start=None, end=None):
+        """
+        Per-sensor count, mean, sample std, min and max of the values in [start, end]
+
+        Returns:
+            pd.DataFrame: One row per sensor, ordered by sensor id
+        """
+        sensor = _quote(self.sensor_column)
+        df = self._grouped_moments(name, [sensor], start, end, extremes=True)
+        return _moments(df, ['count', 'mean', 'std', 'min', 'max'], keys=[self.sensor_column])
+
+    def latest_positions(self, name, columns, start=None, end=None):
+        """
+        Values of ``columns`` at each sensor's latest reading in [start, end]
+
+        Returns:
+            pd.DataFrame: sensor id plus ``columns``, one row per sensor
+        """
+        where, params = self._range(start, end)
+        sensor = _quote(self.sensor_column)
+        timestamp = _quote(self.timestamp_column)
+        if self.engine == 'duckdb':
+            selected = ', '.join(f"arg_max({_quote(col)}, {timestamp}) AS {_quote(col)}" for col in columns)
+        else:
+            # SQLite takes bare columns from the row holding MAX()
+            selected = ', '.join(_quote(col) for col in columns) + f", MAX({timestamp})"
+        df = self._query(
+            f"SELECT {sensor}, {selected} FROM {_quote(name)}{where} GROUP BY {sensor} ORDER BY {sensor}",
+            params
+        )
+        return df[[self.sensor_column] + list(columns)]
+
+    def bucketed(self, name, freq, start=None, end=None, by_sensor=False):
+        """
+        Count, mean and sample std of the values per fixed-width time bucket
+
+        Args:
+            freq (str): Bucket width, e.g. '1h' or '15min'
+            by_sensor (bool): Also group by sensor
+
+        Returns:
+            pd.DataFrame: Non-empty buckets with their start time in the timestamp column
+        """
+        width = pd.to_timedelta(freq).value
+        timestamp = _quote(self.timestamp_column)
+        # A separate alias: grouping on the column's own name would bind to the raw column
+        group = [f"{timestamp} - ({timestamp} % {width}) AS bucket"]
+        if by_sensor:
+            group.append(_quote(self.sensor_column))
+        df = self._grouped_moments(name, group, start, end)
+        df[self.timestamp_column] = pd.to_datetime(df['bucket'].astype('int64'))
+        keys = [self.timestamp_column] + ([self.sensor_column] if by_sensor else [])
+        return _moments(df, ['count', 'mean', 'std'], keys=keys)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _grouped_moments(self, name, group, start, end, extremes=False):
+        """
+        Count, mean and sum of squared deviations from the mean (m2) of the values
+        in [start, end] per group
+
+        Deviations are taken from each group's own mean, computed by a window
+        aggregate in the same query, so small variances of large values are not
+        lost to cancellation as with a sum of squares.
+
+        Args:
+            group (list): Grouping expressions, each a quoted column or ``expr AS alias``
+            extremes (bool): Also return min and max
+        """
+        where, params = self._range(start, end)
+        value = self._double(self.value_column)
+        keys = [expr.rsplit(' AS ', 1)[-1] for expr in group]
+        partition = ', '.join(keys)
+        extra = ", MIN(value) AS min, MAX(value) AS max" if extremes else ""
+        return self._query(
+            f"SELECT {partition}, COUNT(value) AS count, AVG(value) AS mean, "
+            f"SUM((value - group_mean) * (value - group_mean)) AS m2{extra} "
+            f"FROM (SELECT {partition}, value, AVG(value) OVER (PARTITION BY {partition}) AS group_mean "
+            f"FROM (SELECT {', '.join(group)}, {value} AS value FROM {_quote(name)}{where}) AS selected) AS centered "
+            f"GROUP BY {partition} ORDER BY {partition}",
+            params
+        )
+
+    def _range(self, start, end):
+        """WHERE clause restricting the timestamp to [start, end] (both or neither)"""
+        if start is None or end is None:
+            return '', []
+        return (f" WHERE {_quote(self.timestamp_column)} BETWEEN ? AND ?",
+                [pd.Timestamp(start).value, pd.Timestamp(end).value])
+
+    def _double(self, column):
+        """Column cast to double precision, so sums of squares do not lose precision"""
+        return f"CAST({_quote(column)} AS DOUBLE)"
+
+    def _to_sql_frame(self, df):
+        """Columns in the form the engines store: int64 ns timestamps, text categories"""
+        rows = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                rows[col] = series.to_numpy(dtype='datetime64[ns]').view('int64')
+            elif isinstance(series.dtype, pd.CategoricalDtype):
+                rows[col] = series.astype(series.cat.categories.dtype)
+            else:
+                rows[col] = series.to_numpy()
+        rows[ROW_ID] = df.index.to_numpy(dtype=np.int64)
+        return pd.DataFrame(rows)
+
+    def _from_sql_frame(self, name, df):
+        """Restore the dtypes and index a frame was written with"""
+        row = self._fetchone(f"SELECT dtypes FROM {META_TABLE} WHERE name = ?", [name])
+        dtypes = json.loads(row[0]) if row else {}
+        df = df.set_index(ROW_ID)
+        # An empty SQLite result carries untyped (object) columns
+        df.index = df.index.astype(np.int64)
+        df.index.name = None
+        for col, dtype in dtypes.items():
+            if dtype.startswith('datetime64'):
+                df[col] = pd.to_datetime(df[col].astype('int64'))
+            elif dtype == 'category':
+                df[col] = df[col].astype('category')
+            else:
+                df[col] = df[col].astype(dtype)
+        return df
+
+    def _execute(self, sql, params=None):
+        with self._lock:
+            return self._conn.execute(sql, params or [])
+
+    def _commit(self):
+        if self.engine == 'sqlite':
+            self._conn.commit()
+
+    def _fetchone(self, sql, params=None):
+        if self.engine == 'duckdb':
+            return self._conn.cursor().execute(sql, params or []).fetchone()
+        with self._lock:
+            return self._conn.execute(sql, params or []).fetchone()
+
+    def _query(self, sql, params=None):
+        if self.engine == 'duckdb':
+            # A cursor per query lets callbacks on different threads run concurrently
+            return self._conn.cursor().execute(sql, params or []).df()
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params or None)
+
+
+def _moments(df, columns, keys):
+    """Replace count/m2 with an integer count and the sample std"""
+    count = df['count'].astype('float64')
+    variance = df['m2'].astype('float64') / (count - 1).where(count > 1)
+    df['count'] = df['count'].astype('int64')
+    df['mean'] = df['mean'].astype('float64')
+    df['std'] = np.sqrt(variance.clip(lower=0))
+    return df[keys + columns].reset_index(drop=True)
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _dumps(key):
+    return json.dumps(key, sort_keys=True, default=str)
@@ -0,0 +1,66 @@
+# app/utils/time_index.py
+import numpy as np
+import pandas as pd
+
+from .timestamps import as_datetime64
+
+
+def sort_by_time(df, column):
+    """
+    Stable sort of a frame by a datetime column, missing timestamps last
+
+    Rows with equal timestamps keep their relative order, so a frame ordered
+    by sensor and time stays ordered by time within each sensor. Returns
+    ``df`` itself when it is already in order.
+    """
+    order = np.argsort(df[column].to_numpy(), kind='stable')
+    if np.array_equal(order, np.arange(len(order))):
+        return df
+    return df.take(order)
+
+
+def append_by_time(base, rows, column, tie_column):
+    """
+    Append rows to a frame sorted by (``column``, ``tie_column``), keeping that order
+
+    Rows later than everything in ``base`` are concatenated as they are; a
+    batch reaching back into ``base`` re-sorts the result. Ties on both
+    columns keep ``base`` rows first.
+    """
+    rows = rows.sort_values([column, tie_column], kind='stable')
+    combined = pd.concat([base, rows])
+    if len(base) == 0 or len(rows) == 0:
+        return combined
+    last, first = base[column].iloc[-1], rows[column].iloc[0]
+    if pd.isna(last) or rows[column].isna().any() or first <= last:
+        combined = combined.sort_values([column, tie_column], kind='stable')
+    return combined
+
+
+class TimeIndex:
+    """
+    Range lookups on a frame sorted with sort_by_time.
+
+    Holds the frame's timestamp column as a datetime64 array (its int64
+    nanoseconds, without a copy), so a time range is two binary searches and
+    the matching rows are a positional slice of the frame instead of a
+    boolean mask over every row. Missing timestamps sort last and never match.
+    """
+
+    def __init__(self, frame, column):
+        self.frame = frame
+        self._times = frame[column].to_numpy()
+
+    def __len__(self):
+        return len(self._times)
+
+    def positions(self, start, end):
+        """First and one-past-last row with start <= timestamp <= end"""
+        start, end = as_datetime64(start), as_datetime64(end)
+        return (int(np.searchsorted(self._times, start, side='left')),
+                int(np.searchsorted(self._times, end, side='right')))
+
+    def slice(self, start, end):
+        """Rows with start <= timestamp <= end, as a slice of the frame"""
+        lo, hi = self.positions(start, end)
+        return self.frame.iloc[lo:max(lo, hi)]
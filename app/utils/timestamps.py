@@ -0,0 +1,92 @@
+# app/utils/timestamps.py
+import numpy as np
+import pandas as pd
+
+# Candidate formats tried in order when detecting a feed's timestamp format
+TIMESTAMP_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y/%m/%d %H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+]
+
+# Number of distinct strings sampled when detecting the format
+FORMAT_SAMPLE_SIZE = 200
+
+
+def detect_timestamp_format(values, formats=TIMESTAMP_FORMATS):
+    """
+    Detect the strftime format of a collection of timestamp strings
+
+    Args:
+        values (array-like): Timestamp strings, ideally already de-duplicated
+        formats (list): Candidate formats, tried in order
+
+    Returns:
+        str: The first format that parses every sampled value, or None
+    """
+    values = np.asarray(values, dtype=object)
+    values = values[pd.notna(values)]
+    if len(values) == 0:
+        return None
+
+    # Sample evenly across the feed so day/month ambiguity is caught
+    step = max(1, len(values) // FORMAT_SAMPLE_SIZE)
+    sample = values[::step]
+
+    for fmt in formats:
+        try:
+            pd.to_datetime(sample, format=fmt)
+            return fmt
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def parse_timestamps(series, fmt=None):
+    """
+    Parse a column of timestamp strings, parsing each distinct string only once
+
+    Sensor feeds repeat the same stamps across many sensors, so the column is
+    factorized first and only the unique strings go through the parser.
+
+    Args:
+        series (pd.Series): Raw timestamp strings
+        fmt (str): Explicit strftime format; detected from the data when None
+
+    Returns:
+        pd.Series: datetime64[ns] series aligned with the input
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    if fmt is None:
+        fmt = detect_timestamp_format(uniques)
+
+    parsed = None
+    if fmt is not None:
+        try:
+            parsed = pd.to_datetime(uniques, format=fmt)
+        except (ValueError, TypeError):
+            # A late row deviates from the detected format
+            parsed = None
+    if parsed is None:
+        parsed = pd.to_datetime(uniques)
+
+    values = np.asarray(parsed, dtype='datetime64[ns]')[codes]
+    values[codes < 0] = np.datetime64('NaT')
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def as_datetime64(value):
+    """
+    A timestamp as a datetime64[ns] scalar, for searching sorted time columns
+
+    to_datetime64 keeps the nanoseconds that np.datetime64(Timestamp) drops.
+    """
+    return np.datetime64(pd.Timestamp(value).to_datetime64(), 'ns')
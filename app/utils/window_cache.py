@@ -0,0 +1,98 @@
+# app/utils/window_cache.py
+import threading
+from collections import OrderedDict
+
+
+class _Flight:
+    """A computation in progress that other callers of the same key wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class WindowCache:
+    """
+    Bounded LRU cache of computed values with single-flight semantics.
+
+    Keys are tuples whose first item is the dataset they derive from, so all
+    entries of a dataset can be dropped at once (discard()). A miss computes the
+    value once: callers asking for the same key while it is being computed wait
+    for that result instead of computing it again. The least recently used
+    entry is evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}  # key -> _Flight being computed
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0  # Callers that waited for another caller's computation
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute):
+        """
+        Cached value of ``key``, calling ``compute()`` on a miss
+
+        Exceptions from ``compute`` reach every caller waiting for it and
+        nothing is cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                # A discard() while computing drops the flight; its result is then not kept
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                    if flight.error is None:
+                        self._entries[key] = flight.value
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.value
+
+    def discard(self, dataset):
+        """Drop the entries (and forget the computations in progress) of a dataset"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset]:
+                del self._entries[key]
+            for key in [key for key in self._flights if key[0] == dataset]:
+                del self._flights[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+
+    def stats(self):
+        """Hit, miss and shared-computation counters and the number of entries"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'shared': self.shared,
+                    'entries': len(self._entries)}
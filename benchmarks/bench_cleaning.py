@@ -0,0 +1,87 @@
+# benchmarks/bench_cleaning.py
+"""
+Compare the frame-by-frame cleaning pipeline (the previous implementation)
+against the single-pass reason-code engine behind clean_radiation_data,
+in wall time and peak traced memory.
+
+Usage: python benchmarks/bench_cleaning.py [--rows N] [--sensors N]
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import common
+from utils.data_processing import DataProcessor
+
+
+def make_readings(rows, sensors):
+    """A week of unsorted readings with a few out-of-range values, spikes and outliers"""
+    df = common.make_readings(rows, sensors, days=7, order=None)
+    rng = np.random.default_rng(1)
+    values = df['value'].to_numpy()
+    values[rng.random(rows) < 0.01] = -1.0
+    values[rng.random(rows) < 0.005] = 95.0
+    df['units'] = pd.Categorical(np.full(rows, 'cpm'))
+    return df
+
+
+def legacy_clean(df):
+    """The previous clean_radiation_data: filter, sort, diff column, filter, quantiles, filter"""
+    p = DataProcessor
+    cleaned = df.copy()
+    mask = (cleaned[p.VALUE] >= p.MIN_VALID_VALUE) & (cleaned[p.VALUE] <= p.MAX_VALID_VALUE)
+    cleaned = cleaned[mask]
+    cleaned = cleaned.sort_values([p.SENSOR_ID, p.TIMESTAMP])
+    cleaned['value_diff'] = cleaned.groupby(p.SENSOR_ID, observed=True)[p.VALUE].diff()
+    mask = abs(cleaned['value_diff']) <= p.MAX_RATE_OF_CHANGE
+    cleaned = cleaned[mask]
+    cleaned = cleaned.drop('value_diff', axis=1)
+    q1 = cleaned[p.VALUE].quantile(0.25)
+    q3 = cleaned[p.VALUE].quantile(0.75)
+    iqr = q3 - q1
+    outlier_mask = (cleaned[p.VALUE] >= q1 - p.IQR_MULTIPLIER * iqr) & \
+                   (cleaned[p.VALUE] <= q3 + p.IQR_MULTIPLIER * iqr)
+    return cleaned[outlier_mask]
+
+
+def measure(func):
+    """Wall time and peak memory allocated while running func"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    args = parser.parse_args()
+
+    df = make_readings(args.rows, args.sensors)
+    input_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{len(df):,} rows, {args.sensors} sensors, {input_mb:,.0f} MB input")
+
+    legacy_time, legacy_peak, expected = measure(lambda: legacy_clean(df))
+    del expected
+    engine_time, engine_peak, cleaned = measure(lambda: DataProcessor().clean_radiation_data(df))
+
+    pd.testing.assert_frame_equal(legacy_clean(df), cleaned)
+
+    print(f"{'':24} {'time':>9} {'peak memory':>13}")
+    print(f"{'frame pipeline:':24} {legacy_time:8.2f}s {legacy_peak / 1e6:10.0f} MB")
+    print(f"{'single-pass engine:':24} {engine_time:8.2f}s {engine_peak / 1e6:10.0f} MB")
+    print(f"{'improvement:':24} {legacy_time / engine_time:8.1f}x {legacy_peak / engine_peak:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
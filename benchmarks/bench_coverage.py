@@ -0,0 +1,104 @@
+# benchmarks/bench_coverage.py
+"""
+Compare the neighborhood coverage statistics computed the way
+calculate_coverage_stats used to (a Point.within test per reading and
+neighborhood) against the bulk STRtree lookup of distinct coordinates
+in NeighborhoodGeometry. The old loop is timed on a sample of readings
+and scaled up, since it takes the better part of an hour on the full set.
+
+Usage: python benchmarks/bench_coverage.py [--rows N] [--sensors N] [--neighborhoods N] [--sample N]
+"""
+import argparse
+import time
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import Point
+
+import common
+from utils.data_processing import DataProcessor
+from utils.geometry import NeighborhoodGeometry
+
+
+def make_neighborhoods(count):
+    """Grid of square neighborhoods with densified outlines, like surveyed boundaries"""
+    side = int(np.ceil(np.sqrt(count)))
+    cells = [shapely.segmentize(shapely.box(i * 0.01, j * 0.01, (i + 1) * 0.01, (j + 1) * 0.01), 0.0002)
+             for i in range(side) for j in range(side)][:count]
+    return gpd.GeoDataFrame({'Nbrhood': [f'N{i:02d}' for i in range(count)]}, geometry=cells, crs='EPSG:4326')
+
+
+def make_readings(rows, sensors, extent):
+    """Static sensors with readings and mobile readings on a ~11 m grid of coordinates"""
+    rng = np.random.default_rng(0)
+    static_sensors = pd.DataFrame({
+        'sensor_id': np.arange(sensors),
+        'latitude': rng.uniform(0, extent, sensors),
+        'longitude': rng.uniform(0, extent, sensors)
+    })
+    static_readings = common.make_readings(rows, sensors, days=5)
+    mobile_readings = pd.DataFrame({
+        'sensor_id': rng.integers(0, 50, rows),
+        # Vehicles cover the lower half of the city only
+        'latitude': (rng.integers(0, int(extent * 5000), rows) / 1e4).astype(np.float32),
+        'longitude': (rng.integers(0, int(extent * 1e4), rows) / 1e4).astype(np.float32),
+        'value': rng.normal(20, 5, rows).astype(np.float32)
+    })
+    return static_sensors, static_readings, mobile_readings
+
+
+def loop_coverage(gdf, static_sensors, static_readings, mobile_readings):
+    """The previous calculate_coverage_stats loops over readings and neighborhoods"""
+    neighborhoods_with_data = set()
+    merged = pd.merge(static_sensors, static_readings, on='sensor_id')
+    for readings in (merged, mobile_readings):
+        for _, reading in readings.iterrows():
+            point = Point(reading['longitude'], reading['latitude'])
+            for idx, neighborhood in gdf.iterrows():
+                if point.within(neighborhood.geometry):
+                    neighborhoods_with_data.add(neighborhood.get('Nbrhood', str(idx)))
+    return neighborhoods_with_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Static and mobile readings each")
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--neighborhoods', type=int, default=20)
+    parser.add_argument('--sample', type=int, default=500, help="Readings the old loop is timed on")
+    args = parser.parse_args()
+
+    gdf = make_neighborhoods(args.neighborhoods)
+    extent = gdf.total_bounds[2]
+    static_sensors, static_readings, mobile_readings = make_readings(args.rows, args.sensors, extent)
+    processor = DataProcessor()
+    processor.gdf = gdf
+    processor.static_sensors = static_sensors
+    processor.static_readings = static_readings
+    print(f"2 x {args.rows:,} readings, {args.sensors} static sensors, {args.neighborhoods} neighborhoods")
+
+    start = time.perf_counter()
+    stats = processor.calculate_coverage_stats(static_sensors, mobile_readings)
+    bulk_time = time.perf_counter() - start
+
+    static_sample, mobile_sample = static_readings.iloc[:args.sample], mobile_readings.iloc[:args.sample]
+    start = time.perf_counter()
+    expected = loop_coverage(gdf, static_sensors, static_sample, mobile_sample)
+    loop_time = (time.perf_counter() - start) * args.rows / args.sample
+
+    # Same neighborhoods from the bulk lookup on the sample
+    geometry = NeighborhoodGeometry(gdf)
+    sampled = static_sensors[static_sensors['sensor_id'].isin(static_sample['sensor_id'])]
+    positions = np.concatenate([geometry.covered(sampled['longitude'], sampled['latitude']),
+                                geometry.covered(mobile_sample['longitude'], mobile_sample['latitude'])])
+    assert set(gdf['Nbrhood'].iloc[np.unique(positions)]) == expected
+
+    print(f"\nPoint.within loop: {loop_time:8.1f} s (scaled from {args.sample:,} readings each)")
+    print(f"STRtree lookup:    {bulk_time:8.3f} s ({loop_time / bulk_time:,.0f}x)")
+    print(f"covered {stats['covered_neighborhoods']} of {stats['total_neighborhoods']} neighborhoods")
+
+
+if __name__ == '__main__':
+    main()
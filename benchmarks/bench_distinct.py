@@ -0,0 +1,75 @@
+# benchmarks/bench_distinct.py
+"""
+Compare the distinct sensor, user and location counts of the mobile metrics
+computed the way update_mobile_metrics used to (filter the readings, two
+unique() calls and a drop_duplicates over the coordinates) against merging
+the per-hour and per-day HyperLogLog registers of the DistinctCube, for
+growing windows, and report the relative error of each sketched count.
+
+Usage: python benchmarks/bench_distinct.py [--rows N] [--sensors N] [--users N] [--days N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import START, best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def make_mobile_readings(rows, sensors, users, days):
+    """Time-sorted mobile readings on a ~11 m grid of coordinates"""
+    rng = np.random.default_rng(1)
+    df = make_readings(rows, sensors, days)
+    df['user_id'] = pd.Categorical(rng.integers(0, users, rows).astype(str))
+    df['latitude'] = (rng.integers(0, 2000, rows) / 1e4).astype(np.float32)
+    df['longitude'] = (-119.9 + rng.integers(0, 2000, rows) / 1e4).astype(np.float32)
+    return df
+
+
+def scan_counts(processor, start, end):
+    """The previous update_mobile_metrics counts"""
+    filtered_data = processor.get_readings('mobile_readings', start, end)
+    return {
+        'sensors': len(filtered_data['sensor_id'].unique()),
+        'users': len(filtered_data['user_id'].unique()),
+        'locations': len(filtered_data[['latitude', 'longitude']].drop_duplicates())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.mobile_readings = make_mobile_readings(args.rows, args.sensors, args.users, args.days)
+    print(f"{args.rows:,} rows, {args.sensors} sensors, {args.users} users, {args.days} days")
+
+    build_start = time.perf_counter()
+    processor.get_distinct_counts('mobile_readings', exact=False)
+    cube = processor._distinct_cubes['mobile_readings']
+    print(f"registers built in {time.perf_counter() - build_start:.2f} s, "
+          f"{cube.nbytes / 2**20:.1f} MiB\n")
+
+    print(f"{'window':>8} {'scan':>10} {'sketches':>10} {'speedup':>8} "
+          f"{'sensors':>8} {'users':>8} {'locations':>10} {'std error':>10}")
+    for window in ['1h', '1D', '7D', f'{args.days}D']:
+        # Off the bucket grid, so partial hours at both ends come from raw rows
+        start = START + pd.Timedelta(days=args.days // 2) - pd.Timedelta(window) / 2 + pd.Timedelta('7min')
+        end = start + pd.Timedelta(window)
+        scan_time, expected = best_of(lambda: scan_counts(processor, start, end), args.repeat)
+        sketch_time, counts = best_of(
+            lambda: processor.get_distinct_counts('mobile_readings', start, end, exact=False), args.repeat)
+        errors = [counts[key] / expected[key] - 1 for key in ['sensors', 'users', 'locations']]
+        print(f"{window:>8} {scan_time * 1e3:8.2f}ms {sketch_time * 1e3:8.3f}ms {scan_time / sketch_time:7.0f}x "
+              f"{errors[0]:+8.2%} {errors[1]:+8.2%} {errors[2]:+10.2%} {counts['relative_error']:10.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_planner.py
+"""
+Compare the time series of the comparison view built at a fixed bucket
+width (as update_comparison_timeseries used to) against the width and
+source DataProcessor.plan_buckets picks for a chart point budget, for
+growing ranges: time to aggregate and serialize the figure, points sent
+to the browser and payload size.
+
+Usage: python benchmarks/bench_planner.py [--rows N] [--sensors N] [--days N] [--freq F] [--points N]
+"""
+import argparse
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from common import START, best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def chart(buckets):
+    """Serialized line chart of the bucket means with a one-sigma band"""
+    fig = go.Figure()
+    for y in (buckets['mean'], buckets['mean'] + buckets['std'], buckets['mean'] - buckets['std']):
+        fig.add_trace(go.Scatter(x=buckets['timestamp'], y=y, mode='lines'))
+    return fig.to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--freq', default='15min', help="Requested bucket width")
+    parser.add_argument('--points', type=int, default=DataProcessor.CHART_POINT_BUDGET)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.static_readings = make_readings(args.rows, args.sensors, args.days)
+    print(f"{args.rows:,} rows, {args.sensors} sensors, {args.days} days, "
+          f"{args.freq} requested, {args.points:,} point budget")
+    processor.get_bucketed_averages('static_readings', args.freq)  # Build the rollup cube
+
+    print(f"\n{'range':>6} {'fixed':>10} {'points':>7} {'payload':>9} {'planned':>10} {'points':>7} "
+          f"{'payload':>9}  plan")
+    for window in ['1D', '7D', f'{args.days}D']:
+        start = START + pd.Timedelta(days=args.days // 2) - pd.Timedelta(window) / 2
+        end = start + pd.Timedelta(window)
+        fixed_time, (fixed, fixed_json) = best_of(lambda: (
+            lambda buckets: (buckets, chart(buckets))
+        )(processor.get_bucketed_averages('static_readings', args.freq, start, end)), args.repeat)
+        planned_time, (planned, planned_json, plan) = best_of(lambda: (
+            lambda result: (result[0], chart(result[0]), result[1])
+        )(processor.get_planned_buckets('static_readings', args.freq, start, end, max_points=args.points)),
+            args.repeat)
+        print(f"{window:>6} {fixed_time * 1e3:8.1f}ms {len(fixed):7,} {len(fixed_json) / 1024:7.0f}kB "
+              f"{planned_time * 1e3:8.1f}ms {len(planned):7,} {len(planned_json) / 1024:7.0f}kB  {plan['label']}")
+
+
+if __name__ == '__main__':
+    main()
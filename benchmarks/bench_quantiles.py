@@ -0,0 +1,66 @@
+# benchmarks/bench_quantiles.py
+"""
+Compare window medians computed the way update_comparison_stats used to
+(filter the readings, then Series.median) against merging the per-sensor,
+per-hour and per-day KLL sketches of the QuantileCube, for growing windows,
+and report the rank error of each sketched median next to its stated bound.
+
+Usage: python benchmarks/bench_quantiles.py [--rows N] [--sensors N] [--days N] [--k N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import START, best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def rank_error(values, estimate, q):
+    """Distance of q from the range of ranks the estimate occupies"""
+    below = (values < estimate).mean()
+    at_or_below = (values <= estimate).mean()
+    return max(0.0, below - q, q - at_or_below)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--k', type=int, default=DataProcessor.QUANTILE_SKETCH_SIZE)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.QUANTILE_SKETCH_SIZE = args.k
+    readings = make_readings(args.rows, args.sensors, args.days)
+    # Skewed, like radiation readings, so the median is not the mean
+    readings['value'] = np.random.default_rng(0).gamma(3, 5, len(readings)).astype(np.float32)
+    processor.static_readings = readings
+    print(f"{args.rows:,} rows, {args.sensors} sensors, {args.days} days, k={args.k}")
+
+    build_start = time.perf_counter()
+    processor.get_quantile_summary('static_readings')
+    cube = processor._quantile_cubes['static_readings']
+    print(f"{len(cube):,} sketches built in {time.perf_counter() - build_start:.2f} s\n")
+
+    print(f"{'window':>8} {'scan':>10} {'sketches':>10} {'speedup':>8} {'rank error':>11} {'bound':>7}")
+    for window in ['1h', '1D', '7D', f'{args.days}D']:
+        # Off the bucket grid, so partial hours at both ends come from raw rows
+        start = START + pd.Timedelta(days=args.days // 2) - pd.Timedelta(window) / 2 + pd.Timedelta('7min')
+        end = start + pd.Timedelta(window)
+        values = processor.get_readings('static_readings', start, end)['value']
+        scan_time, _ = best_of(
+            lambda: processor.get_readings('static_readings', start, end)['value'].median(), args.repeat)
+        sketch_time, summary = best_of(
+            lambda: processor.get_quantile_summary('static_readings', start, end), args.repeat)
+        assert summary.count == values.count()
+        error = rank_error(values.to_numpy(np.float64), summary.quantile(0.5), 0.5)
+        print(f"{window:>8} {scan_time * 1e3:8.2f}ms {sketch_time * 1e3:8.2f}ms {scan_time / sketch_time:7.1f}x "
+              f"{error:10.4%} {summary.rank_error:6.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_range_stats.py
+"""
+Compare the period statistics of the analysis view computed by scanning the
+filtered frames (as calculate_period_statistics used to) against the
+prefix-sum and block min/max tables of RangeStats, for growing windows.
+
+Usage: python benchmarks/bench_range_stats.py [--rows N] [--sensors N] [--days N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import START, best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def scan_statistics(processor, start, end):
+    """The previous calculate_period_statistics over the filtered frames"""
+    static_data = processor.get_readings('static_readings', start, end)
+    mobile_data = processor.get_readings('mobile_readings', start, end)
+    return {
+        'static_mean': static_data['value'].mean(),
+        'static_max': static_data['value'].max(),
+        'static_min': static_data['value'].min(),
+        'static_std': static_data['value'].std(),
+        'mobile_mean': mobile_data['value'].mean(),
+        'mobile_max': mobile_data['value'].max(),
+        'mobile_min': mobile_data['value'].min(),
+        'mobile_std': mobile_data['value'].std(),
+        'num_static_readings': len(static_data),
+        'num_mobile_readings': len(mobile_data),
+        'unique_mobile_sensors': mobile_data['sensor_id'].nunique()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.static_readings = make_readings(args.rows, args.sensors, args.days, seed=0)
+    processor.mobile_readings = make_readings(args.rows, args.sensors, args.days, seed=1)
+    print(f"2 x {args.rows:,} rows, {args.sensors} sensors, {args.days} days")
+
+    build_start = time.perf_counter()
+    processor.calculate_period_statistics()
+    print(f"range tables built in {time.perf_counter() - build_start:.2f} s\n")
+
+    print(f"{'window':>8} {'scan':>10} {'tables':>10} {'speedup':>8}")
+    for window in ['1h', '1D', '7D', f'{args.days}D']:
+        start = START + pd.Timedelta(days=args.days // 2) - pd.Timedelta(window) / 2
+        end = start + pd.Timedelta(window)
+        scan_time, expected = best_of(lambda: scan_statistics(processor, start, end), args.repeat)
+        table_time, result = best_of(lambda: processor.calculate_period_statistics(start, end), args.repeat)
+        for key, value in expected.items():
+            assert np.isclose(result[key], value, rtol=1e-5), (key, result[key], value)
+        print(f"{window:>8} {scan_time * 1e3:8.2f}ms {table_time * 1e3:8.3f}ms {scan_time / table_time:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_rollups.py
+"""
+Compare time-bucketed averages and periodic profiles grouped from the raw
+readings (as the overview, analysis map and temporal patterns callbacks used
+to compute them) against the same statistics merged from the RollupCube
+levels DataProcessor builds when a dataset is loaded.
+
+Usage: python benchmarks/bench_rollups.py [--rows N] [--sensors N] [--days N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def raw_buckets(df, freq, by_sensor):
+    keys = [pd.Grouper(key='timestamp', freq=freq)] + (['sensor_id'] if by_sensor else [])
+    return df.groupby(keys, observed=True)['value'].agg(['count', 'mean', 'std']).reset_index()
+
+
+def raw_profile(df, period):
+    return df.groupby(getattr(df['timestamp'].dt, period))['value'].agg(['mean', 'std', 'min', 'max'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.static_readings = make_readings(args.rows, args.sensors, args.days)
+    df = processor.static_readings
+    print(f"{len(df):,} rows, {args.sensors} sensors, {args.days} days")
+
+    build_start = time.perf_counter()
+    cube = processor._rollup('static_readings')
+    print(f"rollups built in {time.perf_counter() - build_start:.2f} s ({len(cube):,} buckets)\n")
+
+    print(f"{'query':>22} {'raw':>10} {'rollup':>10} {'speedup':>8}")
+    queries = [(f"{freq}{' by sensor' if by_sensor else ''}",
+                lambda freq=freq, by_sensor=by_sensor: raw_buckets(df, freq, by_sensor),
+                lambda freq=freq, by_sensor=by_sensor: processor.get_bucketed_averages(
+                    'static_readings', freq, by_sensor=by_sensor))
+               for freq, by_sensor in [('15min', False), ('1h', False), ('4h', True), ('1D', True)]]
+    queries += [(f"profile {period}",
+                 lambda period=period: raw_profile(df, period),
+                 lambda period=period: processor.get_periodic_profile('static_readings', period))
+                for period in ['hour', 'dayofweek']]
+    for label, raw, rollup in queries:
+        raw_time, expected = best_of(raw, args.repeat)
+        rollup_time, result = best_of(rollup, args.repeat)
+        np.testing.assert_allclose(result['mean'].to_numpy(np.float64), expected['mean'].to_numpy(np.float64),
+                                   rtol=1e-5)
+        print(f"{label:>22} {raw_time * 1e3:8.1f}ms {rollup_time * 1e3:8.2f}ms {raw_time / rollup_time:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
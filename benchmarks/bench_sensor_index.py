@@ -0,0 +1,58 @@
+# benchmarks/bench_sensor_index.py
+"""
+Compare sensor-selection lookups the way the static and mobile callbacks used
+to do them (isin over the whole frame, then a mask per selected sensor)
+against DataProcessor.get_sensor_readings on the per-sensor offsets table,
+for growing fleet sizes.
+
+Usage: python benchmarks/bench_sensor_index.py [--rows N] [--sensors N [N ...]] [--selected N]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from common import best_of, make_readings
+from utils.data_processing import DataProcessor
+
+
+def mask_lookup(df, selected):
+    """Previous callbacks: isin for the selection, then one mask per sensor"""
+    filtered = df[df['sensor_id'].isin(selected)]
+    return [filtered[filtered['sensor_id'] == sensor_id] for sensor_id in selected]
+
+
+def index_lookup(processor, selected):
+    processor.get_sensor_readings('static_readings', selected)
+    return [processor.get_sensor_readings('static_readings', [sensor_id]) for sensor_id in selected]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--selected', type=int, default=5, help="Sensors selected per lookup")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.selected} sensors selected\n")
+    print(f"{'sensors':>8} {'index build':>12} {'masks':>10} {'offsets':>10} {'speedup':>8}")
+    for sensors in args.sensors:
+        processor = DataProcessor()
+        processor.static_readings = make_readings(args.rows, sensors, days=30)
+        selected = list(range(0, sensors, max(1, sensors // args.selected)))[:args.selected]
+
+        build_start = time.perf_counter()
+        processor.get_sensor_counts('static_readings')
+        build_time = time.perf_counter() - build_start
+
+        mask_time, expected = best_of(lambda: mask_lookup(processor.static_readings, selected), args.repeat)
+        index_time, result = best_of(lambda: index_lookup(processor, selected), args.repeat)
+        for got, want in zip(result, expected):
+            pd.testing.assert_frame_equal(got, want)
+        print(f"{sensors:8} {build_time:11.2f}s {mask_time * 1e3:8.1f}ms {index_time * 1e3:8.2f}ms "
+              f"{mask_time / index_time:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
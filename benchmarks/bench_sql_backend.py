@@ -0,0 +1,76 @@
+# benchmarks/bench_sql_backend.py
+"""
+Compare the comparison callbacks' queries (range filter, per-sensor aggregates,
+hourly averages) in pandas against the embedded SQL backend.
+
+Usage: python benchmarks/bench_sql_backend.py [--rows N] [--sensors N] [--days N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from common import best_of, make_readings
+from utils.sql_backend import SQLBackend, DUCKDB_AVAILABLE
+
+
+def make_static_readings(rows, sensors, days):
+    """Cleaned static readings in time order, with categorical sensor ids as loaded"""
+    df = make_readings(rows, sensors, days).reset_index(drop=True)
+    df['sensor_id'] = pd.Categorical(df['sensor_id'].astype(str))
+    return df
+
+
+def pandas_queries(df, start, end):
+    selected = df[(df['timestamp'] >= start) & (df['timestamp'] <= end)]
+    aggregates = selected.groupby('sensor_id', observed=True)['value'].agg(
+        ['count', 'mean', 'std', 'min', 'max']
+    )
+    hourly = selected.groupby(pd.Grouper(key='timestamp', freq='1h'))['value'].agg(['count', 'mean', 'std'])
+    return aggregates, hourly
+
+
+def sql_queries(backend, start, end):
+    aggregates = backend.sensor_aggregates('static_readings', start, end)
+    hourly = backend.bucketed('static_readings', '1h', start, end)
+    return aggregates, hourly
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=200)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--window-days', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_static_readings(args.rows, args.sensors, args.days)
+    end = df['timestamp'].max()
+    start = end - pd.Timedelta(days=args.window_days)
+    print(f"{len(df):,} rows, {args.sensors} sensors, {args.days} days; querying the last {args.window_days} days")
+
+    pandas_time, (expected, _) = best_of(lambda: pandas_queries(df, start, end), args.repeat)
+    print(f"pandas:                 {pandas_time:8.3f} s")
+
+    engines = ['duckdb', 'sqlite'] if DUCKDB_AVAILABLE else ['sqlite']
+    with tempfile.TemporaryDirectory() as tmp:
+        for engine in engines:
+            backend = SQLBackend(os.path.join(tmp, f"readings.{engine}"), engine=engine)
+            load_start = time.perf_counter()
+            backend.write('static_readings', df, key={'rows': len(df)})
+            load_time = time.perf_counter() - load_start
+
+            query_time, (aggregates, _) = best_of(lambda: sql_queries(backend, start, end), args.repeat)
+            backend.close()
+
+            assert (aggregates['count'].to_numpy() == expected['count'].to_numpy()).all(), \
+                f"{engine} disagrees with pandas"
+            print(f"{engine + ':':<23} {query_time:8.3f} s  (table built in {load_time:.1f} s, "
+                  f"speedup {pandas_time / query_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
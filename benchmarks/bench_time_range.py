@@ -0,0 +1,55 @@
+# benchmarks/bench_time_range.py
+"""
+Compare DataProcessor.filter_time_range on a loaded readings dataset (binary
+searches over the time-sorted frame) against the boolean masks it used to
+build on every call, for date-picker sized windows.
+
+Usage: python benchmarks/bench_time_range.py [--rows N] [--sensors N] [--days N]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from common import best_of, make_readings
+from utils.data_processing import DataProcessor
+from utils.time_index import sort_by_time
+
+
+def mask_filter(df, start, end):
+    """The previous filter_time_range"""
+    return df[(df['timestamp'] >= start) & (df['timestamp'] <= end)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # In the order cleaning produces them (sensor, then time)
+    df = make_readings(args.rows, args.sensors, args.days, order='sensor')
+    print(f"{len(df):,} rows, {args.sensors} sensors, {args.days} days")
+
+    sort_start = time.perf_counter()
+    processor = DataProcessor()
+    processor.static_readings = sort_by_time(df, 'timestamp')
+    sort_time = time.perf_counter() - sort_start
+    readings = processor.static_readings
+    print(f"sorted by time once in {sort_time:.2f} s\n")
+
+    first = readings['timestamp'].iloc[0]
+    print(f"{'window':>8} {'mask':>10} {'slice':>10} {'speedup':>8}")
+    for window in ['1h', '1D', '7D', f'{args.days}D']:
+        start = first + pd.Timedelta(days=args.days // 2) - pd.Timedelta(window) / 2
+        end = start + pd.Timedelta(window)
+        mask_time, expected = best_of(lambda: mask_filter(readings, start, end), args.repeat)
+        slice_time, result = best_of(lambda: processor.filter_time_range(readings, start, end), args.repeat)
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{window:>8} {mask_time * 1e3:8.2f}ms {slice_time * 1e3:8.3f}ms {mask_time / slice_time:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_window_cache.py
+"""
+Simulate a date-range change on the comparison tab: several callbacks, run
+concurrently on threads as the Dash server does, each filtering both readings
+datasets to the new range and aggregating the values. Compares each callback
+filtering and aggregating on its own against DataProcessor.get_window /
+get_window_stats, which compute every window once and share it.
+
+Usage: python benchmarks/bench_window_cache.py [--rows N] [--callbacks N] [--changes N]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from common import START, make_readings
+from utils.data_processing import DataProcessor
+
+DATASETS = ['static_readings', 'mobile_readings']
+
+
+def uncached_callback(processor, start, end):
+    """Each callback filters and aggregates for itself"""
+    result = []
+    for name in DATASETS:
+        values = processor.get_readings(name, start, end)['value']
+        result.append((len(values), values.mean(), values.median(), values.std(), values.min(), values.max()))
+    return result
+
+
+def cached_callback(processor, start, end):
+    result = []
+    for name in DATASETS:
+        processor.get_window(name, start, end)
+        stats = processor.get_window_stats(name, start, end)
+        result.append(tuple(stats[key] for key in ['count', 'mean', 'median', 'std', 'min', 'max']))
+    return result
+
+
+def run(callback, processor, ranges, callbacks):
+    """Fire ``callbacks`` concurrent callbacks per date-range change"""
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(callbacks) as pool:
+        for start, end in ranges:
+            results = list(pool.map(lambda _: callback(processor, start, end), range(callbacks)))
+    return time.perf_counter() - start_time, results[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--sensors', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--callbacks', type=int, default=4, help="Callbacks listening to the date range")
+    parser.add_argument('--changes', type=int, default=10, help="Date-range changes simulated")
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    processor.static_readings = make_readings(args.rows, args.sensors, args.days, seed=0)
+    processor.mobile_readings = make_readings(args.rows, args.sensors, args.days, seed=1)
+    print(f"2 x {args.rows:,} rows, {args.callbacks} callbacks per change, {args.changes} changes\n")
+
+    ranges = [(str(START + pd.Timedelta(days=day)), str(START + pd.Timedelta(days=day + 7)))
+              for day in range(args.changes)]
+    uncached_time, expected = run(uncached_callback, processor, ranges, args.callbacks)
+    cached_time, result = run(cached_callback, processor, ranges, args.callbacks)
+    np.testing.assert_allclose(np.array(result, dtype=np.float64), np.array(expected, dtype=np.float64), rtol=1e-6)
+
+    print(f"{'uncached':>10} {uncached_time * 1e3 / args.changes:8.1f}ms per change")
+    print(f"{'cached':>10} {cached_time * 1e3 / args.changes:8.1f}ms per change "
+          f"({uncached_time / cached_time:.1f}x)")
+    print(f"window cache: {processor.window_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/common.py
+"""
+Helpers shared by the benchmark scripts. Importing this module puts app/ on
+sys.path, so the scripts can import from utils directly afterwards.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from utils.time_index import sort_by_time  # noqa: E402
+
+START = pd.Timestamp('2020-04-06')
+
+
+def make_readings(rows, sensors, days, seed=0, order='time'):
+    """
+    Readings of ``sensors`` sensors at uniformly random times over ``days`` days from START
+
+    Args:
+        order (str): 'time' for time_index.sort_by_time order (as loaded readings
+            are kept), 'sensor' for sensor then time (as cleaning produces them),
+            None to leave the rows unsorted
+    """
+    rng = np.random.default_rng(seed)
+    span = pd.Timedelta(days=days).value
+    df = pd.DataFrame({
+        'sensor_id': rng.integers(0, sensors, rows),
+        'timestamp': pd.to_datetime(rng.integers(START.value, START.value + span, rows)),
+        'value': rng.normal(20, 5, rows).astype(np.float32)
+    })
+    if order == 'time':
+        return sort_by_time(df, 'timestamp')
+    if order == 'sensor':
+        return df.sort_values(['sensor_id', 'timestamp'], ignore_index=True)
+    return df
+
+
+def best_of(func, repeat):
+    """Fastest of ``repeat`` runs of func, in seconds, and its last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
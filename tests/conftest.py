@@ -0,0 +1,106 @@
+# tests/conftest.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from utils.data_processing import DataProcessor  # noqa: E402
+from utils.time_index import sort_by_time  # noqa: E402
+
+
+def make_static_readings(rows=2000, sensors=10, seed=0):
+    """Raw static readings as they appear in StaticSensorReadings.csv, in time order"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp('2020-04-06') + pd.to_timedelta(np.sort(rng.integers(0, 86400, rows)), unit='s')
+    values = rng.normal(15, 3, rows).round(2)
+    # A few out-of-range readings, spikes and outliers for the cleaning to catch
+    values[rng.choice(rows, rows // 100, replace=False)] = -1.0
+    values[rng.choice(rows, rows // 100, replace=False)] = rng.uniform(40, 99, rows // 100).round(2)
+    return pd.DataFrame({
+        'Timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        'Sensor-id': rng.integers(1, sensors + 1, rows),
+        'Value': values,
+        'Units': 'cpm'
+    })
+
+
+def make_mobile_readings(rows=2000, sensors=10, seed=1):
+    """Raw mobile readings as they appear in MobileSensorReadings.csv, in time order"""
+    static = make_static_readings(rows, sensors, seed)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Timestamp': static['Timestamp'],
+        'Sensor-id': static['Sensor-id'],
+        'Long': (-119.9 + rng.integers(0, 2000, rows) / 1e4).round(5),
+        'Lat': (rng.integers(0, 2000, rows) / 1e4).round(5),
+        'Value': static['Value'],
+        'Units': 'cpm',
+        ' User-id': 'user' + static['Sensor-id'].astype(str)
+    })
+
+
+def make_readings(rows=20000, sensors=8, days=3, seed=0):
+    """Cleaned readings as they are held in memory: standardized columns, float32 values, time-sorted"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2020-04-06').value
+    df = pd.DataFrame({
+        'sensor_id': rng.integers(1, sensors + 1, rows),
+        'timestamp': pd.to_datetime(rng.integers(start, start + pd.Timedelta(days=days).value, rows)),
+        'value': rng.gamma(4, 4, rows).astype(np.float32)
+    })
+    return sort_by_time(df, 'timestamp')
+
+
+def reference_clean(raw):
+    """The original pandas cleaning pipeline: range check, per-sensor rate of change, IQR bounds"""
+    cleaned = raw[(raw['value'] >= DataProcessor.MIN_VALID_VALUE) & (raw['value'] <= DataProcessor.MAX_VALID_VALUE)]
+    cleaned = cleaned.sort_values(['sensor_id', 'timestamp'])
+    change = cleaned.groupby('sensor_id', observed=True)['value'].diff()
+    cleaned = cleaned[change.abs() <= DataProcessor.MAX_RATE_OF_CHANGE]
+    q1, q3 = cleaned['value'].quantile(0.25), cleaned['value'].quantile(0.75)
+    iqr = q3 - q1
+    return cleaned[(cleaned['value'] >= q1 - 1.5 * iqr) & (cleaned['value'] <= q3 + 1.5 * iqr)]
+
+
+def read_raw(path):
+    """A readings file as the original pipeline read it: default dtypes, standardized names"""
+    raw = pd.read_csv(path)
+    raw.columns = raw.columns.str.strip()
+    raw = raw.rename(columns=DataProcessor.COLUMN_MAP)
+    raw['timestamp'] = pd.to_datetime(raw['timestamp'])
+    return raw
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Directory with small sensor location and readings files"""
+    pd.DataFrame({
+        'Sensor-id': np.arange(1, 11),
+        'Lat': np.linspace(0.0, 0.2, 10),
+        'Long': np.linspace(-119.9, -119.7, 10)
+    }).to_csv(tmp_path / 'StaticSensorLocations.csv', index=False)
+    make_static_readings().to_csv(tmp_path / 'StaticSensorReadings.csv', index=False)
+    make_mobile_readings().to_csv(tmp_path / 'MobileSensorReadings.csv', index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def new_processor(data_dir):
+    """Factory of DataProcessors reading their sources and writing their caches under data_dir"""
+    def new_processor():
+        processor = DataProcessor()
+        processor.STATIC_SENSORS_PATH = str(data_dir / 'StaticSensorLocations.csv')
+        processor.STATIC_READINGS_PATH = str(data_dir / 'StaticSensorReadings.csv')
+        processor.MOBILE_READINGS_PATH = str(data_dir / 'MobileSensorReadings.csv')
+        processor.SHAPEFILE_PATH = str(data_dir / 'missing.shp')
+        processor.CACHE_DIR = str(data_dir / '.cache')
+        return processor
+    return new_processor
+
+
+@pytest.fixture
+def processor(new_processor):
+    return new_processor()
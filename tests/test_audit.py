@@ -0,0 +1,113 @@
+# tests/test_audit.py
+import logging
+
+import pandas as pd
+import pytest
+
+from utils import audit
+from utils.audit import LOGGER_NAME, REASON_LABELS, CleaningAudit, RateLimitFilter, configure_logging
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(audit.time, 'monotonic', clock)
+    return clock
+
+
+def record(msg, *args, name='radwatch.test'):
+    return logging.makeLogRecord({'name': name, 'msg': msg, 'args': args, 'levelno': logging.WARNING})
+
+
+def test_rate_limit_passes_a_burst_per_template_and_window(clock):
+    limit = RateLimitFilter(interval=10.0, burst=3)
+    passed = [limit.filter(record("Sensor %s missing", sensor)) for sensor in range(5)]
+    assert passed == [True, True, True, False, False]
+    # Other templates and other loggers have their own budget
+    assert limit.filter(record("Sensor %s stale", 1))
+    assert limit.filter(record("Sensor %s missing", 1, name='radwatch.other'))
+
+    clock.now += 9.9
+    assert not limit.filter(record("Sensor %s missing", 6))
+    clock.now += 0.1
+    resumed = record("Sensor %s missing", 7)
+    assert limit.filter(resumed)
+    assert resumed.getMessage() == "Sensor 7 missing (3 similar messages suppressed)"
+    # Nothing was suppressed in the new window yet
+    following = record("Sensor %s missing", 8)
+    assert limit.filter(following) and following.getMessage() == "Sensor 8 missing"
+
+
+@pytest.fixture
+def app_logger():
+    yield
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+
+def test_configured_logging_applies_level_and_rate_limit(app_logger, clock, capsys):
+    configure_logging('info', interval=10.0, burst=2)
+    logger = audit.get_logger('test')
+    logger.debug("Not shown")
+    for sensor in range(5):
+        logger.info("Sensor %s reconnected", sensor)
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("INFO radwatch.test: Sensor 0 reconnected")
+
+
+def test_counts_follow_provenance(processor):
+    processor.load_data(use_cache=False)
+    counts = processor.audit.counts('static_readings')
+    expected = processor.get_provenance('static_readings').reason_counts()
+    pd.testing.assert_frame_equal(counts, expected)
+    assert list(counts.columns) == REASON_LABELS
+    assert counts['kept'].sum() == len(processor.static_readings)
+
+    totals = processor.audit.counts()
+    assert set(totals.index) == {'static_readings', 'mobile_readings'}
+    assert totals.loc['static_readings'].to_dict() == counts.sum().to_dict()
+    assert processor.audit.counts('static_readings', 3) == {label: int(value)
+                                                            for label, value in counts.loc[3].items()}
+    assert processor.audit.counts('static_readings', 'no such sensor') == {label: 0 for label in REASON_LABELS}
+    loaded = processor.audit.events('loaded')
+    assert {event['dataset'] for event in loaded} == {'static_readings', 'mobile_readings'}
+    assert processor.audit.events('startup', limit=1)[0]['total'] > 0
+
+
+def test_appended_batch_counts_only_new_rows(processor):
+    processor.load_data(use_cache=False)
+    before = processor.audit.counts('static_readings').sum()
+    last_value = processor.static_readings['value'].iloc[-1]
+    with open(processor.STATIC_READINGS_PATH, 'a') as f:
+        f.write('2020-04-07 00:00:00,1,%s,cpm\n' % last_value)
+        f.write('2020-04-07 00:00:05,1,-1.0,cpm\n')
+        f.write('2020-04-07 00:00:09,1,1000.5,cpm\n')
+    processor.ingest_new_rows()
+
+    event = processor.audit.events('appended')[-1]
+    assert event['dataset'] == 'static_readings' and event['rows'] == 3
+    assert event['kept'] == 1 and event['out_of_range'] == 2
+    assert sum(event[label] for label in REASON_LABELS) == 3
+    after = processor.audit.counts('static_readings').sum()
+    assert (after - before).to_dict() == {label: event[label] for label in REASON_LABELS}
+
+
+def test_event_log_is_bounded():
+    log = CleaningAudit(max_events=3)
+    for batch in range(5):
+        log.record_event('appended', dataset='static_readings', rows=batch)
+    log.record_event('loaded', dataset='mobile_readings')
+    assert [event['rows'] for event in log.events('appended')] == [3, 4]
+    assert [event['event'] for event in log.events(limit=2)] == ['appended', 'loaded']
@@ -0,0 +1,45 @@
+# tests/test_cleaning.py
+import numpy as np
+import pytest
+
+from conftest import make_static_readings, reference_clean
+from utils.cleaning import clean_readings
+from utils.provenance import KEPT, OUT_OF_RANGE
+from utils.data_processing import DataProcessor
+
+LIMITS = (DataProcessor.MIN_VALID_VALUE, DataProcessor.MAX_VALID_VALUE, DataProcessor.MAX_RATE_OF_CHANGE,
+          DataProcessor.IQR_MULTIPLIER)
+
+
+@pytest.fixture
+def readings():
+    raw = make_static_readings(rows=5000, sensors=20)
+    raw['timestamp'] = raw['Timestamp'].astype('datetime64[ns]')
+    return raw.rename(columns={'Sensor-id': 'sensor_id', 'Value': 'value'})
+
+
+def clean(readings, **kwargs):
+    return clean_readings(readings['sensor_id'], readings['timestamp'], readings['value'], *LIMITS, **kwargs)
+
+
+@pytest.mark.parametrize('sensor_ids', ['int', 'category', 'missing'])
+def test_clean_readings_matches_pandas_pipeline(readings, sensor_ids):
+    if sensor_ids == 'category':
+        readings['sensor_id'] = ('S' + readings['sensor_id'].astype(str)).astype('category')
+    elif sensor_ids == 'missing':
+        readings['sensor_id'] = readings['sensor_id'].astype(float)
+        readings.loc[readings.index[::50], 'sensor_id'] = np.nan
+    result = clean(readings)
+    expected = reference_clean(readings)
+
+    # Same rows, in the same sensor/time order
+    np.testing.assert_array_equal(result['kept'], expected.index.to_numpy())
+    assert (result['reasons'] == KEPT).sum() == len(expected)
+    assert (result['reasons'][readings['value'] < 0] == OUT_OF_RANGE).all()
+
+
+def test_clean_radiation_data_matches_pandas_pipeline(readings):
+    cleaned = DataProcessor().clean_radiation_data(readings)
+    expected = reference_clean(readings)
+    assert cleaned.index.equals(expected.index)
+    assert cleaned['value'].equals(expected['value'])
@@ -0,0 +1,108 @@
+# tests/test_geometry.py
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from shapely.geometry import Point
+
+from conftest import make_readings
+from utils.data_processing import DataProcessor
+from utils.geometry import NeighborhoodGeometry, clear_geometry, get_geometry
+
+
+def make_neighborhoods(side=3):
+    """Grid of unit squares sharing their edges, like adjoining neighborhoods"""
+    cells = [shapely.box(i, j, i + 1, j + 1) for i in range(side) for j in range(side)]
+    return gpd.GeoDataFrame({'Nbrhood': [f'N{i}' for i in range(len(cells))]}, geometry=cells, crs='EPSG:4326')
+
+
+def loop_locate(gdf, lons, lats):
+    """Point.within against every polygon, first match wins"""
+    located = []
+    for lon, lat in zip(lons, lats):
+        matches = [i for i, geom in enumerate(gdf.geometry)
+                   if not (np.isnan(lon) or np.isnan(lat)) and Point(lon, lat).within(geom)]
+        located.append(matches[0] if matches else -1)
+    return np.array(located)
+
+
+@pytest.fixture
+def shapefile(tmp_path):
+    path = str(tmp_path / 'neighborhoods.shp')
+    make_neighborhoods().to_crs('EPSG:3857').to_file(path)
+    yield path
+    clear_geometry()
+
+
+def test_registry_loads_each_shapefile_once(shapefile):
+    geometry = get_geometry(shapefile)
+    assert geometry is get_geometry(shapefile)
+    assert geometry.gdf.crs == 'EPSG:4326'
+    assert geometry.names == [f'N{i}' for i in range(9)]
+    clear_geometry()
+    assert get_geometry(shapefile) is not geometry
+
+
+def test_missing_shapefile_is_not_registered(tmp_path):
+    assert get_geometry(str(tmp_path / 'missing.shp')) is None
+    assert get_geometry(str(tmp_path / 'missing.shp')) is None
+
+
+def test_locate_matches_point_within_loop():
+    gdf = make_neighborhoods()
+    rng = np.random.default_rng(0)
+    lons, lats = rng.uniform(-0.5, 3.5, 500), rng.uniform(-0.5, 3.5, 500)
+    # Repeated points, missing coordinates and points on shared edges and corners
+    lons = np.concatenate([lons, lons[:50], [np.nan, 1.0, 1.0, 0.5, 2.0, 3.0, 1.5]])
+    lats = np.concatenate([lats, lats[:50], [0.5, np.nan, 1.0, 1.0, 2.5, 3.0, 1.5]])
+    geometry = NeighborhoodGeometry(gdf)
+    expected = loop_locate(gdf, lons, lats)
+    np.testing.assert_array_equal(geometry.locate(lons, lats), expected)
+    np.testing.assert_array_equal(geometry.covered(lons, lats), np.unique(expected[expected >= 0]))
+
+
+def test_boundary_points_are_outside():
+    geometry = NeighborhoodGeometry(make_neighborhoods())
+    # On an edge between two cells, on a corner of four and on the outer boundary
+    lons, lats = [1.0, 1.0, 0.0], [0.5, 1.0, 0.5]
+    np.testing.assert_array_equal(geometry.locate(lons, lats), [-1, -1, -1])
+    assert len(geometry.covered(lons, lats)) == 0
+
+
+def loop_coverage(gdf, static_sensors, static_readings, mobile_readings):
+    """Names of the neighborhoods holding a reading, testing every reading against every polygon"""
+    covered = set()
+    located = static_sensors.merge(static_readings, on='sensor_id')
+    for readings in (located, mobile_readings):
+        for _, reading in readings.iterrows():
+            point = Point(reading['longitude'], reading['latitude'])
+            for idx, neighborhood in gdf.iterrows():
+                if point.within(neighborhood.geometry):
+                    covered.add(neighborhood.get('Nbrhood', str(idx)))
+    return covered
+
+
+def test_coverage_stats_match_point_within_loop(tmp_path):
+    gdf = make_neighborhoods(side=4)
+    processor = DataProcessor()
+    processor.SHAPEFILE_PATH = str(tmp_path / 'missing.shp')
+    processor.gdf = gdf
+    # Inside cells, on a shared edge, outside the grid, and one sensor without readings
+    static_sensors = pd.DataFrame({'sensor_id': [1, 2, 3, 4, 5],
+                                   'longitude': [0.5, 2.5, 1.0, 5.0, 3.5],
+                                   'latitude': [0.5, 1.5, 0.5, 5.0, 3.5]})
+    processor.static_readings = make_readings(rows=500, sensors=4)
+    rng = np.random.default_rng(1)
+    # Mobile readings confined to the lower half of the grid, plus points on edges and corners
+    mobile = pd.DataFrame({'sensor_id': 1,
+                           'longitude': np.concatenate([rng.uniform(0, 4, 300), [2.0, 3.0, np.nan]]),
+                           'latitude': np.concatenate([rng.uniform(0, 1.9, 300), [3.5, 3.0, 3.5]])})
+
+    stats = processor.calculate_coverage_stats(static_sensors, mobile)
+    expected = loop_coverage(gdf, static_sensors, processor.static_readings, mobile)
+    assert 0 < len(expected) < len(gdf)
+    assert stats['covered_neighborhoods'] == len(expected)
+    assert stats['uncovered_neighborhoods'] == len(gdf) - len(expected)
+    assert stats['coverage_percentage'] == len(expected) / len(gdf) * 100
+    assert stats['neighborhoods_without_data'] == sorted(set(gdf['Nbrhood']) - expected)
@@ -0,0 +1,93 @@
+# tests/test_hll.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils import time_index
+from utils.data_processing import DataProcessor
+from utils.distinct_cube import DistinctCube
+from utils.hll import HyperLogLog
+
+# Estimates are checked against a few standard errors, so the seeded tests do not flake
+TOLERANCE = 4
+
+
+def mobile_readings(rows=200_000, sensors=3000, users=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    readings = make_readings(rows, sensors=sensors, days=5, seed=seed)
+    readings['user_id'] = pd.Categorical(rng.integers(0, users, rows).astype(str))
+    readings['latitude'] = (rng.integers(0, 1000, rows) / 1e4).astype(np.float32)
+    readings['longitude'] = (-119.9 + rng.integers(0, 1000, rows) / 1e4).astype(np.float32)
+    return readings
+
+
+@pytest.mark.parametrize('distinct', [1, 10, 100])
+def test_small_counts_are_exact(distinct):
+    counter = HyperLogLog().update(np.arange(distinct).repeat(3))
+    assert counter.count() == distinct
+
+
+@pytest.mark.parametrize('precision', [10, 12, 14])
+@pytest.mark.parametrize('distinct', [1000, 10_000, 300_000])
+def test_count_within_stated_error(precision, distinct):
+    values = np.random.default_rng(precision).integers(0, 2 ** 62, distinct)
+    counter = HyperLogLog(precision).update(values)
+    exact = len(np.unique(values))
+    assert abs(counter.count() / exact - 1) <= TOLERANCE * counter.relative_error
+
+
+def test_merge_counts_the_union():
+    values = np.arange(200_000)
+    parts = [HyperLogLog().update(part) for part in (values[:150_000], values[50_000:])]
+    merged = HyperLogLog().merge(parts[0]).merge(parts[1])
+    assert abs(merged.count() / len(values) - 1) <= TOLERANCE * merged.relative_error
+    np.testing.assert_array_equal(merged.registers, HyperLogLog().update(values).registers)
+
+
+def test_missing_values_are_not_counted():
+    assert HyperLogLog().update(pd.Series([1.0, np.nan, 2.0, np.nan])).count() == 2
+
+
+@pytest.mark.parametrize('start,end', [(None, None), ('2020-04-06 10:07', '2020-04-09 03:41')])
+def test_window_counts_within_stated_error(start, end):
+    processor = DataProcessor()
+    processor.mobile_readings = readings = mobile_readings()
+    if start is not None:
+        readings = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    exact = processor.get_distinct_counts('mobile_readings', start, end, exact=True)
+    counts = processor.get_distinct_counts('mobile_readings', start, end, exact=False)
+    assert exact['relative_error'] == 0.0 and counts['relative_error'] > 0.0
+    assert exact['sensors'] == readings['sensor_id'].nunique()
+    assert exact['users'] == readings['user_id'].nunique()
+    assert exact['locations'] == len(readings[['latitude', 'longitude']].round(4).drop_duplicates())
+    for key in ('sensors', 'users', 'locations'):
+        assert abs(counts[key] / exact[key] - 1) <= TOLERANCE * counts['relative_error'], key
+
+
+def test_small_windows_are_counted_exactly():
+    processor = DataProcessor()
+    processor.mobile_readings = readings = mobile_readings()
+    start, end = '2020-04-07 01:00', '2020-04-07 03:00'
+    window = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    assert len(window) <= DataProcessor.DISTINCT_EXACT_ROWS
+    counts = processor.get_distinct_counts('mobile_readings', start, end)
+    assert counts['relative_error'] == 0.0
+    assert counts['users'] == window['user_id'].nunique()
+
+
+@pytest.mark.parametrize('rows,dense_fraction', [(50_000, 0.5), (500_000, 1.01)])
+def test_cube_registers_match_the_window_rows(rows, dense_fraction):
+    readings = time_index.sort_by_time(mobile_readings(rows=rows), 'timestamp')
+    cube = DistinctCube(readings, 'timestamp', {'users': readings[['user_id']]})
+    hourly_ids, hourly = cube.levels['users'][0]
+    # Sparse hours take a fraction of a dense row each; full hours no more than one
+    assert hourly.nbytes < dense_fraction * (len(hourly_ids) << cube.precision)
+    index, rank = cube._rows['users']
+    times = readings['timestamp']
+    for start, end in [('2020-04-06 10:07', '2020-04-09 03:41'), ('2020-04-07', '2020-04-08 23:59:59'),
+                       ('2020-04-08 05:00', '2020-04-08 05:59:59')]:
+        inside = ((times >= start) & (times <= end)).to_numpy()
+        expected = np.zeros(1 << cube.precision, dtype=np.uint8)
+        np.maximum.at(expected, index[inside], rank[inside])
+        np.testing.assert_array_equal(cube.sketch(start, end)['users'].registers, expected)
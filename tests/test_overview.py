@@ -0,0 +1,47 @@
+# tests/test_overview.py
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def main(monkeypatch, data_dir):
+    """The app module, imported with lazy loading and no data of its own"""
+    monkeypatch.chdir(data_dir)
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--lazy', '--no-cache'])
+    main = sys.modules.get('main') or importlib.import_module('main')
+    return main
+
+
+@pytest.fixture
+def lazy_processor(new_processor):
+    # A first, eager load writes the snapshot cache the lazy one takes its summaries from
+    new_processor().load_data()
+    processor = new_processor()
+    processor.load_data(lazy=True)
+    return processor
+
+
+def test_first_overview_render_leaves_mobile_readings_unloaded(main, monkeypatch, lazy_processor, processor):
+    monkeypatch.setattr(main, 'data_processor', lazy_processor)
+    layout, _ = main.render_tab_content('tab-overview')
+    assert 'Error' not in str(layout)
+    fig = main.update_map_layers(['static', 'mobile', 'boundaries', 'heatmap'])
+    assert not lazy_processor.is_loaded('mobile_readings')
+
+    # Mobile sensors are drawn at their latest reading
+    processor.load_data()
+    mobile = processor.mobile_readings
+    latest = mobile.sort_values('timestamp').groupby('sensor_id', observed=True).last()
+    trace = next(trace for trace in fig.data if trace.name == 'Mobile Sensors')
+    np.testing.assert_allclose(trace.lat, latest['latitude'])
+    np.testing.assert_allclose(trace.lon, latest['longitude'])
+    assert list(trace.text) == list(latest['user_id'])
+
+    # The heatmap averages each static sensor's readings
+    heatmap = next(trace for trace in fig.data if trace.name == 'Radiation Levels')
+    means = processor.static_readings.groupby('sensor_id', observed=True)['value'].mean()
+    located = processor.static_sensors.set_index('sensor_id').join(means, how='inner')
+    np.testing.assert_allclose(np.sort(heatmap.z), np.sort(located['value']), rtol=1e-5)
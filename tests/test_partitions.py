@@ -0,0 +1,136 @@
+# tests/test_partitions.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils.partitions import NO_TIMESTAMP, PartitionStore
+
+pytest.importorskip('pyarrow')
+
+SORT_BY = ['timestamp', 'sensor_id']
+
+
+def pandas_read(readings, start, end):
+    window = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    return window.sort_values(SORT_BY, kind='stable').reset_index(drop=True)
+
+
+@pytest.fixture
+def readings():
+    # Stored shuffled so read() has to put every day back in order
+    return make_readings(rows=6000, days=4).sample(frac=1, random_state=0)
+
+
+@pytest.fixture
+def store(tmp_path, readings):
+    store = PartitionStore(str(tmp_path), sort_by=SORT_BY)
+    store.write('static_readings', readings, {'version': 1})
+    return store
+
+
+def test_partitions_pruned_to_overlapping_days(store):
+    assert store.partitions('static_readings') == ['2020-04-06', '2020-04-07', '2020-04-08', '2020-04-09']
+    assert store.partitions('static_readings', pd.Timestamp('2020-04-07 12:00'),
+                            pd.Timestamp('2020-04-08 23:59')) == ['2020-04-07', '2020-04-08']
+    assert store.partitions('static_readings', pd.Timestamp('2020-04-09'), pd.Timestamp('2020-04-09')) == ['2020-04-09']
+    assert store.partitions('static_readings', pd.Timestamp('2021-01-01'), pd.Timestamp('2021-01-02')) == []
+    assert store.partitions('mobile_readings') == []
+
+
+@pytest.mark.parametrize('start,end', [
+    ('2020-04-06 05:13:07', '2020-04-08 19:41:55'),
+    ('2020-04-07 10:00', '2020-04-07 11:00'),
+    ('2020-04-05', '2020-04-12'),
+])
+def test_read_filters_boundary_days(store, readings, start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    result = store.read('static_readings', start, end).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, pandas_read(readings, start, end))
+
+
+def test_read_of_empty_range_keeps_columns(store, readings):
+    result = store.read('static_readings', pd.Timestamp('2021-01-01'), pd.Timestamp('2021-01-02'))
+    assert len(result) == 0 and list(result.columns) == list(readings.columns)
+    assert store.read('mobile_readings') is None
+
+
+def test_append_rewrites_only_touched_days(store, readings, tmp_path):
+    def file_id(day):
+        stat = (tmp_path / 'static_readings' / f'day={day}.parquet').stat()
+        return stat.st_ino, stat.st_mtime_ns
+
+    files = {day: file_id(day) for day in store.partitions('static_readings')}
+    new_rows = make_readings(rows=300, days=1, seed=5)
+    new_rows['timestamp'] += pd.Timedelta(days=3)
+    missing = new_rows.iloc[:2].assign(timestamp=pd.NaT)
+    store.append('static_readings', pd.concat([new_rows, missing]))
+
+    assert store.partitions('static_readings')[-1] == NO_TIMESTAMP
+    for day, before in files.items():
+        assert (file_id(day) != before) == (day == '2020-04-09')
+    start, end = pd.Timestamp('2020-04-08 12:00'), pd.Timestamp('2020-04-09 23:59')
+    expected = pandas_read(pd.concat([readings, new_rows]), start, end)
+    pd.testing.assert_frame_equal(store.read('static_readings', start, end).reset_index(drop=True), expected)
+    # Rows without a timestamp only come back from unbounded reads
+    assert store.read('static_readings')['timestamp'].isna().sum() == 2
+
+
+def test_cache_evicts_least_recently_used_days(tmp_path, readings):
+    store = PartitionStore(str(tmp_path), sort_by=SORT_BY)
+    store.write('static_readings', readings, {'version': 1})
+    days = store.partitions('static_readings')
+    for day in days[:2]:
+        store.read('static_readings', pd.Timestamp(day), pd.Timestamp(day) + pd.Timedelta(hours=23))
+    two_days = store.cached_bytes
+
+    # Room for about two partitions: reading a third drops the least recently used one
+    store.max_bytes = int(two_days * 1.1)
+    store.read('static_readings', pd.Timestamp(days[0]), pd.Timestamp(days[0]) + pd.Timedelta(hours=1))
+    store.read('static_readings', pd.Timestamp(days[2]), pd.Timestamp(days[2]) + pd.Timedelta(hours=1))
+    assert [day for _, day in store._cached] == [days[0], days[2]]
+    assert store.cached_bytes <= store.max_bytes
+
+    store.evict()
+    assert store.cached_bytes == 0 and not store._cached
+    # Evicted days are read back from disk
+    start, end = pd.Timestamp(days[1]), pd.Timestamp(days[1]) + pd.Timedelta(hours=6)
+    pd.testing.assert_frame_equal(store.read('static_readings', start, end).reset_index(drop=True),
+                                  pandas_read(readings, start, end))
+
+
+def test_rewrite_for_new_key_drops_stale_days(store, readings):
+    assert store.is_current('static_readings', {'version': 1})
+    first_day = readings[readings['timestamp'] < '2020-04-07']
+    store.write('static_readings', first_day, {'version': 2})
+    assert not store.is_current('static_readings', {'version': 1})
+    assert store.partitions('static_readings') == ['2020-04-06']
+    assert np.array_equal(np.sort(store.read('static_readings')['value'].to_numpy()),
+                          np.sort(first_day['value'].to_numpy()))
+
+
+def test_processor_keeps_stored_readings_out_of_memory(new_processor, data_dir):
+    reference = new_processor()
+    reference.load_data()
+    processor = new_processor()
+    processor.PARTITION_DIR = str(data_dir / 'partitions')
+    processor.load_data(partitioned=True)
+
+    pd.testing.assert_frame_equal(processor.get_readings('static_readings').reset_index(drop=True),
+                                  reference.static_readings.reset_index(drop=True))
+    start, end = '2020-04-06 06:00:00', '2020-04-06 18:00:00'
+    pd.testing.assert_frame_equal(processor.get_readings('mobile_readings', start, end).reset_index(drop=True),
+                                  reference.get_readings('mobile_readings', start, end).reset_index(drop=True))
+    pd.testing.assert_frame_equal(processor.get_sensor_readings('static_readings', [2, 1]).reset_index(drop=True),
+                                  reference.get_sensor_readings('static_readings', [2, 1]).reset_index(drop=True))
+    pd.testing.assert_series_equal(processor.get_sensor_counts('mobile_readings'),
+                                   reference.get_sensor_counts('mobile_readings'), check_index_type=False)
+    assert processor.get_provenance('static_readings') is not None
+    processor.warm_up()
+
+    with open(processor.STATIC_READINGS_PATH, 'a') as f:
+        f.write('2020-04-07 00:00:00,1,%s,cpm\n' % reference.static_readings['value'].iloc[-1])
+        f.write('2020-04-07 00:00:05,1,%s,cpm\n' % reference.static_readings['value'].iloc[-1])
+    appended = processor.ingest_new_rows()['static_readings']
+    assert processor.get_summary('static_readings')['rows'] == len(reference.static_readings) + appended
+    assert not processor.is_loaded('static_readings') and not processor.is_loaded('mobile_readings')
@@ -0,0 +1,96 @@
+# tests/test_provenance.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import read_raw, reference_clean
+from utils.data_processing import DataProcessor
+from utils.provenance import (KEPT, IQR_OUTLIER, NO_PREVIOUS_READING, OUT_OF_RANGE, RATE_OF_CHANGE,
+                              REMOVAL_REASONS)
+
+# Rows given an out-of-range value, and one given a spike the rate-of-change check removes
+OUT_OF_RANGE_ROWS = [10, 500]
+SPIKE_ROW = 700
+
+
+def expected_reasons(raw):
+    """Removal reason of every raw row, following the stages of the frame-based pipeline"""
+    reasons = np.full(len(raw), KEPT, dtype=np.uint8)
+    in_range = (raw['value'] >= DataProcessor.MIN_VALID_VALUE) & (raw['value'] <= DataProcessor.MAX_VALID_VALUE)
+    reasons[~in_range.to_numpy()] = OUT_OF_RANGE
+    change = raw[in_range].sort_values(['sensor_id', 'timestamp']).groupby('sensor_id')['value'].diff()
+    reasons[change.index[change.isna()]] = NO_PREVIOUS_READING
+    reasons[change.index[change.abs() > DataProcessor.MAX_RATE_OF_CHANGE]] = RATE_OF_CHANGE
+    spike_free = change.index[change.abs() <= DataProcessor.MAX_RATE_OF_CHANGE]
+    reasons[spike_free.difference(reference_clean(raw).index)] = IQR_OUTLIER
+    return reasons
+
+
+@pytest.fixture
+def raw(processor):
+    source = pd.read_csv(processor.STATIC_READINGS_PATH)
+    source.loc[OUT_OF_RANGE_ROWS, 'Value'] = [-5.0, 5000.0]
+    source.loc[SPIKE_ROW, 'Value'] = 99.0
+    source.to_csv(processor.STATIC_READINGS_PATH, index=False)
+    return read_raw(processor.STATIC_READINGS_PATH)
+
+
+def test_reasons_match_the_cleaning_stages(processor, raw):
+    processor.load_data(use_cache=False)
+    reasons = processor.get_provenance('static_readings').reasons
+    expected = expected_reasons(raw)
+    assert set(np.unique(expected)) == set(REMOVAL_REASONS)
+    np.testing.assert_array_equal(reasons, expected)
+    assert expected[SPIKE_ROW] == RATE_OF_CHANGE
+
+
+def test_chunked_load_records_every_row(processor, raw):
+    processor.load_data(use_cache=False, chunk_size=700)
+    reasons = processor.get_provenance('static_readings').reasons
+    assert len(reasons) == len(raw)
+    np.testing.assert_array_equal(np.flatnonzero(reasons == KEPT), np.sort(processor.static_readings.index))
+    assert (reasons[OUT_OF_RANGE_ROWS] == OUT_OF_RANGE).all() and reasons[SPIKE_ROW] == RATE_OF_CHANGE
+
+
+def test_summary_matches_raw_and_cleaned_readings(processor, raw):
+    processor.load_data(use_cache=False)
+    provenance = processor.get_provenance('static_readings')
+    cleaned = processor.static_readings
+    for sensor_id in (None, 3):
+        raw_values = raw['value'] if sensor_id is None else raw.loc[raw['sensor_id'] == sensor_id, 'value']
+        clean_values = cleaned['value'] if sensor_id is None else \
+            cleaned.loc[cleaned['sensor_id'] == sensor_id, 'value']
+        summary = provenance.summary(sensor_id)
+        for stage, values in (('raw', raw_values), ('clean', clean_values.astype(np.float64))):
+            assert summary[stage]['rows'] == len(values)
+            np.testing.assert_allclose([summary[stage][key] for key in ('mean', 'std', 'min', 'max')],
+                                       [values.mean(), values.std(), values.min(), values.max()], rtol=1e-6)
+        assert sum(summary['removed'].values()) == len(raw_values) - len(clean_values)
+    assert provenance.summary('no such sensor') is None
+
+    counts = provenance.reason_counts()
+    assert counts.to_numpy().sum() == len(raw)
+    assert counts['kept'].sum() == len(cleaned)
+
+
+def test_provenance_survives_the_snapshot_cache(new_processor, raw):
+    built = new_processor()
+    built.load_data()
+    cached = new_processor()
+    cached.load_data()
+    np.testing.assert_array_equal(cached.get_provenance('static_readings').reasons,
+                                  built.get_provenance('static_readings').reasons)
+    assert cached.get_provenance('static_readings').summary(3) == built.get_provenance('static_readings').summary(3)
+
+
+def test_appended_rows_extend_the_record(processor, raw):
+    processor.load_data(use_cache=False)
+    last_value = processor.static_readings['value'].iloc[-1]
+    with open(processor.STATIC_READINGS_PATH, 'a') as f:
+        f.write('2020-04-07 00:00:00,1,%s,cpm\n' % last_value)
+        f.write('2020-04-07 00:00:05,1,-1.0,cpm\n')
+    processor.ingest_new_rows()
+    provenance = processor.get_provenance('static_readings')
+    assert provenance.size == len(raw) + 2
+    assert provenance.reasons[-2] == KEPT and provenance.reasons[-1] == OUT_OF_RANGE
+    assert provenance.summary(1)['raw']['rows'] == (raw['sensor_id'] == 1).sum() + 2
@@ -0,0 +1,113 @@
+# tests/test_quantiles.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils import time_index
+from utils.data_processing import DataProcessor
+from utils.quantile_cube import QuantileCube
+from utils.quantiles import ExactQuantileSummary, KLLSketch
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_error(values, estimate, q):
+    """Distance of q from the range of ranks the estimate occupies"""
+    below = (values < estimate).mean()
+    at_or_below = (values <= estimate).mean()
+    return max(0.0, below - q, q - at_or_below)
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).gamma(3, 5, 100_000)
+
+
+def test_sketch_is_exact_until_it_compacts(values):
+    sketch = KLLSketch(k=200, seed=0).update(values[:200])
+    assert sketch.exact and sketch.rank_error == 0.0
+    for q in QUANTILES:
+        assert sketch.quantile(q) == pd.Series(values[:200]).quantile(q)
+    assert not sketch.update(values[200:201]).exact
+
+
+@pytest.mark.parametrize('k', [50, 200])
+def test_rank_error_within_bound(values, k):
+    sketch = KLLSketch(k, seed=0)
+    for batch in np.array_split(values, 37):
+        sketch.update(batch)
+    assert sketch.count == len(values)
+    for q in QUANTILES:
+        assert rank_error(values, sketch.quantile(q), q) <= sketch.rank_error
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_rank_error_within_bound_after_merges(values, compact):
+    sketches = [KLLSketch(200, seed=i).update(part) for i, part in enumerate(np.array_split(values, 50))]
+    merged = KLLSketch(200, seed=0)
+    for sketch in sketches:
+        merged.merge(sketch, compact=compact)
+    assert merged.count == len(values)
+    for q in QUANTILES:
+        assert rank_error(values, merged.quantile(q), q) <= merged.rank_error
+
+
+def test_exact_summary_matches_pandas(values):
+    rounded = np.round(values, 1)
+    summary = ExactQuantileSummary()
+    for batch in np.array_split(rounded, 7):
+        summary.merge(ExactQuantileSummary().update(batch))
+    for q in QUANTILES:
+        assert summary.quantile(q) == pd.Series(rounded).quantile(q)
+
+
+def test_window_summary_rank_error_within_bound():
+    processor = DataProcessor()
+    processor.static_readings = readings = make_readings(rows=100_000, days=5)
+    start, end = pd.Timestamp('2020-04-06 10:07'), pd.Timestamp('2020-04-09 03:41')
+    values = readings.loc[(readings['timestamp'] >= start) & (readings['timestamp'] <= end), 'value']
+    summary = processor.get_quantile_summary('static_readings', start, end)
+    assert summary.count == len(values)
+    for q in QUANTILES:
+        assert rank_error(values.to_numpy(np.float64), summary.quantile(q), q) <= summary.rank_error
+
+
+def test_window_median_exact_below_row_threshold(monkeypatch):
+    processor = DataProcessor()
+    processor.static_readings = make_readings(rows=100_000, days=5)
+    start, end = '2020-04-07', '2020-04-08 12:00'
+    values = processor.get_window('static_readings', start, end)['value']
+    assert len(values) <= DataProcessor.EXACT_MEDIAN_ROWS
+    stats = processor.get_window_stats('static_readings', start, end)
+    assert stats['median'] == values.median() and stats['median_rank_error'] == 0.0
+
+    monkeypatch.setattr(DataProcessor, 'EXACT_MEDIAN_ROWS', 0)
+    processor.static_readings = processor.static_readings.copy()
+    stats = processor.get_window_stats('static_readings', start, end)
+    assert stats['median_rank_error'] > 0.0
+    assert rank_error(values.to_numpy(np.float64), stats['median'], 0.5) <= stats['median_rank_error']
+
+
+def test_cube_keeps_small_sketches_exact():
+    # About 40 readings per sensor and day: every per-sensor sketch holds all of its values
+    readings = time_index.sort_by_time(make_readings(rows=20_000, sensors=100, days=5), 'timestamp')
+    readings.loc[readings.index[::97], 'value'] = np.nan
+    cube = QuantileCube(readings, 'sensor_id', 'timestamp', 'value', k=200)
+    hours = readings['timestamp'].dt.floor('h')
+    days = readings['timestamp'].dt.floor('D')
+    # One sketch per sensor and per bucket, at each level, for buckets with values
+    valid = readings[readings['value'].notna()]
+    assert len(cube) == sum(len(valid.groupby([buckets[valid.index], 'sensor_id'])) + buckets[valid.index].nunique()
+                            for buckets in (hours, days))
+
+    start, end = '2020-04-06 10:07', '2020-04-09 03:41'
+    window = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    sensors = [3, 7, 42]
+    values = window.loc[window['sensor_id'].isin(sensors), 'value'].astype(np.float64)
+    summary = cube.sketch(start, end, sensors)
+    assert summary.rank_error == 0.0 and summary.count == values.count()
+    for q in QUANTILES:
+        assert summary.quantile(q) == values.quantile(q)
+    everything = cube.sketch()
+    assert everything.count == readings['value'].count() and everything.rank_error > 0.0
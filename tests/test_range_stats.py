@@ -0,0 +1,94 @@
+# tests/test_range_stats.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils.data_processing import DataProcessor
+from utils.range_stats import RangeStats
+
+RANGES = [
+    (None, None),
+    ('2020-04-06 00:00:00', '2020-04-06 00:10:00'),
+    ('2020-04-06 05:13:07', '2020-04-07 19:41:55'),
+    ('2020-04-07 23:59:00', '2020-04-09'),
+    ('2020-04-10', '2020-04-11'),
+]
+
+
+def pandas_stats(readings, start, end):
+    if start is not None:
+        readings = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    values = readings['value']
+    return {'rows': len(readings), 'count': values.count(), 'mean': values.mean(), 'std': values.std(),
+            'min': values.min(), 'max': values.max()}
+
+
+def assert_stats_equal(result, expected):
+    assert result['rows'] == expected['rows']
+    assert result['count'] == expected['count']
+    for key in ('mean', 'std', 'min', 'max'):
+        np.testing.assert_allclose(result[key], expected[key], rtol=1e-5, err_msg=key)
+
+
+@pytest.fixture
+def readings():
+    # Enough rows for several BLOCK_ROWS blocks, with a run of missing values across a block boundary
+    readings = make_readings(rows=10000)
+    values = readings['value'].to_numpy().copy()
+    values[RangeStats.BLOCK_ROWS - 10:RangeStats.BLOCK_ROWS + 10] = np.nan
+    values[::97] = np.nan
+    readings['value'] = values
+    return readings
+
+
+@pytest.mark.parametrize('start,end', RANGES)
+def test_stats_match_pandas(readings, start, end):
+    stats = RangeStats(readings, 'value', 'timestamp')
+    assert_stats_equal(stats.stats(start, end), pandas_stats(readings, start, end))
+
+
+def test_stats_of_every_block_boundary_window(readings):
+    stats = RangeStats(readings, 'value', 'timestamp')
+    times = readings['timestamp']
+    block = RangeStats.BLOCK_ROWS
+    for lo, hi in [(0, block - 1), (1, block), (block - 1, block), (block - 15, block + 15),
+                   (block + 1, 3 * block - 1), (500, len(readings) - 1)]:
+        assert_stats_equal(stats.stats(times.iloc[lo], times.iloc[hi]),
+                           pandas_stats(readings, times.iloc[lo], times.iloc[hi]))
+
+
+def test_stats_of_all_missing_window():
+    readings = make_readings(rows=50)
+    readings['value'] = np.float32(np.nan)
+    result = RangeStats(readings, 'value', 'timestamp').stats()
+    assert result['rows'] == 50 and result['count'] == 0
+    assert all(np.isnan(result[key]) for key in ('mean', 'std', 'min', 'max'))
+
+
+@pytest.mark.parametrize('start,end', RANGES[1:])
+def test_processor_range_stats_match_pandas(readings, start, end):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    result = processor.get_range_stats('static_readings', start, end)
+    expected = pandas_stats(readings, pd.Timestamp(start), pd.Timestamp(end))
+    assert_stats_equal(result, expected)
+    window = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    assert result['sensors'] == window['sensor_id'].nunique()
+
+
+def test_period_statistics_accept_dates_or_frames(readings):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    processor.mobile_readings = make_readings(rows=3000, seed=1)
+    start, end = RANGES[2]
+    static = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+    mobile = processor.mobile_readings
+    mobile = mobile[(mobile['timestamp'] >= start) & (mobile['timestamp'] <= end)]
+    by_dates = processor.calculate_period_statistics(start, end)
+    by_frames = processor.calculate_period_statistics(static, mobile)
+    assert by_dates.keys() == by_frames.keys()
+    for key in by_dates:
+        np.testing.assert_allclose(by_dates[key], by_frames[key], rtol=1e-5, err_msg=key)
+    assert by_frames['num_mobile_readings'] == len(mobile)
+    assert by_frames['unique_mobile_sensors'] == mobile['sensor_id'].nunique()
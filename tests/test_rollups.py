@@ -0,0 +1,107 @@
+# tests/test_rollups.py
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils.data_processing import DataProcessor
+from utils.rollups import RollupCube
+
+
+def pandas_buckets(readings, freq, by_sensor=False):
+    keys = [pd.Grouper(key='timestamp', freq=freq)] + (['sensor_id'] if by_sensor else [])
+    return readings.groupby(keys, observed=True)['value'].agg(['count', 'mean', 'std']).reset_index()
+
+
+def assert_buckets_equal(result, expected):
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_freq=False, rtol=1e-5)
+
+
+@pytest.fixture
+def readings():
+    return make_readings()
+
+
+@pytest.mark.parametrize('freq', ['1min', '15min', '1h', '2h', '1D'])
+@pytest.mark.parametrize('by_sensor', [False, True])
+def test_cube_matches_pandas_aggregates(readings, freq, by_sensor):
+    cube = RollupCube(readings, 'sensor_id', 'timestamp', 'value')
+    result = cube.finalize(cube.query(freq, by_sensor=by_sensor), by_sensor, freq)
+    assert_buckets_equal(result, pandas_buckets(readings, freq, by_sensor))
+
+
+@pytest.mark.parametrize('freq', ['15min', '1h', '6h'])
+def test_bucketed_averages_of_off_grid_range_match_pandas(readings, freq):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    start, end = pd.Timestamp('2020-04-06 03:07:11'), pd.Timestamp('2020-04-07 20:52:03')
+    window = readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+
+    for by_sensor in (False, True):
+        cube = processor._rollup('static_readings')
+        result = processor._bucketed_from_rollup('static_readings', cube, freq, start, end, by_sensor)
+        assert_buckets_equal(result, pandas_buckets(window, freq, by_sensor))
+        assert_buckets_equal(processor.get_bucketed_averages('static_readings', freq, start, end, by_sensor),
+                             pandas_buckets(window, freq, by_sensor))
+
+
+def test_appended_rows_merge_into_every_level(readings):
+    split = len(readings) * 2 // 3
+    base, new = readings.iloc[:split], readings.iloc[split:]
+    cube = RollupCube(base, 'sensor_id', 'timestamp', 'value')
+    cube.append(readings, new)
+    rebuilt = RollupCube(readings, 'sensor_id', 'timestamp', 'value')
+    for freq, level in rebuilt.levels.items():
+        pd.testing.assert_frame_equal(cube.levels[freq], level, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('period,freq', [('hour', '1h'), ('dayofweek', '1D')])
+def test_profile_matches_pandas(readings, period, freq):
+    cube = RollupCube(readings, 'sensor_id', 'timestamp', 'value')
+    expected = readings.groupby(getattr(readings['timestamp'].dt, period).rename('period'))['value'] \
+        .agg(['count', 'mean', 'std', 'min', 'max']).reset_index()
+    pd.testing.assert_frame_equal(cube.profile(freq, period), expected, check_dtype=False, rtol=1e-5)
+
+
+@pytest.mark.parametrize('freq,max_points,expected', [
+    ('1min', None, '1min'),  # No budget: the requested width stands
+    ('1min', 100, '1h'),  # 30min gives 144 buckets over the 3 days, 1h gives 72
+    ('15min', 300, '15min'),  # 288 buckets fit
+    ('1min', 2, '1D'),  # Nothing fits: the widest width
+])
+def test_plan_coarsens_to_narrowest_width_within_budget(readings, freq, max_points, expected):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    plan = processor.plan_buckets('static_readings', freq, max_points=max_points)
+    assert plan['freq'] == expected and plan['requested_freq'] == freq
+    assert plan['buckets'] == len(pandas_buckets(readings, expected))
+    assert ('coarsened' in plan['label']) == (expected != freq)
+    if max_points and expected != '1D':
+        narrower = DataProcessor.PLANNER_FREQS[DataProcessor.PLANNER_FREQS.index(expected) - 1]
+        assert processor.plan_buckets('static_readings', narrower)['buckets'] > max_points >= plan['buckets']
+
+
+@pytest.mark.parametrize('start,end,freq,source', [
+    (None, None, '1h', 'rollup'),
+    ('2020-04-06 03:07:11', '2020-04-07 20:52:03', '15min', 'rollup'),
+    # Inside one hour: the 1h rollups cover no whole bucket, so every row would come from the raw edges
+    ('2020-04-07 10:05', '2020-04-07 10:35', '1h', 'raw'),
+    # A width no rollup level serves
+    ('2020-04-06 03:07:11', '2020-04-07 20:52:03', '7min', 'raw'),
+])
+def test_plan_picks_source_aggregating_fewer_rows(readings, start, end, freq, source):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    window = readings if start is None else readings[(readings['timestamp'] >= start) &
+                                                       (readings['timestamp'] <= end)]
+    plan = processor.plan_buckets('static_readings', freq, start, end)
+    assert plan['source'] == source
+    if source == 'raw':
+        assert plan['level'] is None and plan['rows'] == len(window)
+    else:
+        cube = processor._rollup('static_readings')
+        assert plan['level'] == cube.level_for(freq)
+        assert plan['rows'] < len(window)
+    buckets, used = processor.get_planned_buckets('static_readings', freq, start, end)
+    assert used == plan
+    assert_buckets_equal(buckets[buckets['count'] > 0], pandas_buckets(window, freq))
@@ -0,0 +1,32 @@
+# tests/test_schema.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import read_raw, reference_clean
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7])
+def test_values_are_cleaned_before_downcast(processor, chunk_size):
+    # Quartiles of 8.0 and 9.6 put the lower IQR bound at 5.6000000000000005 in
+    # float64, just above 5.6, but below float32(5.6): the 5.6 reading must go
+    values = [8.0, 9.6] * 10 + [5.6, 8.0]
+    pd.DataFrame({
+        'Timestamp': pd.date_range('2020-04-06', periods=len(values), freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+        'Sensor-id': 1,
+        'Value': values,
+        'Units': 'cpm'
+    }).to_csv(processor.STATIC_READINGS_PATH, index=False)
+    processor.load_data(lazy=True, use_cache=False, chunk_size=chunk_size)
+
+    readings = processor.static_readings
+    expected = reference_clean(read_raw(processor.STATIC_READINGS_PATH))
+    assert readings['value'].dtype == np.float32
+    assert 5.6 not in expected['value'].to_numpy()
+    assert sorted(readings.index) == sorted(expected.index)
+
+
+def test_loaded_readings_match_reference_cleaning(processor):
+    processor.load_data(lazy=True, use_cache=False)
+    expected = reference_clean(read_raw(processor.STATIC_READINGS_PATH))
+    assert sorted(processor.static_readings.index) == sorted(expected.index)
@@ -0,0 +1,49 @@
+# tests/test_sensor_index.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils.data_processing import DataProcessor
+from utils.sensor_index import SensorIndex
+
+
+@pytest.fixture
+def readings():
+    return make_readings(rows=5000, sensors=20)
+
+
+def test_positions_match_pandas_masks(readings):
+    index = SensorIndex(readings, 'sensor_id', 'timestamp')
+    times = readings['timestamp']
+    # Bounds on exact reading times, nanoseconds included, are inclusive
+    start, end = times.iloc[1000], times.iloc[3000]
+    for sensor in index.sensors:
+        mask = (readings['sensor_id'] == sensor).to_numpy()
+        np.testing.assert_array_equal(index.positions(sensor), np.flatnonzero(mask))
+        in_range = mask & ((times >= start) & (times <= end)).to_numpy()
+        np.testing.assert_array_equal(index.positions(sensor, start, end), np.flatnonzero(in_range))
+
+
+def test_active_sensors_match_pandas(readings):
+    index = SensorIndex(readings, 'sensor_id', 'timestamp')
+    times = readings['timestamp']
+    for lo, hi in [(0, 4999), (10, 12), (2500, 2500)]:
+        start, end = times.iloc[lo], times.iloc[hi]
+        window = readings[(times >= start) & (times <= end)]
+        assert index.active(start, end) == sorted(window['sensor_id'].unique())
+
+
+def test_sensor_readings_match_pandas(readings):
+    processor = DataProcessor()
+    processor.static_readings = readings
+    selected = [3, 7, 11]
+    result = processor.get_sensor_readings('static_readings', selected)
+    # Grouped by sensor in the order given, time order within each
+    expected = [readings[readings['sensor_id'] == sensor] for sensor in selected]
+    pd.testing.assert_frame_equal(result, pd.concat(expected))
+    start, end = readings['timestamp'].iloc[100], readings['timestamp'].iloc[4000]
+    result = processor.get_sensor_readings('static_readings', selected, start, end)
+    expected = [df[(df['timestamp'] >= start) & (df['timestamp'] <= end)] for df in expected]
+    pd.testing.assert_frame_equal(result, pd.concat(expected))
+    assert processor.get_sensor_counts('static_readings').to_dict() == readings['sensor_id'].value_counts().to_dict()
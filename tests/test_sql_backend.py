@@ -0,0 +1,125 @@
+# tests/test_sql_backend.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_readings
+from utils.sql_backend import DUCKDB_AVAILABLE, SQLBackend
+
+ENGINES = ['sqlite', pytest.param('duckdb', marks=pytest.mark.skipif(not DUCKDB_AVAILABLE,
+                                                                     reason="duckdb is not installed"))]
+START, END = pd.Timestamp('2020-04-06 05:13:07'), pd.Timestamp('2020-04-07 19:41:55')
+
+
+@pytest.fixture
+def readings():
+    readings = make_readings(rows=5000)
+    readings['latitude'] = np.linspace(0.0, 0.2, len(readings))
+    values = readings['value'].to_numpy().copy()
+    values[::53] = np.nan
+    readings['value'] = values
+    return readings
+
+
+@pytest.fixture(params=ENGINES)
+def backend(request, tmp_path, readings):
+    backend = SQLBackend(str(tmp_path / 'readings.db'), engine=request.param)
+    backend.write('static_readings', readings, {'version': 1})
+    yield backend
+    backend.close()
+
+
+def in_range(readings, start=START, end=END):
+    return readings[(readings['timestamp'] >= start) & (readings['timestamp'] <= end)]
+
+
+def assert_moments_equal(result, expected, columns):
+    assert result['count'].tolist() == expected['count'].tolist()
+    for column in columns:
+        np.testing.assert_allclose(result[column].to_numpy(np.float64), expected[column].to_numpy(np.float64),
+                                   rtol=1e-6, err_msg=column)
+
+
+def test_read_matches_pandas(backend, readings):
+    assert backend.is_current('static_readings', {'version': 1})
+    expected = in_range(readings).sort_values(['timestamp', 'sensor_id'], kind='stable')
+    pd.testing.assert_frame_equal(backend.read('static_readings', START, END), expected)
+    assert len(backend.read('static_readings')) == len(readings)
+
+
+@pytest.mark.parametrize('bounded', [False, True])
+def test_sensor_aggregates_match_pandas(backend, readings, bounded):
+    window = in_range(readings) if bounded else readings
+    result = backend.sensor_aggregates('static_readings', *((START, END) if bounded else (None, None)))
+    expected = window.groupby('sensor_id')['value'].agg(['count', 'mean', 'std', 'min', 'max']).reset_index()
+    assert result['sensor_id'].tolist() == expected['sensor_id'].tolist()
+    assert_moments_equal(result, expected, ['mean', 'std', 'min', 'max'])
+
+
+@pytest.mark.parametrize('by_sensor', [False, True])
+def test_bucketed_matches_pandas(backend, readings, by_sensor):
+    window = in_range(readings)
+    keys = [window['timestamp'].dt.floor('15min')] + ([window['sensor_id']] if by_sensor else [])
+    expected = window.groupby(keys)['value'].agg(['count', 'mean', 'std']).reset_index()
+    result = backend.bucketed('static_readings', '15min', START, END, by_sensor=by_sensor)
+    assert result['timestamp'].tolist() == expected['timestamp'].tolist()
+    assert_moments_equal(result, expected, ['mean', 'std'])
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_std_of_large_values_with_small_spread(tmp_path, engine):
+    # An uncentered sum of squares loses all of this variance to cancellation
+    rng = np.random.default_rng(0)
+    readings = make_readings(rows=2000, sensors=4)
+    readings['value'] = 1e9 + rng.normal(0, 0.01, len(readings))
+    backend = SQLBackend(str(tmp_path / 'readings.db'), engine=engine)
+    backend.write('static_readings', readings, {'version': 1})
+    expected = readings.groupby('sensor_id')['value'].std().to_numpy()
+    np.testing.assert_allclose(backend.sensor_aggregates('static_readings')['std'], expected, rtol=1e-4)
+    hourly = readings.groupby(readings['timestamp'].dt.floor('h'))['value'].std().to_numpy()
+    np.testing.assert_allclose(backend.bucketed('static_readings', '1h')['std'], hourly, rtol=1e-3)
+    backend.close()
+
+
+def test_latest_positions_match_pandas(backend, readings):
+    result = backend.latest_positions('static_readings', ['latitude'], START, END)
+    expected = in_range(readings).groupby('sensor_id')['latitude'].last().reset_index()
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_append_is_read_back(backend, readings):
+    new_rows = make_readings(rows=200, days=1, seed=3)
+    new_rows['timestamp'] += pd.Timedelta(days=3)
+    new_rows['latitude'] = 0.5
+    new_rows.index += len(readings)
+    backend.append('static_readings', new_rows)
+    combined = pd.concat([readings, new_rows])
+    end = pd.Timestamp('2020-04-10')
+    expected = in_range(combined, START, end).sort_values(['timestamp', 'sensor_id'], kind='stable')
+    pd.testing.assert_frame_equal(backend.read('static_readings', START, end), expected)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_processor_keeps_sql_readings_out_of_memory(new_processor, data_dir, monkeypatch, engine):
+    monkeypatch.setattr('utils.sql_backend.DEFAULT_ENGINE', engine)
+    reference = new_processor()
+    reference.load_data()
+    processor = new_processor()
+    processor.SQL_DB_PATH = str(data_dir / 'readings.db')
+    processor.load_data(sql_backend=True)
+
+    pd.testing.assert_frame_equal(processor.get_readings('static_readings'), reference.static_readings,
+                                  check_categorical=False)
+    start, end = '2020-04-06 06:00:00', '2020-04-06 18:00:00'
+    for bounds in [(None, None), (start, end)]:
+        result = processor.get_sensor_aggregates('mobile_readings', *bounds)
+        expected = reference.get_sensor_aggregates('mobile_readings', *bounds)
+        assert result['count'].tolist() == expected['count'].tolist()
+        for column in ('mean', 'std', 'min', 'max', 'latitude', 'longitude'):
+            np.testing.assert_allclose(result[column].astype(float), expected[column].astype(float),
+                                       rtol=1e-5, err_msg=column)
+        assert result['user_id'].astype(str).tolist() == expected['user_id'].astype(str).tolist()
+    assert processor.get_summary('mobile_readings')['rows'] == len(reference.mobile_readings)
+    assert processor.get_provenance('mobile_readings') is not None
+    processor.warm_up()
+    assert not processor.is_loaded('static_readings') and not processor.is_loaded('mobile_readings')
@@ -0,0 +1,43 @@
+# tests/test_startup.py
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.data_processing import DataProcessor
+
+
+def test_parallel_startup_loads_what_serial_startup_does(new_processor):
+    serial, parallel = new_processor(), new_processor()
+    assert serial.load_data(use_cache=False, parallel=False)
+    assert parallel.load_data(use_cache=False, parallel=True)
+    for name in ('static_sensors', 'static_readings', 'mobile_readings'):
+        pd.testing.assert_frame_equal(getattr(parallel, name), getattr(serial, name))
+    assert set(DataProcessor.DATASETS) | {'total'} <= set(parallel.stage_timings)
+    assert parallel.stage_timings['total'] >= max(parallel.stage_timings[name] for name in DataProcessor.DATASETS)
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_startup_stages_overlap_only_in_parallel(new_processor, monkeypatch, parallel):
+    # The sensor and shapefile stages each wait for the other: only concurrent stages get past
+    barrier = threading.Barrier(2, timeout=2 if parallel else 0.2)
+    load_sensors, load_shapefile = DataProcessor._load_static_sensors, DataProcessor._load_shapefile
+
+    def meet(load):
+        def stage(self):
+            barrier.wait()
+            return load(self)
+        return stage
+
+    monkeypatch.setattr(DataProcessor, '_load_static_sensors', meet(load_sensors))
+    monkeypatch.setattr(DataProcessor, '_load_shapefile', meet(load_shapefile))
+    processor = new_processor()
+    assert processor.load_data(use_cache=False, parallel=parallel) == parallel
+
+
+def test_failing_stage_fails_the_load(new_processor, monkeypatch):
+    def fail(self):
+        raise OSError("shapefile unreadable")
+
+    monkeypatch.setattr(DataProcessor, '_load_shapefile', fail)
+    assert not new_processor().load_data(use_cache=False, parallel=True)
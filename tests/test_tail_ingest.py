@@ -0,0 +1,98 @@
+# tests/test_tail_ingest.py
+import numpy as np
+
+from utils.data_processing import DataProcessor
+
+APPENDED_ROW = '2020-04-07 00:00:00,1,20.5,cpm\n'
+
+
+def append_during_load(monkeypatch, path):
+    """Append a row to path once the load has recorded its offset, before the file is parsed"""
+    ingest_dtypes = DataProcessor._ingest_dtypes
+    appended = []
+
+    def append_then_read(self, source):
+        if not appended:
+            with open(path, 'a') as f:
+                f.write(APPENDED_ROW)
+            appended.append(True)
+        return ingest_dtypes(self, source)
+
+    monkeypatch.setattr(DataProcessor, '_ingest_dtypes', append_then_read)
+
+
+def appended_rows(readings):
+    return readings[(readings['sensor_id'] == 1) & (readings['value'] == 20.5)]
+
+
+def test_row_appended_during_load_is_ingested_once(processor, monkeypatch):
+    append_during_load(monkeypatch, processor.STATIC_READINGS_PATH)
+    processor.load_data(lazy=True, use_cache=False)
+
+    assert len(appended_rows(processor.static_readings)) == 0
+    assert processor.ingest_new_rows()['static_readings'] == 1
+    assert len(appended_rows(processor.static_readings)) == 1
+    assert processor.ingest_new_rows()['static_readings'] == 0
+
+
+def test_row_appended_during_chunked_load_is_ingested_once(processor, monkeypatch):
+    append_during_load(monkeypatch, processor.STATIC_READINGS_PATH)
+    processor.load_data(lazy=True, use_cache=False, chunk_size=500)
+
+    assert len(appended_rows(processor.static_readings)) == 0
+    processor.ingest_new_rows()
+    assert len(appended_rows(processor.static_readings)) == 1
+
+
+def test_snapshot_built_during_append_keeps_appended_row(processor, new_processor, monkeypatch):
+    append_during_load(monkeypatch, processor.STATIC_READINGS_PATH)
+    processor.load_data(lazy=True)
+    assert len(appended_rows(processor.static_readings)) == 0
+    monkeypatch.undo()
+
+    # The next start must not take the snapshot as covering the grown file
+    restarted = new_processor()
+    restarted.load_data(lazy=True)
+    restarted.ingest_new_rows()
+    assert len(appended_rows(restarted.static_readings)) == 1
+
+
+def test_column_store_built_during_append_keeps_appended_row(processor, new_processor, data_dir, monkeypatch):
+    store_dir = str(data_dir / 'columns')
+    append_during_load(monkeypatch, processor.STATIC_READINGS_PATH)
+    processor.load_data(lazy=True, use_cache=False, column_store_dir=store_dir)
+    assert len(appended_rows(processor.static_readings)) == 0
+    monkeypatch.undo()
+
+    # Another worker must not attach to columns that miss the appended row
+    worker = new_processor()
+    worker.load_data(lazy=True, use_cache=False, column_store_dir=store_dir)
+    worker.ingest_new_rows()
+    assert len(appended_rows(worker.static_readings)) == 1
+
+
+def test_sensor_aggregates_follow_appended_rows(processor):
+    processor.load_data()
+    mobile = processor.mobile_readings
+    value = mobile.loc[mobile['sensor_id'] == 3, 'value'].iloc[-1]  # Passes the rate-of-change check
+    with open(processor.MOBILE_READINGS_PATH, 'a') as f:
+        # A known sensor moving on, a late reading that must not move it back, and a new sensor
+        f.write(f'2020-04-07 01:00:00,3,-119.8,0.15,{value},cpm,user3\n')
+        f.write(f'2020-04-06 00:00:01,3,-119.7,0.05,{value},cpm,user3\n')
+        # (whose first reading has no previous one to be checked against)
+        f.write('2020-04-07 01:00:00,42,-119.85,0.1,16.5,cpm,user42\n')
+        f.write('2020-04-07 01:00:05,42,-119.84,0.1,16.5,cpm,user42\n')
+    assert processor.ingest_new_rows()['mobile_readings'] == 3
+
+    readings = processor.mobile_readings
+    grouped = readings.sort_values('timestamp', kind='stable').groupby('sensor_id', observed=True)
+    expected = grouped['value'].agg(['count', 'mean', 'std', 'min', 'max'])
+    expected = expected.join(grouped[['latitude', 'longitude', 'user_id']].last()).reset_index()
+    result = processor.get_sensor_aggregates('mobile_readings')
+    assert result['sensor_id'].tolist() == expected['sensor_id'].tolist()
+    assert result['count'].tolist() == expected['count'].tolist()
+    for column in ('mean', 'std', 'min', 'max', 'latitude', 'longitude'):
+        np.testing.assert_allclose(result[column].astype(float), expected[column].astype(float),
+                                   rtol=1e-5, err_msg=column)
+    assert result['user_id'].astype(str).tolist() == expected['user_id'].astype(str).tolist()
+    assert np.isclose(result.set_index('sensor_id').loc[3, 'latitude'], 0.15)
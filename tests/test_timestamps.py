@@ -0,0 +1,25 @@
+# tests/test_timestamps.py
+import pandas as pd
+
+from utils.data_processing import DataProcessor
+from utils.timestamps import detect_timestamp_format, parse_timestamps
+
+
+def day_first_stamps():
+    """Minute stamps from 1 to 14 April, day first: ambiguous until past the first 10k rows"""
+    times = pd.date_range('2020-04-01', '2020-04-14 23:59', freq='1min')
+    return times, pd.Series(times.strftime('%d/%m/%Y %H:%M:%S'))
+
+
+def test_format_detected_from_stamps_past_the_leading_rows():
+    times, stamps = day_first_stamps()
+    assert detect_timestamp_format(stamps.iloc[:10000].unique()) == '%m/%d/%Y %H:%M:%S'
+    assert DataProcessor()._parse_timestamps(stamps, 'feed.csv').tolist() == times.tolist()
+
+
+def test_parse_timestamps_with_detected_format():
+    times, stamps = day_first_stamps()
+    stamps.iloc[5] = None
+    parsed = parse_timestamps(stamps)
+    assert parsed.isna().sum() == 1
+    assert parsed.drop(5).tolist() == times.delete(5).tolist()
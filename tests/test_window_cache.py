@@ -0,0 +1,123 @@
+# tests/test_window_cache.py
+import threading
+import time
+
+import pytest
+
+from utils.window_cache import WindowCache
+
+# Generous, so a slow host does not fail the concurrency tests
+TIMEOUT = 10
+
+
+def test_evicts_least_recently_used_entry():
+    cache = WindowCache(max_entries=2)
+    cache.get(('static', 'a'), lambda: 'A')
+    cache.get(('static', 'b'), lambda: 'B')
+    assert cache.get(('static', 'a'), lambda: pytest.fail("recomputed a")) == 'A'
+    cache.get(('static', 'c'), lambda: 'C')
+
+    # 'b' was used least recently when 'c' went in
+    assert len(cache) == 2
+    assert cache.get(('static', 'a'), lambda: pytest.fail("recomputed a")) == 'A'
+    assert cache.get(('static', 'b'), lambda: 'B again') == 'B again'
+    assert cache.stats() == {'hits': 2, 'misses': 4, 'shared': 0, 'entries': 2}
+
+
+def concurrent_gets(cache, key, compute, callers):
+    """Call cache.get from ``callers`` threads at once; returns their results (or errors)"""
+    results = [None] * callers
+
+    def call(i):
+        try:
+            results[i] = cache.get(key, compute)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for_waiters(cache, waiters):
+    """Block until ``waiters`` callers wait for another caller's computation"""
+    deadline = time.monotonic() + TIMEOUT
+    while cache.stats()['shared'] < waiters:
+        assert time.monotonic() < deadline, "callers did not wait for the computation"
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_compute_once():
+    cache = WindowCache(max_entries=4)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        assert release.wait(TIMEOUT)
+        return object()
+
+    threads, results = concurrent_gets(cache, ('static', 'day'), compute, callers=8)
+    wait_for_waiters(cache, 7)
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'shared': 7, 'entries': 1}
+
+
+def test_failed_computation_reaches_every_waiter_and_is_not_cached():
+    cache = WindowCache(max_entries=4)
+    release = threading.Event()
+
+    def compute():
+        assert release.wait(TIMEOUT)
+        raise ValueError("bad window")
+
+    threads, results = concurrent_gets(cache, ('static', 'day'), compute, callers=4)
+    wait_for_waiters(cache, 3)
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(cache) == 0
+    assert cache.get(('static', 'day'), lambda: 'recovered') == 'recovered'
+
+
+def test_discard_drops_dataset_entries_and_results_in_flight():
+    cache = WindowCache(max_entries=4)
+    cache.get(('static', 'a'), lambda: 'A')
+    cache.get(('mobile', 'a'), lambda: 'M')
+
+    def compute():
+        cache.discard('static')  # The data changed while this window was computed
+        return 'stale'
+
+    assert cache.get(('static', 'b'), compute) == 'stale'
+    assert len(cache) == 1
+    assert cache.get(('mobile', 'a'), lambda: pytest.fail("recomputed mobile")) == 'M'
+    assert cache.get(('static', 'b'), lambda: 'fresh') == 'fresh'
+
+
+def test_processor_windows_follow_data_version(processor):
+    processor.load_data(use_cache=False)
+    start, end = '2020-04-06 00:00:00', '2020-04-07 23:59:59'
+    window = processor.get_window('static_readings', start, end)
+    assert processor.get_window('static_readings', start, end) is window
+    version = processor.data_version
+
+    last_value = processor.static_readings['value'].iloc[-1]
+    with open(processor.STATIC_READINGS_PATH, 'a') as f:
+        f.write('2020-04-07 00:00:00,1,%s,cpm\n' % last_value)
+        f.write('2020-04-07 00:00:05,1,%s,cpm\n' % last_value)
+    appended = processor.ingest_new_rows()['static_readings']
+    assert appended > 0 and processor.data_version > version
+
+    updated = processor.get_window('static_readings', start, end)
+    assert updated is not window
+    assert len(updated) == len(window) + appended
+    assert processor.get_window_stats('static_readings', start, end)['rows'] == len(updated)